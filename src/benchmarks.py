@@ -0,0 +1,189 @@
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import math
+import random
+import resource
+import time
+import numpy as np
+from color_models import RGB
+from fortune import voronoi_cells, rasterize_cells
+from gradients import master_gradient, shape_registry
+from voronoi import VoronoiDiagram, find_labels, jump_flood_labels, euclidean_distance, manhattan_distance, chebyshev_distance
+
+"""
+Timings of the heavier generators at the sizes they're used at, run from src/ with python benchmarks.py
+"""
+
+
+def time_call(function, *args, repeats=1, **kwargs):
+    """
+    Times the fastest of several calls to a function.
+    :param function: function to time
+    :param args: arguments to the function
+    :param repeats: number of times to call the function
+    :param kwargs: keyword arguments to the function
+    :return: fastest call's time in seconds
+    """
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _render_shape(width, height, shape, engine):
+    colors = [RGB(0, 0, 0), RGB(255, 128, 0), RGB(20, 40, 250)]
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    master_gradient(width, height, colors, shape, engine=engine)
+    elapsed = time.perf_counter() - start
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+
+
+def benchmark_shape_gradients(width=3840, height=2160, engines=('field', 'draw')):
+    """
+    Times rendering each registered shape's gradient with each engine, along with the peak memory the render takes on
+    top of what its process already held. Each render runs in a fresh process, so renders don't share peaks or caches.
+    :param width: width of the gradients
+    :param height: height of the gradients
+    :param engines: engines to render with, see master_gradient
+    :return: None
+    """
+    print(f'Shape gradients at {width}x{height}')
+    for shape in shape_registry:
+        timings = []
+        for engine in engines:
+            with ProcessPoolExecutor(1) as executor:
+                elapsed, peak = executor.submit(_render_shape, width, height, shape, engine).result()
+            timings.append(f'{engine} {elapsed:.2f}s, {peak / 1024:.0f}MB')  # Peak resident size is given in KB
+        print(f'{shape:>20}: {", ".join(timings)}')
+
+
+def benchmark_voronoi_labels(width=1920, height=1080, site_counts=(20, 1000, 10000), seed=0):
+    """
+    Times labelling a Voronoi diagram with and without a spatial index of its feature points, for each indexed metric.
+    The brute force labelling is skipped for more than a thousand feature points, where it takes minutes.
+    :param width: width of the diagram
+    :param height: height of the diagram
+    :param site_counts: numbers of feature points to time
+    :param seed: seed of the random feature points
+    :return: None
+    """
+    rng = np.random.default_rng(seed)
+    print(f'Voronoi labels at {width}x{height}')
+    for count in site_counts:
+        feature_points = np.column_stack((rng.integers(0, width + 1, count), rng.integers(0, height + 1, count)))
+        for distance in (euclidean_distance, manhattan_distance, chebyshev_distance):
+            indexed = time_call(find_labels, width, height, feature_points, distance, indexed=True)
+            if count <= 1000:
+                brute_force = f'{time_call(find_labels, width, height, feature_points, distance, indexed=False):.2f}s'
+            else:
+                brute_force = 'skipped'
+            print(f'{count:>6} sites, {distance.__name__:<18} indexed {indexed:.2f}s, brute force {brute_force}')
+
+
+def benchmark_jump_flood(width=1920, height=1080, site_counts=(20, 1000, 10000, 100000), seed=0):
+    """
+    Times approximating a Voronoi diagram's labels by jump flooding, along with how many pixels it mislabels.
+    :param width: width of the diagram
+    :param height: height of the diagram
+    :param site_counts: numbers of feature points to time
+    :param seed: seed of the random feature points
+    :return: None
+    """
+    rng = np.random.default_rng(seed)
+    print(f'Jump flooded Voronoi labels at {width}x{height}')
+    for count in site_counts:
+        feature_points = np.column_stack((rng.integers(0, width + 1, count), rng.integers(0, height + 1, count)))
+        start = time.perf_counter()
+        labels = jump_flood_labels(width, height, feature_points)
+        elapsed = time.perf_counter() - start
+
+        if count <= 10000:
+            mislabeled = np.count_nonzero(labels != find_labels(width, height, feature_points))
+            mislabeled = f'{mislabeled} of {width * height} pixels mislabeled'
+        else:
+            mislabeled = 'exact labels skipped'
+        print(f'{count:>6} sites, jump flooded {elapsed:.2f}s, {mislabeled}')
+
+
+def benchmark_fortune(width=1920, height=1080, site_counts=(20, 1000, 10000), seed=0):
+    """
+    Times finding a Voronoi diagram's cells with Fortune's algorithm, then rasterizing them into labels.
+    :param width: width of the diagram
+    :param height: height of the diagram
+    :param site_counts: numbers of feature points to time
+    :param seed: seed of the random feature points
+    :return: None
+    """
+    rng = np.random.default_rng(seed)
+    print(f'Voronoi cells by Fortune\'s algorithm at {width}x{height}')
+    for count in site_counts:
+        feature_points = np.unique(np.column_stack((rng.integers(0, width + 1, count),
+                                                    rng.integers(0, height + 1, count))), axis=0).tolist()
+        start = time.perf_counter()
+        cells = voronoi_cells(feature_points, (-.5, -.5, width - .5, height - .5))
+        swept = time.perf_counter() - start
+        rasterized = time_call(rasterize_cells, cells, width, height)
+        print(f'{len(feature_points):>6} sites, cells {swept:.2f}s, rasterized {rasterized:.2f}s')
+
+
+def benchmark_optimize(width=1000, height=1000, site_counts=(20, 200), seed=0, budgets=None):
+    """
+    Times relaxing Voronoi diagrams by Lloyd's algorithm until their feature points move less than a pixel on average.
+    :param width: width of the diagrams
+    :param height: height of the diagrams
+    :param site_counts: numbers of feature points to time
+    :param seed: seed of the random feature points
+    :param budgets: dictionary of the most seconds relaxing some of the numbers of feature points may take, by default
+    half a second for 20 feature points
+    :return: None
+    :raise: if a relaxation takes longer than its budget
+    """
+    if budgets is None:
+        budgets = {20: .5}
+
+    random.seed(seed)
+    print(f'Voronoi relaxation at {width}x{height}')
+    for count in site_counts:
+        diagram = VoronoiDiagram(width, height, count, optimization_threshold=1)
+        start = time.perf_counter()
+        diagram.optimize()
+        elapsed = time.perf_counter() - start
+        print(f'{count:>6} sites, {len(diagram.residuals)} iterations in {elapsed:.2f}s')
+        if elapsed > budgets.get(count, math.inf):
+            raise AssertionError(f'Relaxing {count} sites took {elapsed:.2f}s, over its {budgets[count]}s budget!')
+
+
+def benchmark_incremental_optimize(width=1000, height=1000, count=200, seed=0):
+    """
+    Times the late iterations of Lloyd's algorithm, once the feature points are nearly settled, regrouping every pixel
+    against regrouping only those around the feature points still moving.
+    :param width: width of the diagram
+    :param height: height of the diagram
+    :param count: number of feature points
+    :param seed: seed of the random feature points
+    :return: None
+    """
+    random.seed(seed)
+    print(f'Late Voronoi relaxation at {width}x{height} with {count} sites')
+    diagram = VoronoiDiagram(width, height, count)
+    diagram.optimize(tolerance=.4, max_iterations=400)
+    for incremental in (False, True):
+        relaxed = copy.deepcopy(diagram)
+        start = time.perf_counter()
+        relaxed.optimize(tolerance=.2, max_iterations=100, incremental=incremental)
+        elapsed = time.perf_counter() - start
+        print(f'{"incremental" if incremental else "full":>12}: {len(relaxed.residuals)} iterations in {elapsed:.2f}s, '
+              f'{elapsed / len(relaxed.residuals):.3f}s each')
+
+
+if __name__ == '__main__':
+    benchmark_shape_gradients()
+    benchmark_voronoi_labels()
+    benchmark_jump_flood()
+    benchmark_fortune()
+    benchmark_optimize()
+    benchmark_incremental_optimize()
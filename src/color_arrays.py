@@ -0,0 +1,383 @@
+import numpy as np
+from color_models import RGB, HSV, LAB, ref_x, ref_y, ref_z, MAX_RGB, MAX_ALPHA, linearization_table
+
+"""
+Vectorized counterparts of the conversions in color_models, operating on whole arrays of colors at once.
+"""
+
+'''
+Every function here takes an array whose last axis holds a color's components, either 3 (no alpha) or 4 (with alpha),
+so an (N, 3) list of colors and an (H, W, 4) image buffer are both valid inputs. Alpha is passed through untouched.
+Components use the same ranges as the scalar color models - RGB in [0, 255], HSV as [0, 360], [0, 100], [0, 100], and
+LAB light in [0, 100] - and XYZ is expressed relative to the D65/2° reference values, X in [0, ref_x] and so on.
+'''
+
+SPACES = ('rgb', 'hsv', 'xyz', 'lab')
+
+_linear_table = None  # NumPy copy of color_models' linearization table, built on first use
+
+
+def _split(values):
+    """
+    Splits an array of colors into its three color components and its alpha component, if one is present.
+    :param values: array of colors, last axis of length 3 or 4
+    :return: tuple of the first, second, and third components as float arrays plus the alpha component or None
+    :raise: if the last axis of the given array isn't of length 3 or 4
+    """
+    values = np.asarray(values)
+    if values.shape[-1] not in (3, 4):
+        raise ValueError('Last axis of a color array must be of length 3 or 4!')
+
+    values = values.astype(np.float64, copy=False)
+    alpha = values[..., 3] if values.shape[-1] == 4 else None
+    return values[..., 0], values[..., 1], values[..., 2], alpha
+
+
+def _join(first, second, third, alpha):
+    """
+    Stacks three color components, and an optional alpha component, back into a single array of colors.
+    :param first: first color component
+    :param second: second color component
+    :param third: third color component
+    :param alpha: alpha component or None
+    :return: array of colors with a last axis of length 3 or 4
+    """
+    if alpha is None:
+        return np.stack((first, second, third), axis=-1)
+    return np.stack((first, second, third, alpha), axis=-1)
+
+
+def rgb_to_hsv(values):
+    """
+    Converts an array of RGB colors to an array of equivalent HSV colors, see RGB.to_hsv.
+    :param values: array of RGB colors
+    :return: array of HSV colors
+    """
+    red, green, blue, alpha = _split(values)
+    red = red / 255
+    green = green / 255
+    blue = blue / 255
+    c_max = np.maximum(np.maximum(red, green), blue)
+    c_min = np.minimum(np.minimum(red, green), blue)
+    delta = c_max - c_min
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hue = np.where(c_max == blue, 60 * (((red - green) / delta) + 4), 0)
+        hue = np.where(c_max == green, 60 * (((blue - red) / delta) + 2), hue)
+        hue = np.where(c_max == red, 60 * (((green - blue) / delta) % 6), hue)
+        hue = np.where(delta == 0, 0, hue)
+        saturation = np.where(c_max == 0, 0, (delta / c_max) * 100)
+
+    hue = np.where(hue == HSV.max_hue, 0, hue)
+    value = c_max * 100
+    return _join(hue, saturation, value, alpha)
+
+
+def hsv_to_rgb(values):
+    """
+    Converts an array of HSV colors to an array of equivalent RGB colors, see HSV.to_rgb.
+    :param values: array of HSV colors
+    :return: array of RGB colors
+    """
+    hue, saturation, value, alpha = _split(values)
+    hue = np.where(hue == HSV.max_hue, 0, hue)
+    saturation = saturation / 100
+    value = value / 100
+
+    c = saturation * value
+    x = c * (1 - np.abs(((hue / 60) % 2) - 1))
+    m = value - c
+    zero = np.zeros_like(c)
+
+    # Selects each pixel's (r, g, b) ordering of c, x, and 0 from which sixth of the hue circle it falls in
+    sextant = np.clip(np.floor(hue / 60), 0, 5).astype(np.intp)
+    r = np.choose(sextant, (c, x, zero, zero, x, c))
+    g = np.choose(sextant, (x, c, c, x, zero, zero))
+    b = np.choose(sextant, (zero, zero, x, c, c, x))
+
+    red = np.clip((r + m) * MAX_RGB, 0, MAX_RGB)
+    green = np.clip((g + m) * MAX_RGB, 0, MAX_RGB)
+    blue = np.clip((b + m) * MAX_RGB, 0, MAX_RGB)
+    return _join(red, green, blue, alpha)
+
+
+def linear_table():
+    """
+    Returns the linear value of every 8-bit RGB channel value as a NumPy array, see color_models.linearization_table.
+    :return: read only array of 256 linear channel values, indexed by channel value
+    """
+    global _linear_table
+    if _linear_table is None:
+        _linear_table = np.array(linearization_table(), dtype=np.float64)
+        _linear_table.flags.writeable = False
+    return _linear_table
+
+
+def linearize(channel):
+    """
+    Applies the sRGB companding inverse to an array of RGB channel values, mapping [0, 255] onto [0, 100]. Whole
+    number arrays, such as image buffers, are looked up from the linearization table instead of being computed.
+    :param channel: array of red, green, or blue values
+    :return: array of linear channel values
+    :raise: if a whole number channel value is outside of the table, as for color_models.linearize_channel
+    """
+    channel = np.asarray(channel)
+    if np.issubdtype(channel.dtype, np.integer):
+        if channel.dtype != np.uint8 and channel.size and (channel.min() < 0 or channel.max() > MAX_RGB):
+            raise ValueError('Channel value must be in range [0, 255]!')
+        return linear_table()[channel]
+
+    channel = channel.astype(np.float64, copy=False) / 255.0
+    curved = channel > .04045
+    safe = np.where(curved, channel, 0)
+    return np.where(curved, ((safe + .055) / 1.055) ** 2.4, channel / 12.92) * 100.0
+
+
+def delinearize(channel):
+    """
+    Applies sRGB companding to an array of linear channel values in [0, 1], mapping them onto [0, 255].
+    :param channel: array of linear channel values
+    :return: array of RGB channel values, not yet clamped
+    """
+    channel = np.asarray(channel, dtype=np.float64)
+    curved = channel > .0031308
+    safe = np.where(curved, channel, 0)
+    return np.where(curved, 1.055 * (safe ** (1 / 2.4)) - .055, channel * 12.92) * MAX_RGB
+
+
+def rgb_to_xyz(values):
+    """
+    Converts an array of RGB colors to an array of XYZ colors.
+    :param values: array of RGB colors
+    :return: array of XYZ colors
+    """
+    values = np.asarray(values)
+    alpha = _split(values)[3]
+    red = linearize(values[..., 0])
+    green = linearize(values[..., 1])
+    blue = linearize(values[..., 2])
+
+    # RGB -> XYZ transformation variables
+    x = (red * .4124564) + (green * .3575761) + (blue * .1804375)
+    y = (red * .2126729) + (green * .7151522) + (blue * .0721750)
+    z = (red * .0193339) + (green * .1191920) + (blue * .9503041)
+    return _join(x, y, z, alpha)
+
+
+def xyz_to_rgb(values):
+    """
+    Converts an array of XYZ colors to an array of RGB colors, clamping each channel into [0, 255].
+    :param values: array of XYZ colors
+    :return: array of RGB colors
+    """
+    x, y, z, alpha = _split(values)
+    x = x / 100
+    y = y / 100
+    z = z / 100
+
+    # XYZ -> RGB transformation variables
+    red = (x * 3.2404542) + (y * -1.5371385) + (z * -.4985314)
+    green = (x * -.9692660) + (y * 1.8760108) + (z * .0415560)
+    blue = (x * .0556434) + (y * -.2040259) + (z * 1.0572252)
+
+    red = np.clip(delinearize(red), 0, MAX_RGB)
+    green = np.clip(delinearize(green), 0, MAX_RGB)
+    blue = np.clip(delinearize(blue), 0, MAX_RGB)
+    return _join(red, green, blue, alpha)
+
+
+def xyz_to_lab(values):
+    """
+    Converts an array of XYZ colors to an array of LAB colors, clamping light into [0, 100].
+    :param values: array of XYZ colors
+    :return: array of LAB colors
+    """
+    x, y, z, alpha = _split(values)
+
+    def lab_mid_transform(var):
+        cubic = var > .008856
+        safe = np.where(cubic, var, 0)
+        return np.where(cubic, safe ** (1 / 3), (var * 7.787) + (16 / 116))
+
+    x = lab_mid_transform(x / ref_x)
+    y = lab_mid_transform(y / ref_y)
+    z = lab_mid_transform(z / ref_z)
+
+    light = np.clip((116 * y) - 16, 0, LAB.max_light)
+    a = 500 * (x - y)
+    b = 200 * (y - z)
+    return _join(light, a, b, alpha)
+
+
+def lab_to_xyz(values):
+    """
+    Converts an array of LAB colors to an array of XYZ colors.
+    :param values: array of LAB colors
+    :return: array of XYZ colors
+    """
+    light, a, b, alpha = _split(values)
+    y = (light + 16) / 116
+    x = (a / 500) + y
+    z = y - (b / 200)
+
+    def xyz_transform(var):
+        cubed = var ** 3
+        return np.where(cubed > .008856, cubed, (var - 16 / 116) / 7.787)
+
+    x = xyz_transform(x) * ref_x
+    y = xyz_transform(y) * ref_y
+    z = xyz_transform(z) * ref_z
+    return _join(x, y, z, alpha)
+
+
+def rgb_to_lab(values):
+    """
+    Converts an array of RGB colors to an array of equivalent LAB colors, see RGB.to_lab.
+    :param values: array of RGB colors
+    :return: array of LAB colors
+    """
+    return xyz_to_lab(rgb_to_xyz(values))
+
+
+def lab_to_rgb(values):
+    """
+    Converts an array of LAB colors to an array of equivalent RGB colors, see LAB.to_rgb.
+    :param values: array of LAB colors
+    :return: array of RGB colors
+    """
+    return xyz_to_rgb(lab_to_xyz(values))
+
+
+# Direct conversions between spaces, any other pair is routed through RGB
+_conversions = {
+    ('rgb', 'hsv'): rgb_to_hsv,
+    ('hsv', 'rgb'): hsv_to_rgb,
+    ('rgb', 'xyz'): rgb_to_xyz,
+    ('xyz', 'rgb'): xyz_to_rgb,
+    ('rgb', 'lab'): rgb_to_lab,
+    ('lab', 'rgb'): lab_to_rgb,
+    ('xyz', 'lab'): xyz_to_lab,
+    ('lab', 'xyz'): lab_to_xyz,
+}
+
+
+def convert(values, source, target):
+    """
+    Converts an array of colors from one color space to another.
+    :param values: array of colors in the source color space
+    :param source: color space of the given colors, one of 'rgb', 'hsv', 'xyz', or 'lab'
+    :param target: color space to convert to, one of 'rgb', 'hsv', 'xyz', or 'lab'
+    :return: array of colors in the target color space
+    :raise: if either color space isn't supported
+    """
+    if source not in SPACES or target not in SPACES:
+        raise ValueError('Invalid color space!')
+
+    if source == target:
+        return _join(*_split(values))
+    elif (source, target) in _conversions:
+        return _conversions[(source, target)](values)
+    return _conversions[('rgb', target)](_conversions[(source, 'rgb')](values))
+
+
+class ColorArray:
+    """
+    Represents an array of colors in a single color space, convertible to any other supported color space in bulk.
+    """
+
+    def __init__(self, values, space='rgb'):
+        """
+        Creates a ColorArray from an array of color components in the given color space.
+        :param values: array-like of colors whose last axis is of length 3, or 4 if alpha is included
+        :param space: color space of the given values, one of 'rgb', 'hsv', 'xyz', or 'lab'
+        :raise: if the given color space isn't supported or the values aren't shaped like colors
+        """
+        if space not in SPACES:
+            raise ValueError('Invalid color space!')
+
+        values = np.asarray(values)
+        if values.ndim < 1 or values.shape[-1] not in (3, 4):
+            raise ValueError('Last axis of a color array must be of length 3 or 4!')
+
+        self.values = values
+        self.space = space
+
+    def __len__(self):
+        return len(self.values)
+
+    @property
+    def has_alpha(self):
+        """
+        Returns if the colors of this ColorArray include an alpha component.
+        :return: if alpha is included
+        """
+        return self.values.shape[-1] == 4
+
+    def convert(self, space):
+        """
+        Converts this ColorArray to an equivalent ColorArray in the given color space.
+        :param space: color space to convert to
+        :return: ColorArray in the given color space
+        """
+        return ColorArray(convert(self.values, self.space, space), space)
+
+    def to_rgb(self):
+        return self.convert('rgb')
+
+    def to_hsv(self):
+        return self.convert('hsv')
+
+    def to_xyz(self):
+        return self.convert('xyz')
+
+    def to_lab(self):
+        return self.convert('lab')
+
+    def to_uint8(self):
+        """
+        Returns the colors of this ColorArray as RGB rounded into an unsigned 8-bit array, with alpha scaled from
+        [0, 100] onto [0, 255].
+        :return: uint8 array of RGB colors
+        """
+        values = self.to_rgb().values.astype(np.float64)
+        if self.has_alpha:
+            values = values.copy()
+            values[..., 3] *= 255 / MAX_ALPHA
+        return np.clip(np.round(values), 0, 255).astype(np.uint8)
+
+    def to_colors(self):
+        """
+        Returns the colors of this ColorArray as a flat list of RGB, HSV, or LAB objects, depending on its color space.
+        :return: list of color objects
+        :raise: if this ColorArray is in a color space without a color model
+        """
+        models = {'rgb': RGB, 'hsv': HSV, 'lab': LAB}
+        if self.space not in models:
+            raise ValueError('No color model exists for the XYZ color space!')
+
+        model = models[self.space]
+        values = self.values.reshape(-1, self.values.shape[-1]).tolist()
+        return [model(*components) for components in values]
+
+    @staticmethod
+    def from_colors(list_of_colors, space='rgb', alpha=False):
+        """
+        Creates a ColorArray from a list of RGB, HSV, or LAB objects, all of which must be of the same type.
+        :param list_of_colors: list of colors to include
+        :param space: color space of the given colors, one of 'rgb', 'hsv', or 'lab'
+        :param alpha: if each color's alpha value should be included
+        :return: ColorArray of the given colors
+        :raise: if the given color space isn't supported
+        """
+        attributes = {'rgb': ('red', 'green', 'blue'),
+                      'hsv': ('hue', 'saturation', 'value'),
+                      'lab': ('light', 'a', 'b')}
+        if space not in attributes:
+            raise ValueError('Invalid color space!')
+
+        names = attributes[space]
+        if alpha:
+            names += ('alpha',)
+
+        values = [[getattr(color, name) for name in names] for color in list_of_colors]
+        return ColorArray(np.array(values, dtype=np.float64).reshape(-1, len(names)), space)
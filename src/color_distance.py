@@ -0,0 +1,231 @@
+import numpy as np
+from color_arrays import ColorArray
+from spatial_index import GridIndex
+
+"""
+Perceptual color differences (Delta E) between arrays of LAB colors, and nearest color lookups against a palette.
+"""
+
+'''
+Every Delta E function takes two arrays of LAB colors that broadcast against each other, so comparing one color to a
+palette, a palette to a palette, or an image to a single color all work the same way. Alpha components are ignored.
+A Delta E of about 2.3 is commonly taken as the smallest difference the eye can notice.
+'''
+
+JUST_NOTICEABLE_DIFFERENCE = 2.3
+
+
+def _lab_components(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    return lab[..., 0], lab[..., 1], lab[..., 2]
+
+
+def delta_e_76(lab_a, lab_b):
+    """
+    CIE76 color difference, the euclidean distance between two LAB colors.
+    :param lab_a: array of LAB colors
+    :param lab_b: array of LAB colors
+    :return: array of color differences
+    """
+    light_a, a_a, b_a = _lab_components(lab_a)
+    light_b, a_b, b_b = _lab_components(lab_b)
+    return np.sqrt(((light_a - light_b) ** 2) + ((a_a - a_b) ** 2) + ((b_a - b_b) ** 2))
+
+
+def delta_e_94(lab_a, lab_b, k_l=1, k_c=1, k_h=1, k_1=.045, k_2=.015):
+    """
+    CIE94 color difference, using the graphic arts constants by default. Not symmetric, the first colors are taken as
+    the reference colors.
+    :param lab_a: array of reference LAB colors
+    :param lab_b: array of LAB colors
+    :param k_l: lightness weighting factor
+    :param k_c: chroma weighting factor
+    :param k_h: hue weighting factor
+    :param k_1: chroma scaling constant
+    :param k_2: hue scaling constant
+    :return: array of color differences
+    """
+    light_a, a_a, b_a = _lab_components(lab_a)
+    light_b, a_b, b_b = _lab_components(lab_b)
+
+    chroma_a = np.sqrt((a_a ** 2) + (b_a ** 2))
+    chroma_b = np.sqrt((a_b ** 2) + (b_b ** 2))
+    delta_light = light_a - light_b
+    delta_chroma = chroma_a - chroma_b
+    delta_hue_squared = np.maximum(((a_a - a_b) ** 2) + ((b_a - b_b) ** 2) - (delta_chroma ** 2), 0)
+
+    s_c = 1 + (k_1 * chroma_a)
+    s_h = 1 + (k_2 * chroma_a)
+    return np.sqrt(((delta_light / k_l) ** 2) + ((delta_chroma / (k_c * s_c)) ** 2) +
+                   (delta_hue_squared / ((k_h * s_h) ** 2)))
+
+
+def delta_e_2000(lab_a, lab_b, k_l=1, k_c=1, k_h=1):
+    """
+    CIEDE2000 color difference.
+    :param lab_a: array of LAB colors
+    :param lab_b: array of LAB colors
+    :param k_l: lightness weighting factor
+    :param k_c: chroma weighting factor
+    :param k_h: hue weighting factor
+    :return: array of color differences
+    """
+    light_a, a_a, b_a = _lab_components(lab_a)
+    light_b, a_b, b_b = _lab_components(lab_b)
+
+    chroma_mean = (np.sqrt((a_a ** 2) + (b_a ** 2)) + np.sqrt((a_b ** 2) + (b_b ** 2))) / 2
+    g = .5 * (1 - np.sqrt((chroma_mean ** 7) / ((chroma_mean ** 7) + (25 ** 7))))
+    a_a = (1 + g) * a_a
+    a_b = (1 + g) * a_b
+
+    chroma_a = np.sqrt((a_a ** 2) + (b_a ** 2))
+    chroma_b = np.sqrt((a_b ** 2) + (b_b ** 2))
+    hue_a = np.degrees(np.arctan2(b_a, a_a)) % 360
+    hue_b = np.degrees(np.arctan2(b_b, a_b)) % 360
+    achromatic = (chroma_a * chroma_b) == 0
+
+    delta_light = light_b - light_a
+    delta_chroma = chroma_b - chroma_a
+    delta_hue = hue_b - hue_a
+    delta_hue = np.where(delta_hue > 180, delta_hue - 360, np.where(delta_hue < -180, delta_hue + 360, delta_hue))
+    delta_hue = np.where(achromatic, 0, delta_hue)
+    delta_hue = 2 * np.sqrt(chroma_a * chroma_b) * np.sin(np.radians(delta_hue / 2))
+
+    light_mean = (light_a + light_b) / 2
+    chroma_mean = (chroma_a + chroma_b) / 2
+    hue_sum = hue_a + hue_b
+    hue_mean = np.where(np.abs(hue_a - hue_b) <= 180, hue_sum / 2,
+                        np.where(hue_sum < 360, (hue_sum + 360) / 2, (hue_sum - 360) / 2))
+    hue_mean = np.where(achromatic, hue_sum, hue_mean)
+
+    t = (1 - (.17 * np.cos(np.radians(hue_mean - 30))) + (.24 * np.cos(np.radians(2 * hue_mean))) +
+         (.32 * np.cos(np.radians((3 * hue_mean) + 6))) - (.20 * np.cos(np.radians((4 * hue_mean) - 63))))
+    delta_theta = 30 * np.exp(-(((hue_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt((chroma_mean ** 7) / ((chroma_mean ** 7) + (25 ** 7)))
+    s_l = 1 + ((.015 * ((light_mean - 50) ** 2)) / np.sqrt(20 + ((light_mean - 50) ** 2)))
+    s_c = 1 + (.045 * chroma_mean)
+    s_h = 1 + (.015 * chroma_mean * t)
+    r_t = -np.sin(np.radians(2 * delta_theta)) * r_c
+
+    light_term = delta_light / (k_l * s_l)
+    chroma_term = delta_chroma / (k_c * s_c)
+    hue_term = delta_hue / (k_h * s_h)
+    return np.sqrt((light_term ** 2) + (chroma_term ** 2) + (hue_term ** 2) + (r_t * chroma_term * hue_term))
+
+
+FORMULAS = {'76': delta_e_76, '94': delta_e_94, '2000': delta_e_2000}
+
+
+def to_lab_array(list_of_colors):
+    """
+    Returns the given colors as an (N, 3) array of LAB colors.
+    :param list_of_colors: list of RGB, HSV, or LAB objects, or an array of LAB colors
+    :return: array of LAB colors
+    """
+    if isinstance(list_of_colors, np.ndarray):
+        return list_of_colors[..., :3].astype(np.float64)
+
+    labs = [color if hasattr(color, 'light') else color.to_lab() for color in list_of_colors]
+    return ColorArray.from_colors(labs, 'lab').values
+
+
+def delta_e(color_a, color_b, formula='2000'):
+    """
+    Returns the perceptual difference between two RGB, HSV, or LAB objects.
+    :param color_a: first color to compare
+    :param color_b: second color to compare
+    :param formula: Delta E formula to use, one of '76', '94', or '2000'
+    :return: difference between the two colors
+    :raise: if the given formula isn't supported
+    """
+    if formula not in FORMULAS:
+        raise ValueError('Formula must be one of 76, 94, or 2000!')
+
+    lab_a, lab_b = to_lab_array([color_a, color_b])
+    return float(FORMULAS[formula](lab_a, lab_b))
+
+
+class PaletteIndex:
+    """
+    Represents a palette of colors prepared for finding the nearest palette color to large numbers of LAB colors.
+    """
+
+    # LAB colors of every RGB color fall within these bounds, so queries converted from RGB never leave the grid
+    lab_bounds = ((0, -128, -128), (100, 128, 128))
+    cell_size = 8  # Side length of each grid cell, in Delta E
+
+    def __init__(self, palette, formula='76', chunk_size=1 << 20):
+        """
+        Creates a PaletteIndex from a palette of colors.
+        :param palette: list of RGB, HSV, or LAB objects, or an array of LAB colors
+        :param formula: Delta E formula to measure nearness with, one of '76', '94', or '2000'
+        :param chunk_size: greatest number of color differences to compute at once, bounding memory use
+        :raise: if the palette is empty or the formula isn't supported
+        """
+        if formula not in FORMULAS:
+            raise ValueError('Formula must be one of 76, 94, or 2000!')
+
+        self.palette = to_lab_array(palette)
+        if len(self.palette) < 1:
+            raise ValueError('Palette must contain at least one color!')
+
+        self.formula = formula
+        self.chunk_size = chunk_size
+
+        # CIE76 is plain euclidean distance in LAB, so a spatial grid answers it exactly, the others are checked in full
+        if formula == '76':
+            self.grid = GridIndex(self.palette, 'euclidean', cell_size=PaletteIndex.cell_size,
+                                  bounds=PaletteIndex.lab_bounds, max_cells=1 << 16, chunk_size=chunk_size)
+        else:
+            self.grid = None
+
+    def __len__(self):
+        return len(self.palette)
+
+    def nearest(self, lab):
+        """
+        Finds the nearest palette color to each of the given LAB colors, ties going to the earliest palette color.
+        :param lab: array of LAB colors of any shape, last axis of length 3 or 4
+        :return: tuple of an array of palette indices and an array of the differences to them, shaped like the input
+        minus its last axis
+        """
+        lab = np.asarray(lab, dtype=np.float64)
+        shape = lab.shape[:-1]
+        lab = lab[..., :3].reshape(-1, 3)
+
+        if self.grid is not None:
+            indices, distances = self.grid.query(lab)
+        else:
+            indices = np.empty(len(lab), dtype=np.intp)
+            distances = np.empty(len(lab), dtype=np.float64)
+            step = max(1, self.chunk_size // len(self.palette))
+            for start in range(0, len(lab), step):
+                dists = FORMULAS[self.formula](lab[start:start + step, None, :], self.palette[None, :, :])
+                best = dists.argmin(axis=1)
+                indices[start:start + step] = best
+                distances[start:start + step] = dists[np.arange(len(best)), best]
+
+        return indices.reshape(shape), distances.reshape(shape)
+
+
+def deduplicate(list_of_colors, threshold=JUST_NOTICEABLE_DIFFERENCE, formula='2000'):
+    """
+    Removes colors that are near-identical to an earlier color in the given list.
+    :param list_of_colors: list of RGB, HSV, or LAB objects
+    :param threshold: colors closer than this to an already kept color are dropped
+    :param formula: Delta E formula to measure nearness with, one of '76', '94', or '2000'
+    :return: list of the kept colors, in their original order
+    """
+    if formula not in FORMULAS:
+        raise ValueError('Formula must be one of 76, 94, or 2000!')
+    elif len(list_of_colors) == 0:
+        return []
+
+    labs = to_lab_array(list_of_colors)
+    differences = FORMULAS[formula](labs[:, None, :], labs[None, :, :])
+
+    kept = []
+    for idx in range(len(labs)):
+        if all(differences[other, idx] >= threshold for other in kept):
+            kept.append(idx)
+    return [list_of_colors[idx] for idx in kept]
@@ -20,11 +20,77 @@ MIN_VALUE = 0  # Minimum value for any color component, including alpha.
 MAX_RGB = 255
 MAX_ALPHA = 100  # Default and maximum alpha value
 
+_linearization_table = None  # Linear values of every 8-bit RGB channel value, built on first use
+
+
+def _linearize(channel):
+    """
+    Applies the sRGB companding inverse to a single RGB channel value - the first step of converting an RGB to the XYZ
+    color space.
+    :param channel: red, green, or blue value in range [0, 255]
+    :return: linear channel value in range [0, 100]
+    """
+    var = channel / 255.0
+    if var > .04045:
+        var = (((var + .055) / 1.055) ** 2.4)
+    else:
+        var /= 12.92
+
+    return var * 100.0
+
+
+def linearization_table():
+    """
+    Returns a table of the linear value of every 8-bit RGB channel value, built the first time it is asked for.
+    :return: list of 256 linear channel values, indexed by channel value
+    """
+    global _linearization_table
+    if _linearization_table is None:
+        _linearization_table = [_linearize(channel) for channel in range(MAX_RGB + 1)]
+    return _linearization_table
+
+
+def linearize_channel(channel):
+    """
+    Returns the linear value of a single RGB channel value, looked up from the linearization table if the channel
+    value is a whole number.
+    :param channel: red, green, or blue value in range [0, 255]
+    :return: linear channel value in range [0, 100]
+    :raise: if a whole number channel value is outside of the table
+    """
+    if isinstance(channel, int):
+        if not 0 <= channel <= MAX_RGB:
+            raise ValueError('Channel value must be in range [0, 255]!')
+        return linearization_table()[channel]
+    return _linearize(channel)
+
+
+class _Frozen:
+    """
+    Mixin making a color model immutable once each of its components has been set, and thereby hashable.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        if hasattr(self, name):
+            raise AttributeError(f'{type(self).__name__} is immutable!')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable!')
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.components() == other.components()
+
+    def __hash__(self):
+        return hash(self.components())
+
 
 class RGB:
     """
     Represents a color in the RGB space.
     """
+    __slots__ = ('red', 'green', 'blue', 'alpha')
 
     def __init__(self, red: int, green: int, blue: int, alpha: int =MAX_ALPHA):
         """
@@ -49,6 +115,37 @@ class RGB:
         self.blue = blue
         self.alpha = alpha
 
+    @classmethod
+    def _trusted(cls, red, green, blue, alpha=MAX_ALPHA):
+        """
+        Creates a RGB object without validating its components, for internal use where they're known to be in range.
+        :param red: red value to set for this RGB
+        :param green: green value for this RGB
+        :param blue: blue value for this RGB
+        :param alpha: optional alpha composite value for this RGB object
+        :return: RGB object with the given components
+        """
+        color = object.__new__(cls)
+        object.__setattr__(color, 'red', red)
+        object.__setattr__(color, 'green', green)
+        object.__setattr__(color, 'blue', blue)
+        object.__setattr__(color, 'alpha', alpha)
+        return color
+
+    def components(self):
+        """
+        Returns the unrounded red, green, blue, and alpha components of this RGB as a tuple.
+        :return: tuple of this RGB's individual components (with alpha)
+        """
+        return self.red, self.green, self.blue, self.alpha
+
+    def freeze(self):
+        """
+        Returns an immutable, hashable copy of this RGB.
+        :return: FrozenRGB with the same components as this RGB
+        """
+        return FrozenRGB._trusted(self.red, self.green, self.blue, self.alpha)
+
     def output(self):
         """
         Returns the individual red, green, and blue components of this RGB as a tuple - rounded to nearest int.
@@ -118,7 +215,7 @@ class RGB:
 
         value = c_max * 100
 
-        to_return = HSV(hue, saturation, value, self.alpha)
+        to_return = HSV._trusted(hue, saturation, value, self.alpha)
 
         return to_return
 
@@ -127,23 +224,9 @@ class RGB:
         Converts this RGB to an equivalent LAB object representing the same color.
         :return: LAB object representing same color as this RGB
         """
-        red = self.red / 255.0
-        green = self.green / 255.0
-        blue = self.blue / 255.0
-
-        def xyz_mid_transform(var):
-            if var > .04045:
-                var = (((var + .055) / 1.055) ** 2.4)
-            else:
-                var /= 12.92
-
-            var *= 100.0
-
-            return var
-
-        red = xyz_mid_transform(red)
-        green = xyz_mid_transform(green)
-        blue = xyz_mid_transform(blue)
+        red = linearize_channel(self.red)
+        green = linearize_channel(self.green)
+        blue = linearize_channel(self.blue)
 
         # RGB -> XYZ transformation variables
         x = ((red * .4124564) + (green * .3575761) + (blue * .1804375)) / ref_x
@@ -169,7 +252,7 @@ class RGB:
         elif 100 <= light:
             light = 100
 
-        return LAB(light, a, b, self.alpha)
+        return LAB._trusted(light, a, b, self.alpha)
 
     @staticmethod
     def random_rgb():
@@ -180,7 +263,7 @@ class RGB:
         red = random.randint(MIN_VALUE, MAX_RGB)
         green = random.randint(MIN_VALUE, MAX_RGB)
         blue = random.randint(MIN_VALUE, MAX_RGB)
-        return RGB(red, green, blue)
+        return RGB._trusted(red, green, blue)
 
     @staticmethod
     def n_random_rbg(n=random.randint(3, 8)):
@@ -223,6 +306,7 @@ class HSV:
     """
     Represents a color in the HSV color space.
     """
+    __slots__ = ('hue', 'saturation', 'value', 'alpha')
     max_hue = 360
     max_sv = 100
 
@@ -254,6 +338,37 @@ class HSV:
         self.value = value
         self.alpha = alpha
 
+    @classmethod
+    def _trusted(cls, hue, saturation, value, alpha=MAX_ALPHA):
+        """
+        Creates a HSV object without validating its components, for internal use where they're known to be in range.
+        :param hue: hue value for this HSV object
+        :param saturation: saturation value for this HSV object
+        :param value: value value for this HSV object
+        :param alpha: optional alpha composite value for this HSV object
+        :return: HSV object with the given components
+        """
+        color = object.__new__(cls)
+        object.__setattr__(color, 'hue', 0 if hue == HSV.max_hue else hue)
+        object.__setattr__(color, 'saturation', saturation)
+        object.__setattr__(color, 'value', value)
+        object.__setattr__(color, 'alpha', alpha)
+        return color
+
+    def components(self):
+        """
+        Returns the unrounded hue, saturation, value, and alpha components of this HSV as a tuple.
+        :return: tuple of this HSV's individual components (with alpha)
+        """
+        return self.hue, self.saturation, self.value, self.alpha
+
+    def freeze(self):
+        """
+        Returns an immutable, hashable copy of this HSV.
+        :return: FrozenHSV with the same components as this HSV
+        """
+        return FrozenHSV._trusted(self.hue, self.saturation, self.value, self.alpha)
+
     def output(self):
         """
         Returns the individual hue, saturation, and value components of this HSV as a tuple - rounded to nearest int.
@@ -349,7 +464,7 @@ class HSV:
         elif blue < 0:
             blue = 0
 
-        return RGB(red, green, blue, self.alpha)
+        return RGB._trusted(red, green, blue, self.alpha)
 
     def to_lab(self):
         """
@@ -369,13 +484,14 @@ class HSV:
         hue = random.randint(MIN_VALUE, HSV.max_hue)
         saturation = random.randint(MIN_VALUE, HSV.max_sv)
         value = random.randint(MIN_VALUE, HSV.max_sv)
-        return HSV(hue, saturation, value)
+        return HSV._trusted(hue, saturation, value)
 
 
 class LAB:
     """
     Represents a color in the LAB color space.
     """
+    __slots__ = ('light', 'a', 'b', 'alpha')
     max_light = 100
 
     def __init__(self, light: int, a: int, b: int, alpha: int =MAX_ALPHA):
@@ -397,6 +513,37 @@ class LAB:
         self.b = b
         self.alpha = alpha
 
+    @classmethod
+    def _trusted(cls, light, a, b, alpha=MAX_ALPHA):
+        """
+        Creates a LAB object without validating its components, for internal use where they're known to be in range.
+        :param light: light value for this LAB
+        :param a: a value for this lab
+        :param b: b value for this lab
+        :param alpha: optional alpha composite value for this LAB
+        :return: LAB object with the given components
+        """
+        color = object.__new__(cls)
+        object.__setattr__(color, 'light', light)
+        object.__setattr__(color, 'a', a)
+        object.__setattr__(color, 'b', b)
+        object.__setattr__(color, 'alpha', alpha)
+        return color
+
+    def components(self):
+        """
+        Returns the unrounded light, a, b, and alpha components of this LAB as a tuple.
+        :return: tuple of this LAB's individual components (with alpha)
+        """
+        return self.light, self.a, self.b, self.alpha
+
+    def freeze(self):
+        """
+        Returns an immutable, hashable copy of this LAB.
+        :return: FrozenLAB with the same components as this LAB
+        """
+        return FrozenLAB._trusted(self.light, self.a, self.b, self.alpha)
+
     def output(self):
         """
         Returns the individual light, a, and b components of this LAB as a tuple - rounded to nearest int.
@@ -492,7 +639,7 @@ class LAB:
         elif MAX_RGB <= blue:
             blue = MAX_RGB
 
-        return RGB(red, green, blue, self.alpha)
+        return RGB._trusted(red, green, blue, self.alpha)
 
     def to_hsv(self):
         """
@@ -514,3 +661,24 @@ class LAB:
         a = random.randint(-a_b_range, a_b_range)
         b = random.randint(-a_b_range, a_b_range)
         return LAB(light, a, b)
+
+
+class FrozenRGB(_Frozen, RGB):
+    """
+    Represents an immutable color in the RGB space, usable as a dictionary key or set member.
+    """
+    __slots__ = ()
+
+
+class FrozenHSV(_Frozen, HSV):
+    """
+    Represents an immutable color in the HSV color space, usable as a dictionary key or set member.
+    """
+    __slots__ = ()
+
+
+class FrozenLAB(_Frozen, LAB):
+    """
+    Represents an immutable color in the LAB color space, usable as a dictionary key or set member.
+    """
+    __slots__ = ()
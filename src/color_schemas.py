@@ -42,7 +42,7 @@ def n_colors_over_saturation_range(starting_color=RGB.random_rgb(), n=random_num
     cur_sat = (HSV.max_sv / 2) - (saturation / 2)
     results = []
     for idx in range(n):
-        to_add = HSV(starting_color.hue, starting_color.saturation, cur_sat)
+        to_add = HSV._trusted(starting_color.hue, starting_color.saturation, cur_sat)
         results.append(to_add.to_rgb())
         cur_sat += increment
 
@@ -68,7 +68,7 @@ def n_colors_over_value_range(starting_color=RGB.random_rgb(), n=random_number_o
     cur_value = (HSV.max_sv / 2) - (value / 2)
     results = []
     for idx in range(n):
-        to_add = HSV(starting_color.hue, starting_color.saturation, cur_value)
+        to_add = HSV._trusted(starting_color.hue, starting_color.saturation, cur_value)
         results.append(to_add.to_rgb())
         cur_value += increment
 
@@ -97,7 +97,7 @@ def n_similar_colors(starting_color=RGB.random_rgb(), n=random_number_of_colors(
     cur_hue = start
     results = []
     for idx in range(n + 1):
-        to_add = HSV(cur_hue, starting_color.saturation, starting_color.value).to_rgb()
+        to_add = HSV._trusted(cur_hue, starting_color.saturation, starting_color.value).to_rgb()
         results.append(to_add)
         cur_hue = (cur_hue + increment) % 360
 
@@ -119,7 +119,7 @@ def n_evenly_spaced_colors(starting_color=RGB.random_rgb(), n=random_number_of_c
 
     for new_color in range(n):
         cur_hue = (cur_hue + increment) % 360
-        to_add = HSV(cur_hue, starting_color.saturation, starting_color.value)
+        to_add = HSV._trusted(cur_hue, starting_color.saturation, starting_color.value)
         results.append(to_add.to_rgb())
 
     return results
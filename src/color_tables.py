@@ -0,0 +1,109 @@
+import os
+import numpy as np
+from color_arrays import rgb_to_lab, MAX_RGB
+
+"""
+Precomputed lookup tables for converting 8-bit RGB colors, stored on disk so they can be shared between processes.
+"""
+
+'''
+The RGB -> LAB cube holds the LAB value of every one of the 256^3 8-bit RGB colors as float32s, roughly 200MB. It is
+built once, saved as a .npy file, and afterwards memory-mapped rather than read, so loading it takes milliseconds and
+every process converting colors shares the same pages of it through the operating system.
+'''
+
+CUBE_SIZE = MAX_RGB + 1
+
+_cubes = dict()  # Already opened cubes, keyed by the path they were loaded from
+
+
+def default_cube_path():
+    """
+    Returns the path the RGB -> LAB cube is stored at when no other path is given, inside the resources folder.
+    :return: path to the default RGB -> LAB cube
+    """
+    rootpath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(rootpath, 'resources', 'rgb_to_lab.npy')
+
+
+def build_rgb_to_lab_cube(path, size=CUBE_SIZE):
+    """
+    Computes the LAB value of every 8-bit RGB color and saves them as a (size, size, size, 3) .npy file at the given
+    path, one red plane at a time so only a single plane is ever held in memory.
+    :param path: path to save the cube to
+    :param size: number of values of each channel the cube covers, from 0, only the colors with every channel below it
+    can be looked up in a smaller cube
+    :return: None
+    :raise: if the size is outside 1-256
+    """
+    if not 1 <= size <= CUBE_SIZE:
+        raise ValueError(f'Cube size must be from 1 to {CUBE_SIZE}!')
+
+    temp_path = path + '.partial.npy'
+    cube = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.float32, shape=(size, size, size, 3))
+
+    channel = np.arange(size, dtype=np.uint8)
+    green, blue = np.meshgrid(channel, channel, indexing='ij')
+    plane = np.empty((size, size, 3), dtype=np.uint8)
+    plane[..., 1] = green
+    plane[..., 2] = blue
+    for red in range(size):
+        plane[..., 0] = red
+        cube[red] = rgb_to_lab(plane)
+
+    cube.flush()
+    del cube
+    os.replace(temp_path, path)  # Other processes only ever see a complete cube
+
+
+def rgb_to_lab_cube(path=None, build=True, size=CUBE_SIZE):
+    """
+    Returns a read only, memory-mapped view of the RGB -> LAB cube, indexed as cube[red, green, blue]. The cube is
+    built and saved first if it doesn't exist yet.
+    :param path: path of the cube, the default cube path if not given
+    :param build: if the cube should be built when it doesn't exist yet
+    :param size: number of values of each channel the cube covers if it is built, see build_rgb_to_lab_cube
+    :return: memory-mapped (256, 256, 256, 3) array of LAB values, or smaller if the cube was built smaller
+    :raise: if the cube doesn't exist and building it isn't allowed
+    """
+    if path is None:
+        path = default_cube_path()
+
+    if path not in _cubes:
+        if not os.path.exists(path):
+            if not build:
+                raise FileNotFoundError(f'No RGB -> LAB cube exists at {path}!')
+            build_rgb_to_lab_cube(path, size)
+        _cubes[path] = np.load(path, mmap_mode='r')
+
+    return _cubes[path]
+
+
+def close_rgb_to_lab_cube(path=None):
+    """
+    Forgets an opened RGB -> LAB cube, so its memory map is let go of once nothing else refers to it, and its file can
+    be removed or rebuilt. Closing a cube that isn't open does nothing.
+    :param path: path of the cube, the default cube path if not given
+    :return: None
+    """
+    if path is None:
+        path = default_cube_path()
+    _cubes.pop(path, None)
+
+
+def lookup_lab(values, cube=None):
+    """
+    Converts an array of 8-bit RGB colors to LAB by looking each color up in the RGB -> LAB cube, alpha is passed
+    through untouched.
+    :param values: array of RGB colors with whole number components, last axis of length 3 or 4
+    :param cube: RGB -> LAB cube to use, the default cube if not given
+    :return: array of LAB colors
+    """
+    if cube is None:
+        cube = rgb_to_lab_cube()
+
+    values = np.asarray(values)
+    lab = cube[values[..., 0], values[..., 1], values[..., 2]].astype(np.float64)
+    if values.shape[-1] == 4:
+        return np.concatenate((lab, values[..., 3:].astype(np.float64)), axis=-1)
+    return lab
@@ -0,0 +1,159 @@
+import math
+import numpy as np
+from image_arrays import to_image
+
+"""
+Stacks generator outputs as layers into a single image, blending them over premultiplied alpha arrays.
+"""
+
+'''
+Layers are composited bottom to top in a single pass over the image, a strip of rows at a time: each strip of every
+layer is read straight out of the layer's pixels (transforms are views, not copies), blended into a small premultiplied
+float accumulator, then written once into the output. Apart from the output image, memory use is bounded by the size
+of a strip no matter how many layers are stacked.
+
+Alpha is read as PIL reads it, a byte out of 255, so stacking layers with the 'normal' blend mode gives (to within
+rounding) the same image as chaining Image.alpha_composite. Blend modes follow the W3C compositing model - the blended
+color shows where both the layer and what's beneath it are opaque, and the layer is then composited over the rest.
+'''
+
+MAX_BYTE = 255
+STRIP_HEIGHT = 64  # Rows composited at a time
+
+# Each transform as a view of a (height, width, channels) array, along with how a transform changing the layer's shape
+# is rounded when centered on the image - matching Image.rotate, which crops or pads rotated layers about the center
+TRANSFORMS = {
+    None: (lambda pixels: pixels, math.floor, math.floor),
+    'rotate_90': (lambda pixels: np.rot90(pixels, 1), math.ceil, math.floor),
+    'rotate_180': (lambda pixels: np.rot90(pixels, 2), math.floor, math.floor),
+    'rotate_270': (lambda pixels: np.rot90(pixels, 3), math.floor, math.ceil),
+    'flip_horizontal': (lambda pixels: pixels[:, ::-1], math.floor, math.floor),
+    'flip_vertical': (lambda pixels: pixels[::-1], math.floor, math.floor),
+}
+
+
+def _normal(color, alpha, below, below_alpha):
+    return color
+
+
+def _multiply(color, alpha, below, below_alpha):
+    return color * ((1 - below_alpha) + below)
+
+
+def _screen(color, alpha, below, below_alpha):
+    return (color * (1 - below)) + (below * alpha)
+
+
+def _average(color, alpha, below, below_alpha):
+    return (color * (1 - (below_alpha / 2))) + (below * (alpha / 2))
+
+
+# Every blend mode composites a layer as below * (1 - alpha) + blended, in premultiplied color - each function gives
+# the blended term from the premultiplied colors and alphas of the layer and of what's beneath it
+BLEND_MODES = {'normal': _normal, 'multiply': _multiply, 'screen': _screen, 'average': _average}
+
+
+class Layer:
+    """
+    Represents an image to be composited, along with how it's transformed and blended onto the layers beneath it.
+    """
+
+    def __init__(self, image, transform=None, blend='normal'):
+        """
+        Creates a Layer from an image.
+        :param image: PIL image or (height, width, channels) uint8 array of RGB or RGBA pixels, images in other modes
+        are converted to RGBA first
+        :param transform: None, 'rotate_90', 'rotate_180', or 'rotate_270' to rotate the layer counterclockwise as by
+        Image.rotate, or 'flip_horizontal' or 'flip_vertical' to mirror it
+        :param blend: how the layer is blended with the layers beneath it, 'normal', 'multiply', 'screen', or 'average'
+        :raise: if the transform, blend mode, or pixels aren't supported
+        """
+        if transform not in TRANSFORMS:
+            raise ValueError('Invalid transform!')
+        elif blend not in BLEND_MODES:
+            raise ValueError('Blend mode must be normal, multiply, screen, or average!')
+
+        if not isinstance(image, np.ndarray):
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            image = np.asarray(image)
+        if image.ndim != 3 or image.shape[-1] not in (3, 4):
+            raise ValueError('Layer must be an image of RGB or RGBA pixels!')
+
+        self.pixels = TRANSFORMS[transform][0](image)
+        self.transform = transform
+        self.blend = blend
+
+    @property
+    def size(self):
+        return self.pixels.shape[1], self.pixels.shape[0]
+
+    def placement(self, width, height):
+        """
+        Returns where the layer's upper left corner lands in an image, centered on it.
+        :param width: width of the image
+        :param height: height of the image
+        :return: tuple of the layer's left and upper offsets into the image, negative if it overhangs
+        """
+        _, round_vertical, round_horizontal = TRANSFORMS[self.transform]
+        return round_horizontal((width - self.size[0]) / 2), round_vertical((height - self.size[1]) / 2)
+
+
+def composite(layers, size=None, strip_height=STRIP_HEIGHT):
+    """
+    Composites layers onto each other, from the bottom up, onto a transparent image.
+    :param layers: list of Layers, bottommost first
+    :param size: (width, height) of the image, the size of the bottom layer if not given - other layers are centered
+    on it, cropped or padded with transparency as needed
+    :param strip_height: number of rows to composite at a time, bounding memory use
+    :return: RGBA image of the composited layers
+    :raise: if no layers are given
+    """
+    if len(layers) == 0:
+        raise ValueError('Must be given at least one layer!')
+
+    width, height = layers[0].size if size is None else size
+    placements = [layer.placement(width, height) for layer in layers]
+    output = np.empty((height, width, 4), dtype=np.uint8)
+
+    for top in range(0, height, strip_height):
+        bottom = min(top + strip_height, height)
+        accumulated = np.zeros((bottom - top, width, 4), dtype=np.float32)  # Premultiplied color, then alpha
+
+        for layer, (left, upper) in zip(layers, placements):
+            # Rows and columns of the strip the layer covers
+            first_row = max(top, upper)
+            last_row = min(bottom, upper + layer.size[1])
+            first_column = max(0, left)
+            last_column = min(width, left + layer.size[0])
+            if first_row >= last_row or first_column >= last_column:
+                continue
+
+            pixels = layer.pixels[first_row - upper:last_row - upper, first_column - left:last_column - left]
+            source = np.empty(pixels.shape[:2] + (4,), dtype=np.float32)
+            source[..., :pixels.shape[-1]] = pixels
+            if pixels.shape[-1] == 3:
+                source[..., 3] = MAX_BYTE
+            source *= 1 / MAX_BYTE
+            alpha = source[..., 3:]
+            source[..., :3] *= alpha
+
+            below = accumulated[first_row - top:last_row - top, first_column:last_column]
+            if layer.blend == 'normal':
+                below *= 1 - alpha
+                below += source
+            else:
+                blended = BLEND_MODES[layer.blend](source[..., :3], alpha, below[..., :3], below[..., 3:])
+                below *= 1 - alpha
+                below[..., :3] += blended
+                below[..., 3:] += alpha
+
+        # Back to straight alpha, fully transparent pixels left black
+        alpha = accumulated[..., 3:]
+        np.divide(accumulated[..., :3], alpha, out=accumulated[..., :3], where=alpha > 0)
+        accumulated *= MAX_BYTE
+        np.rint(accumulated, out=accumulated)
+        np.clip(accumulated, 0, MAX_BYTE, out=accumulated)
+        output[top:bottom] = accumulated
+
+    return to_image(output, mode='RGBA')
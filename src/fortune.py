@@ -0,0 +1,294 @@
+import heapq
+import math
+import numpy as np
+
+"""
+Fortune's sweep line algorithm for exact euclidean Voronoi diagrams, given as a polygon per feature point rather than a
+label per pixel.
+"""
+
+'''
+A horizontal line sweeps down the image (towards increasing y) over the feature points, sorted by y. Everything above
+the line closer to a feature point than to the line is settled, and the boundary of that region, the beach line, is a
+row of parabolic arcs, one per feature point still able to claim more of the image. A feature point reached by the line
+splits the arc above it around a new arc of its own, and an arc squeezed to nothing between its neighbors, the moment
+the line reaches the bottom of the circle through the three feature points, drops out of the beach line. Every two
+feature points ever next to each other on the beach line share an edge of their cells, which makes them neighbors in the
+Delaunay triangulation.
+
+Each cell is then the box of the image cut down by the bisector with each of its feature point's neighbors - on average
+six of them - so the whole diagram costs O(K log K) for K feature points, with no work done per pixel.
+'''
+
+EPSILON = 1e-9
+
+
+def _breakpoint(left, right, sweep):
+    """
+    Finds where the arcs of two feature points meet on the beach line.
+    :param left: (x, y) feature point of the arc on the left
+    :param right: (x, y) feature point of the arc on the right
+    :param sweep: y value of the sweep line
+    :return: x value of the point the arcs meet at
+    """
+    (left_x, left_y), (right_x, right_y) = left, right
+    if left_y == right_y:
+        return (left_x + right_x) / 2
+    elif left_y == sweep:
+        return left_x
+    elif right_y == sweep:
+        return right_x
+
+    # Each arc is y = ((x - px)^2 + py^2 - sweep^2) / (2 * (py - sweep)), and the left arc is the lower one (nearer the
+    # sweep line) just left of where they meet, so the difference of the arcs falls through zero there
+    left_scale = 1 / (2 * (left_y - sweep))
+    right_scale = 1 / (2 * (right_y - sweep))
+    a = left_scale - right_scale
+    b = -2 * ((left_x * left_scale) - (right_x * right_scale))
+    c = (((left_x * left_x) + (left_y * left_y) - (sweep * sweep)) * left_scale) - \
+        (((right_x * right_x) + (right_y * right_y) - (sweep * sweep)) * right_scale)
+    root = math.sqrt(max(0, (b * b) - (4 * a * c)))
+    if b < 0:
+        return (2 * c) / (root - b)  # Same root, without the cancellation of -b - root
+    return (-b - root) / (2 * a)
+
+
+def _circle_bottom(left, middle, right):
+    """
+    Finds where the sweep line reaches the bottom of the circle through three feature points, if the arc of the middle
+    one is being squeezed out of the beach line between the others.
+    :param left: (x, y) feature point of the arc on the left
+    :param middle: (x, y) feature point of the middle arc
+    :param right: (x, y) feature point of the arc on the right
+    :return: y value of the bottom of the circle, or None if the arcs' meeting points aren't converging
+    """
+    (ax, ay), (bx, by), (cx, cy) = left, middle, right
+    if ((bx - ax) * (cy - by)) - ((by - ay) * (cx - bx)) <= 0:
+        return None
+
+    d = 2 * ((ax * (by - cy)) + (bx * (cy - ay)) + (cx * (ay - by)))
+    a_squared = (ax * ax) + (ay * ay)
+    b_squared = (bx * bx) + (by * by)
+    c_squared = (cx * cx) + (cy * cy)
+    center_x = ((a_squared * (by - cy)) + (b_squared * (cy - ay)) + (c_squared * (ay - by))) / d
+    center_y = ((a_squared * (cx - bx)) + (b_squared * (ax - cx)) + (c_squared * (bx - ax))) / d
+    return center_y + math.hypot(ax - center_x, ay - center_y)
+
+
+class _Arc:
+    """
+    Represents an arc of the beach line, along with the circle event, if any, that will squeeze it out.
+    """
+
+    __slots__ = ('site', 'event')
+
+    def __init__(self, site):
+        self.site = site
+        self.event = None
+
+
+def delaunay_neighbors(feature_points):
+    """
+    Finds which feature points share an edge of their Voronoi cells by sweeping a line over them.
+    :param feature_points: list of distinct (x, y) feature points
+    :return: list of the sorted indices of each feature point's neighbors
+    """
+    points = [(float(x), float(y)) for x, y in feature_points]
+    order = sorted(range(len(points)), key=lambda idx: (points[idx][1], points[idx][0]))
+    neighbors = [set() for _ in points]
+    if len(points) < 2:
+        return [sorted(group) for group in neighbors]
+
+    def join(left, right):
+        neighbors[left.site].add(right.site)
+        neighbors[right.site].add(left.site)
+
+    events = []  # Heap of [y, count, arc, valid] circle events, with the count keeping equal y values in order
+    count = 0
+    beach = []
+
+    def check_circle(position, sweep):
+        nonlocal count
+        arc = beach[position]
+        if arc.event is not None:
+            arc.event[3] = False
+            arc.event = None
+        if position == 0 or position == len(beach) - 1:
+            return
+
+        bottom = _circle_bottom(points[beach[position - 1].site], points[arc.site], points[beach[position + 1].site])
+        if bottom is not None and bottom >= sweep - EPSILON:
+            arc.event = [bottom, count, arc, True]
+            count += 1
+            heapq.heappush(events, arc.event)
+
+    def locate(x, sweep):
+        # Binary search for the arc over x, whose breakpoints only ever stay in order along the beach line
+        low, high = 0, len(beach) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if _breakpoint(points[beach[middle].site], points[beach[middle + 1].site], sweep) < x:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    beach.append(_Arc(order[0]))
+    next_site = 1
+    while next_site < len(order) or events:
+        if events and not events[0][3]:
+            heapq.heappop(events)
+            continue
+
+        if next_site < len(order) and (not events or points[order[next_site]][1] <= events[0][0]):
+            site = order[next_site]
+            next_site += 1
+            x, sweep = points[site]
+            position = locate(x, sweep)
+            above = beach[position]
+            new = _Arc(site)
+
+            if points[above.site][1] == sweep:
+                # Feature points on the first row of the sweep only border each other, side by side
+                beach.insert(position + 1, new)
+                join(above, new)
+                continue
+
+            if above.event is not None:
+                above.event[3] = False
+                above.event = None
+            beach[position + 1:position + 1] = [new, _Arc(above.site)]
+            join(above, new)
+            check_circle(position, sweep)
+            check_circle(position + 2, sweep)
+        else:
+            sweep, _, arc, _ = heapq.heappop(events)
+            position = beach.index(arc)  # A scan in C, quicker for any likely beach line than a search in Python
+            left, right = beach[position - 1], beach[position + 1]
+            del beach[position]
+            join(left, right)
+            check_circle(position - 1, sweep)
+            check_circle(position, sweep)
+
+    return [sorted(group) for group in neighbors]
+
+
+def _clip(polygon, normal_x, normal_y, limit):
+    """
+    Clips a convex polygon to the half plane normal . p <= limit.
+    :param polygon: list of the polygon's (x, y) vertices in order
+    :param normal_x: x value of the half plane's outward normal
+    :param normal_y: y value of the half plane's outward normal
+    :param limit: greatest value of normal . p inside the half plane
+    :return: list of the clipped polygon's vertices
+    """
+    clipped = []
+    for idx, current in enumerate(polygon):
+        previous = polygon[idx - 1]
+        current_value = (normal_x * current[0]) + (normal_y * current[1]) - limit
+        previous_value = (normal_x * previous[0]) + (normal_y * previous[1]) - limit
+        if (current_value <= 0) != (previous_value <= 0):
+            t = previous_value / (previous_value - current_value)
+            clipped.append((previous[0] + (t * (current[0] - previous[0])),
+                            previous[1] + (t * (current[1] - previous[1]))))
+        if current_value <= 0:
+            clipped.append(current)
+    return clipped
+
+
+def voronoi_cells(feature_points, box):
+    """
+    Finds the Voronoi cell of each feature point under the euclidean distance, within a box.
+    :param feature_points: list of distinct (x, y) feature points
+    :param box: (left, upper, right, lower) box to clip the cells to
+    :return: list of each feature point's cell, a list of (x, y) vertices, empty if the cell lies outside the box
+    """
+    left, upper, right, lower = box
+    cells = []
+    for idx, group in enumerate(delaunay_neighbors(feature_points)):
+        x, y = feature_points[idx]
+        cell = [(left, upper), (right, upper), (right, lower), (left, lower)]
+        for neighbor in group:
+            # Points closer to the feature point than to its neighbor, (n - p) . q <= (|n|^2 - |p|^2) / 2
+            neighbor_x, neighbor_y = feature_points[neighbor]
+            cell = _clip(cell, neighbor_x - x, neighbor_y - y,
+                         ((neighbor_x * neighbor_x) + (neighbor_y * neighbor_y) - (x * x) - (y * y)) / 2)
+            if not cell:
+                break
+        cells.append(cell if len(cell) >= 3 else [])
+    return cells
+
+
+def rasterize_cells(cells, width, height):
+    """
+    Labels every pixel of an image with the cell covering it, filling each cell one run of pixels per row. Pixels on the
+    edge between cells go to the first of them, as with find_labels.
+    :param cells: list of convex cells, each a list of (x, y) vertices in pixel coordinates
+    :param width: width of the image
+    :param height: height of the image
+    :return: (height, width) int32 array of the index of each pixel's cell, -1 for pixels outside of every cell
+    """
+    runs = []
+    for idx, cell in enumerate(cells):
+        if not cell:
+            continue
+        vertices = np.asarray(cell, dtype=np.float64)
+        top = max(0, math.ceil(vertices[:, 1].min() - EPSILON))
+        bottom = min(height - 1, math.floor(vertices[:, 1].max() + EPSILON))
+        if top > bottom:
+            continue
+
+        # Where each row crosses each edge of the cell, the row's run spanning the leftmost to the rightmost crossing
+        rows = np.arange(top, bottom + 1)
+        starts = vertices
+        ends = np.roll(vertices, -1, axis=0)
+        rises = ends[:, 1] - starts[:, 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = (rows[:, None] - starts[:, 1]) / rises
+            crossings = starts[:, 0] + (t * (ends[:, 0] - starts[:, 0]))
+        crossed = (t >= -EPSILON) & (t <= 1 + EPSILON) & (rises != 0)
+        lefts = np.ceil(np.where(crossed, crossings, np.inf).min(axis=1) - EPSILON)
+        rights = np.floor(np.where(crossed, crossings, -np.inf).max(axis=1) + EPSILON)
+
+        lefts = np.maximum(lefts, 0)
+        rights = np.minimum(rights, width - 1)
+        filled = lefts <= rights
+        runs.append((rows[filled], lefts[filled].astype(np.intp), rights[filled].astype(np.intp), idx))
+
+    labels = np.full(width * height, np.iinfo(np.int32).max, dtype=np.int32)
+    if runs:
+        rows = np.concatenate([run[0] for run in runs])
+        lefts = np.concatenate([run[1] for run in runs])
+        lengths = np.concatenate([run[2] for run in runs]) - lefts + 1
+        cell_labels = np.repeat([run[3] for run in runs], [len(run[0]) for run in runs])
+
+        # Flat index of every pixel of every run, each run counting up from the pixel it starts on
+        run_starts = np.cumsum(lengths) - lengths
+        pixels = np.arange(lengths.sum()) + np.repeat((rows * width) + lefts - run_starts, lengths)
+        np.minimum.at(labels, pixels, np.repeat(cell_labels, lengths).astype(np.int32))
+
+    labels[labels == np.iinfo(np.int32).max] = -1
+    return labels.reshape(height, width)
+
+
+def cells_to_svg(cells, width, height, colors, feature_points=None):
+    """
+    Writes cells out as an SVG image, with pixel (x, y) covering the unit square around (x + .5, y + .5).
+    :param cells: list of cells, each a list of (x, y) vertices in pixel coordinates
+    :param width: width of the image
+    :param height: height of the image
+    :param colors: list of each cell's fill, as a color string such as 'rgb(255, 0, 0)'
+    :param feature_points: optional list of (x, y) feature points to mark
+    :return: string of the SVG image
+    """
+    lines = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" shape-rendering="crispEdges">']
+    for cell, color in zip(cells, colors):
+        if cell:
+            points = ' '.join(f'{x + .5:.3f},{y + .5:.3f}' for x, y in cell)
+            lines.append(f'<polygon points="{points}" fill="{color}"/>')
+    if feature_points is not None:
+        for x, y in feature_points:
+            lines.append(f'<rect x="{x}" y="{y}" width="1" height="1" fill="black"/>')
+    lines.append('</svg>')
+    return '\n'.join(lines)
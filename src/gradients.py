@@ -1,8 +1,11 @@
 from PIL import Image, ImageDraw
-import copy
+import collections
 import math
 import random
-from color_models import RGB, HSV, LAB
+import numpy as np
+from color_models import RGB
+from color_arrays import ColorArray, rgb_to_hsv, hsv_to_rgb, rgb_to_lab, lab_to_rgb
+import shape_fields as fields
 
 
 """
@@ -27,7 +30,7 @@ def random_colors(max_n=5):
     return RGB.n_random_rbg(random.randint(2, max_n))
 
 
-def star(image, coordinates, cur_color):
+def star_points(coordinates):
     upper_left_x = coordinates[0]
     upper_left_y = coordinates[1]
     lower_right_x = coordinates[2]
@@ -50,8 +53,12 @@ def star(image, coordinates, cur_color):
     g = (upper_left_x, c[1])
     h = (f[0], b[1])
 
+    return [a, b, c, d, e, f, g, h]
+
+
+def star(image, coordinates, cur_color):
     to_draw = ImageDraw.Draw(image)
-    to_draw.polygon((a, b, c, d, e, f, g, h), fill=cur_color)
+    to_draw.polygon(star_points(coordinates), fill=cur_color)
 
 
 def rectangle(image, coordinates, cur_color):
@@ -64,49 +71,35 @@ def ellipse(image, coordinates, cur_color):
     to_draw.ellipse(coordinates, fill=cur_color)
 
 
-def arced_rectangle(image, coordinates, cur_color, x_perc, y_perc):
-    def midpoint_curve_x(start_x, start_y, mid_x, mid_y, end_x, end_y):
-        if not (start_x < mid_x < end_x):
-            raise ValueError('Given x positions can\' interfere with each others sections!')
-
-        coors = []
-        pi = math.pi
-
-        width_1 = round(abs(mid_x - start_x))
-        for point in range(width_1):
-            y = (mid_y - start_y) * math.sin((point * pi) / (width_1 * 2))
-            coor = (point + start_x, y + start_y)
-            coors.append(coor)
-
-        width_2 = round(abs(end_x - mid_x))
-        for point in range(width_2):
-            y = (mid_y - end_y) * math.sin(((point + width_2) * pi) / (width_2 * 2))
-            coor = (point + width_1 + start_x, y + end_y)
-            coors.append(coor)
-
-        return coors
-
-    def midpoint_curve_y(start_x, start_y, mid_x, mid_y, end_x, end_y):
-        if not (start_y < mid_y < end_y):
-            raise ValueError('Given x positions can\' interfere with each others sections!')
-
-        pi = math.pi
-        coors = []
+def _midpoint_curve(start, start_offset, mid, mid_offset, end, end_offset):
+    """
+    Traces a curve a pixel at a time from start to end, swinging out to the mid offset at mid along a quarter sine
+    wave either side, with each step worked out in the same order as one point at a time so the points are identical.
+    :return: tuple of arrays of each point's position along the curve and its offset
+    """
+    if not (start < mid < end):
+        raise ValueError('Given x positions can\' interfere with each others sections!')
 
-        width_1 = round(abs(mid_y - start_y))
-        for point in range(width_1):
-            x = (mid_x - start_x) * math.sin((point * pi) / (width_1 * 2))
-            coor = (x + start_x, point + start_y)
-            coors.append(coor)
+    width_1 = round(abs(mid - start))
+    points = np.arange(width_1)
+    first = (mid_offset - start_offset) * np.sin((points * math.pi) / (width_1 * 2))
+    width_2 = round(abs(end - mid))
+    points = np.arange(width_2)
+    second = (mid_offset - end_offset) * np.sin(((points + width_2) * math.pi) / (width_2 * 2))
 
-        width_2 = round(abs(end_y - mid_y))
-        for point in range(width_2):
-            x = (mid_x - end_x) * math.sin(((point + width_2) * pi) / (width_2 * 2))
-            coor = (x + end_x, point + width_1 + start_y)
-            coors.append(coor)
+    positions = np.concatenate((np.arange(width_1) + start, (points + width_1) + start))
+    offsets = np.concatenate((first + start_offset, second + end_offset))
+    return positions, offsets
 
-        return coors
 
+def arced_rectangle_array(coordinates, x_perc, y_perc):
+    """
+    Finds the vertices of a rectangle with each side arced in towards the center, a vertex per pixel along each side.
+    :param coordinates: (left, upper, right, lower) box of the rectangle
+    :param x_perc: how far along each side its arc swings in furthest, as a fraction of the side
+    :param y_perc: how far in each side's arc swings, as a fraction of the rectangle's size across it
+    :return: (N, 2) array of the rectangle's (x, y) vertices
+    """
     upper_left_x = coordinates[0]
     upper_left_y = coordinates[1]
     lower_right_x = coordinates[2]
@@ -133,17 +126,22 @@ def arced_rectangle(image, coordinates, cur_color, x_perc, y_perc):
     left_x = upper_left_x + vert_x_dist
     left_y = upper_left_y + vert_y_dist
 
-    top = midpoint_curve_x(upper_left_x, upper_left_y, top_x, top_y, lower_right_x, upper_left_y)
-    right = midpoint_curve_y(lower_right_x, upper_left_y, right_x, right_y, lower_right_x, lower_right_y)
-    bottom = midpoint_curve_x(upper_left_x, lower_right_y, bottom_x, bottom_y, lower_right_x, lower_right_y)
-    left = midpoint_curve_y(upper_left_x, upper_left_y, left_x, left_y, upper_left_x, lower_right_y)
+    top_x, top_y = _midpoint_curve(upper_left_x, upper_left_y, top_x, top_y, lower_right_x, upper_left_y)
+    right_y, right_x = _midpoint_curve(upper_left_y, lower_right_x, right_y, right_x, lower_right_y, lower_right_x)
+    bottom_x, bottom_y = _midpoint_curve(upper_left_x, lower_right_y, bottom_x, bottom_y, lower_right_x, lower_right_y)
+    left_y, left_x = _midpoint_curve(upper_left_y, upper_left_x, left_y, left_x, lower_right_y, upper_left_x)
+
+    return np.column_stack((np.concatenate((left_x, bottom_x, right_x[::-1], top_x[::-1])),
+                            np.concatenate((left_y, bottom_y, right_y[::-1], top_y[::-1]))))
+
 
-    right.reverse()
-    top.reverse()
-    coors = left + bottom + right + top
+def arced_rectangle_points(coordinates, x_perc, y_perc):
+    return [tuple(point) for point in arced_rectangle_array(coordinates, x_perc, y_perc).tolist()]
 
+
+def arced_rectangle(image, coordinates, cur_color, x_perc, y_perc):
     to_draw = ImageDraw.Draw(image)
-    to_draw.polygon(xy=coors, fill=cur_color)
+    to_draw.polygon(xy=arced_rectangle_array(coordinates, x_perc, y_perc).ravel().tolist(), fill=cur_color)
 
 
 def even_arced_rect(image, coordinates, cur_color):
@@ -154,7 +152,7 @@ def lopsided_arced_rect(image, coordinates, cur_color):
     arced_rectangle(image, coordinates, cur_color, .3, .2)
 
 
-def diamond(image, coordinates, cur_color, vert, horz):
+def diamond_points(coordinates, vert, horz):
     upper_left_x = coordinates[0]
     upper_left_y = coordinates[1]
     lower_right_x = coordinates[2]
@@ -170,9 +168,12 @@ def diamond(image, coordinates, cur_color, vert, horz):
     d = (lower_right_x, upper_left_y + (vert * (actual_vert)))
     e = (((actual_horz) / 2) + upper_left_x, lower_right_y)
 
-    coordinates = [a, b, c, d, e]
+    return [a, b, c, d, e]
+
+
+def diamond(image, coordinates, cur_color, vert, horz):
     to_draw = ImageDraw.Draw(image)
-    to_draw.polygon(coordinates, fill=cur_color)
+    to_draw.polygon(diamond_points(coordinates, vert, horz), fill=cur_color)
 
 
 def even_diamond(image, coordinates, cur_color):
@@ -180,7 +181,11 @@ def even_diamond(image, coordinates, cur_color):
     return diamond(image, coordinates, cur_color, even, even)
 
 
-def double_diamond(image, coordinates, cur_color):
+def diamond_jewel(image, coordinates, cur_color):
+    return diamond(image, coordinates, cur_color, .25, .75)
+
+
+def double_diamond_points(coordinates):
     upper_left_x = coordinates[0]
     upper_left_y = coordinates[1]
     lower_right_x = coordinates[2]
@@ -206,97 +211,332 @@ def double_diamond(image, coordinates, cur_color):
     i = (upper_left_x, upper_left_y + (vert_b * (actual_vert)))
     j = (((actual_horz) / 2) + upper_left_x - mid_offset, (actual_vert / 2) + upper_left_y)
 
-    coordinates = [a, b, c, d, e, f, g, h, i, j]
+    return [a, b, c, d, e, f, g, h, i, j]
+
+
+def double_diamond(image, coordinates, cur_color):
     to_draw = ImageDraw.Draw(image)
-    to_draw.polygon(coordinates, fill=cur_color)
+    to_draw.polygon(double_diamond_points(coordinates), fill=cur_color)
 
 
-def create_color_gradient(list_of_colors, n, mode='rgb', alpha=False, reflect=False):
+def gradient_array(list_of_colors, n, mode='rgb', alpha=False, reflect=False):
+    """
+    Creates a gradient of n colors passing through each of the given colors in order, as an array. Each pair of
+    neighboring colors gets an equal share of the n colors, any remainder going to the earliest pairs.
+    :param list_of_colors: list of RGB colors to pass through
+    :param n: number of colors in the gradient
+    :param mode: color space to interpolate in, 'rgb', 'hsv', or 'lab'
+    :param alpha: if each color's alpha value should be interpolated and included as well
+    :param reflect: if the gradient should run through the colors and back again within its n colors
+    :return: (n, 3) array of RGB colors, or (n, 4) if alpha is included
+    :raise: if the color space isn't supported or n is too small to fit every color
+    """
+    if mode not in ('rgb', 'hsv', 'lab'):
+        raise ValueError('Invalid color space!')
+
     x = len(list_of_colors)
+    length = math.ceil(n / 2) if reflect else n
+    if length <= x - 1:
+        raise ValueError('Gradient must have more colors than the number of colors to pass through!')
 
-    if n <= x - 1:
-        raise ValueError('')
+    endpoints = ColorArray.from_colors(list_of_colors, 'rgb', alpha=True).values
+    channels = 4 if alpha else 3
+    if x == 1:
+        return np.tile(np.round(endpoints[0, :channels]).astype(np.int64), (n, 1))
+
+    # Converted to the interpolation color space once per color, rather than once per gradient entry
+    if mode == 'hsv':
+        components = rgb_to_hsv(endpoints[:, :3])
+    elif mode == 'lab':
+        components = rgb_to_lab(endpoints[:, :3])
+    else:
+        components = endpoints[:, :3]
+
+    base, overhang = divmod(length - 1, x - 1)
+    pair_lengths = np.full(x - 1, base)
+    pair_lengths[:overhang] += 1
+
+    pairs = np.repeat(np.arange(x - 1), pair_lengths)
+    steps = np.arange(length - 1) - np.repeat(np.cumsum(pair_lengths) - pair_lengths, pair_lengths)
+    t = (steps / pair_lengths[pairs])[:, None]
+
+    start = components[pairs]
+    values = np.round(start + ((components[pairs + 1] - start) * t))
+    if mode == 'hsv':
+        values = hsv_to_rgb(values)
+    elif mode == 'lab':
+        values = lab_to_rgb(values)
+
+    gradient_values = np.empty((length, channels), dtype=np.int64)
+    gradient_values[:-1, :3] = np.round(values)
+    gradient_values[-1] = np.round(endpoints[-1, :channels])
+    if alpha:
+        start = endpoints[pairs, 3:]
+        gradient_values[:-1, 3:] = np.round(start + ((endpoints[pairs + 1, 3:] - start) * t))
 
-    original_n = n
     if reflect:
-        math.ceil(n / 2)
+        # An odd n shares the middle color between both halves
+        gradient_values = np.concatenate((gradient_values, gradient_values[::-1][(length * 2) - n:]))
 
-    if x == 1:
-        return [copy.copy(list_of_colors[0]) for i in range(n)]
-
-    pairs = []
-    for i in range(x - 1):
-        a = list_of_colors[i]
-        b = list_of_colors[i + 1]
-        key = (a, b)
-        pairs.append(key)
-
-    base, overhang = divmod(n - 1, x - 1)
-
-    def rounded_value_at_t(start, end, t):
-        return round(start + ((end - start) * t))
-
-    gradient_values = []
-    for idx, pair in enumerate(pairs):
-        temp = base
-
-        if overhang > 0:
-            temp += 1
-            overhang -= 1
-
-        a = pair[0]
-        b = pair[1]
-        for i in range(temp):
-            t = i / temp
-
-            if mode == 'hsv':
-                hsv_a = a.to_hsv()
-                hsv_b = b.to_hsv()
-
-                to_add_hue = rounded_value_at_t(hsv_a.hue, hsv_b.hue, t)
-                to_add_saturation = rounded_value_at_t(hsv_a.saturation, hsv_b.saturation, t)
-                to_add_value = rounded_value_at_t(hsv_a.value, hsv_b.value, t)
-                to_add = HSV(to_add_hue, to_add_saturation, to_add_value)
-                to_add = to_add.to_rgb()
-            elif mode == 'lab':
-                lab_a = a.to_lab()
-                lab_b = b.to_lab()
-
-                to_add_light = rounded_value_at_t(lab_a.light, lab_b.light, t)
-                to_add_a = rounded_value_at_t(lab_a.a, lab_b.a, t)
-                to_add_b = rounded_value_at_t(lab_a.b, lab_b.b, t)
-                to_add = LAB(to_add_light, to_add_a, to_add_b)
-                to_add = to_add.to_rgb()
-            elif mode == 'rgb':
-                to_add_red = rounded_value_at_t(a.red, b.red, t)
-                to_add_green = rounded_value_at_t(a.green, b.green, t)
-                to_add_blue = rounded_value_at_t(a.blue, b.blue, t)
-                to_add = RGB(to_add_red, to_add_green, to_add_blue)
-            else:
-                raise ValueError('Invalid color space!')
-
-            if alpha:
-                to_add.alpha = rounded_value_at_t(a.alpha, b.alpha, t)
-                gradient_values.append(to_add.output_as_rgba())
-            else:
-                gradient_values.append(to_add.output())
-
-            if idx == len(pairs) - 1 and i == temp - 1:
-                if alpha:
-                    gradient_values.append(b.output_as_rgba())
-                else:
-                    gradient_values.append(b.output())
+    return gradient_values
 
-    if reflect:
-        gradient_values += gradient_values[::-1]
 
-        if len(gradient_values) > original_n:
-            gradient_values = gradient_values[:len(gradient_values) - 1]
+class GradientCache:
+    """
+    Represents a least recently used cache of gradient arrays, bounded by the total size of the arrays it holds.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        """
+        Creates an empty GradientCache.
+        :param max_bytes: greatest total size of the cached gradients, 0 to disable caching
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, list_of_colors, n, mode='rgb', alpha=False, reflect=False):
+        """
+        Returns the gradient for the given parameters, see gradient_array, creating and caching it if it isn't cached.
+        The returned array is shared between callers and can't be written to.
+        :return: read only array of the gradient's colors
+        """
+        channels = 4 if alpha else 3  # Colors differing only in an alpha that isn't included share a gradient
+        key = (tuple(color.components()[:channels] for color in list_of_colors), n, mode, alpha, reflect)
+        gradient_values = self._entries.get(key)
+        if gradient_values is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return gradient_values
+
+        self.misses += 1
+        gradient_values = gradient_array(list_of_colors, n, mode, alpha, reflect)
+        gradient_values.flags.writeable = False
+        if gradient_values.nbytes <= self.max_bytes:
+            self._entries[key] = gradient_values
+            self.current_bytes += gradient_values.nbytes
+            self._evict(self.max_bytes)
+        return gradient_values
+
+    def resize(self, max_bytes):
+        """
+        Changes the greatest total size of the cached gradients, evicting the least recently used ones to fit.
+        :param max_bytes: new greatest total size, 0 to disable caching
+        :return: None
+        """
+        self.max_bytes = max_bytes
+        self._evict(max_bytes)
+
+    def clear(self):
+        """
+        Removes every cached gradient and resets the hit and miss counters.
+        :return: None
+        """
+        self._entries.clear()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, max_bytes):
+        while self.current_bytes > max_bytes:
+            evicted = self._entries.popitem(last=False)[1]
+            self.current_bytes -= evicted.nbytes
+
+
+# Gradients requested through create_color_gradient, shared by every generator in a process
+gradient_cache = GradientCache()
 
-    return gradient_values
 
+def create_color_gradient(list_of_colors, n, mode='rgb', alpha=False, reflect=False):
+    """
+    Creates a gradient of n colors passing through each of the given colors in order, see gradient_array. Repeated
+    requests for the same gradient are served from the gradient cache.
+    :param list_of_colors: list of RGB colors to pass through
+    :param n: number of colors in the gradient
+    :param mode: color space to interpolate in, 'rgb', 'hsv', or 'lab'
+    :param alpha: if each color's alpha value should be interpolated and included as well
+    :param reflect: if the gradient should run through the colors and back again within its n colors
+    :return: list of n (red, green, blue) tuples, or (red, green, blue, alpha) if alpha is included
+    """
+    return [tuple(color) for color in gradient_cache.get(list_of_colors, n, mode, alpha, reflect).tolist()]
+
+
+def box_ranges(width, height, box=None):
+    """
+    Returns the columns and rows of an image inside a box, used by generators that can render part of their image.
+    :param width: width of the full image
+    :param height: height of the full image
+    :param box: (left, upper, right, lower) box as given to Image.crop, the whole image if not given
+    :return: tuple of the range of columns and the range of rows inside the box
+    :raise: if the box isn't a non-empty area within the image
+    """
+    if box is None:
+        return range(width), range(height)
+
+    left, upper, right, lower = box
+    if not (0 <= left < right <= width and 0 <= upper < lower <= height):
+        raise ValueError('Box must be a non-empty area within the image!')
+    return range(left, right), range(upper, lower)
+
+
+class GradientShape:
+    """
+    Represents a shape master_gradient can fill with a gradient, given by its field, see shape_fields, or as a polygon,
+    and optionally a function to draw it with.
+    """
+
+    def __init__(self, name, field=None, points=None, draw=None, mirror_x=False, mirror_y=False):
+        """
+        Creates a GradientShape from either a vectorized field function or a polygon.
+        :param name: name of the shape
+        :param field: field function of the shape, taking arrays of normalized x and y coordinates
+        :param points: list of the (x, y) vertices of a polygon in unit coordinates, where (0, 0) is the image's upper
+        left corner and (1, 1) its lower right, or a function giving the polygon's vertices within a bounding box
+        :param draw: function drawing the shape into an image given its bounding box and color, by default the polygon
+        is drawn in the box
+        :param mirror_x: if the field is symmetric left to right, so only half of each row needs rendering
+        :param mirror_y: if the field is symmetric top to bottom, so only half of each column needs rendering
+        :raise: if not given exactly one of a field or a polygon, or a polygon is to be mirrored
+        """
+        if (field is None) == (points is None):
+            raise ValueError('Shape must be given as either a field or a polygon!')
+        elif points is not None and (mirror_x or mirror_y):
+            # Drawn polygons have their vertices truncated to whole pixels, so are never quite symmetric
+            raise ValueError('Only shapes given as a field can be mirrored!')
+
+        self.name = name
+        self.mirror_x = mirror_x
+        self.mirror_y = mirror_y
+        self.field = field
+
+        # Polygons are filled ring by ring as drawn rather than compiled to a field, see shape_fields.render_polygon
+        if points is None:
+            self.points = None
+            self.polygon = None
+        elif callable(points):
+            self.points = None
+            self.polygon = points
+        else:
+            self.points = [tuple(point) for point in points]
+            self.polygon = self._scale_template
+
+        if draw is None and points is not None:
+            draw = self._draw_polygon
+        self.draw = draw
+
+    def _scale_template(self, coordinates):
+        upper_left_x, upper_left_y, lower_right_x, lower_right_y = coordinates
+        actual_horz = lower_right_x - upper_left_x
+        actual_vert = lower_right_y - upper_left_y
+        return [(upper_left_x + (x * actual_horz), upper_left_y + (y * actual_vert)) for x, y in self.points]
+
+    def _draw_polygon(self, image, coordinates, cur_color):
+        to_draw = ImageDraw.Draw(image)
+        to_draw.polygon(self.polygon(coordinates), fill=cur_color)
+
+    def __call__(self, image, coordinates, cur_color):
+        if self.draw is None:
+            raise ValueError(f'Shape {self.name} can only be rendered from its field!')
+        self.draw(image, coordinates, cur_color)
+
+
+# Every shape available to master_gradient by name
+shape_registry = {}
+
+
+def register_shape(name, field=None, points=None, draw=None, mirror_x=False, mirror_y=False):
+    """
+    Adds a shape to the shape registry, making it available to master_gradient by name, see GradientShape.
+    :return: the registered GradientShape
+    :raise: if a shape is already registered under the given name
+    """
+    if name in shape_registry:
+        raise ValueError(f'A shape named {name} is already registered!')
+
+    shape = GradientShape(name, field, points, draw, mirror_x, mirror_y)
+    shape_registry[name] = shape
+    return shape
+
+
+def find_shape(shape):
+    """
+    Returns the registered shape matching the given name, shape, or drawing function.
+    :param shape: name of a registered shape, a GradientShape, or a drawing function
+    :return: the matching GradientShape, or None if a drawing function isn't registered
+    :raise: if no shape is registered under the given name
+    """
+    if isinstance(shape, GradientShape):
+        return shape
+    elif isinstance(shape, str):
+        if shape not in shape_registry:
+            raise ValueError(f'No shape named {shape} is registered!')
+        return shape_registry[shape]
+
+    for registered in shape_registry.values():
+        if registered.draw == shape:
+            return registered
+    return None
+
+
+register_shape('rectangle', field=fields.rectangle_field, draw=rectangle, mirror_x=True, mirror_y=True)
+register_shape('ellipse', field=fields.ellipse_field, draw=ellipse, mirror_x=True, mirror_y=True)
+register_shape('star', points=star_points, draw=star)
+register_shape('even_diamond', points=lambda coordinates: diamond_points(coordinates, .5, .5), draw=even_diamond)
+register_shape('diamond', points=lambda coordinates: diamond_points(coordinates, .25, .75), draw=diamond_jewel)
+register_shape('double_diamond', points=double_diamond_points, draw=double_diamond)
+register_shape('even_arced_rect', points=lambda coordinates: arced_rectangle_array(coordinates, .5, .15),
+               draw=even_arced_rect)
+register_shape('lopsided_arced_rect', points=lambda coordinates: arced_rectangle_array(coordinates, .3, .2),
+               draw=lopsided_arced_rect)
+
+
+def master_gradient(width, height, list_of_colors, shape, fill_background=True, mode='rgb', alpha=False, engine='draw',
+                    box=None):
+    """
+    Creates an image of a shape filled with a gradient, running from the image's edges in to its center.
+    :param width: width of the image
+    :param height: height of the image
+    :param list_of_colors: list of RGB colors the gradient passes through, from the center outwards
+    :param shape: name of a registered shape, a GradientShape, or a function drawing the shape into the image given
+    its bounding box and color
+    :param fill_background: if the area outside of the full sized shape should take the gradient's outermost color
+    :param mode: color space to create the gradient in
+    :param alpha: if the gradient should include alpha
+    :param engine: 'draw' to draw the shape once per ring of the gradient, or 'field' to render only the requested
+    box of a registered shape - from the shape's field within a ring of the drawn image, or for a polygon by filling
+    each ring's polygon over just the box's rows, exactly as drawn
+    :param box: (left, upper, right, lower) box of the image to render, the whole image if not given - only the field
+    engine renders just the box, the draw engine crops it from the whole image
+    :return: rendered image
+    :raise: if the engine isn't supported, or the shape can't be rendered by it
+    """
+    registered = find_shape(shape)
+    if engine == 'field':
+        if registered is None:
+            raise ValueError('No field exists for the given shape, register it or use the draw engine!')
+
+        columns, rows = box_ranges(width, height, box)
+        longer_radius = math.ceil(max(width, height) / 2)
+        gradient_values = gradient_cache.get(list_of_colors, longer_radius, mode, alpha)
+        if registered.polygon is not None:
+            pixels = fields.render_polygon(width, height, registered.polygon, gradient_values, fill_background, rows,
+                                           columns)
+        else:
+            pixels = fields.render_field(width, height, registered.field, gradient_values, fill_background, rows,
+                                         columns, registered.mirror_x, registered.mirror_y)
+        return Image.fromarray(pixels, 'RGBA' if alpha else 'RGB')
+    elif engine != 'draw':
+        raise ValueError('Engine must be draw or field!')
+
+    box_ranges(width, height, box)
+    if registered is not None:
+        shape = registered
 
-def master_gradient(width, height, list_of_colors, shape, fill_background=True, mode='rgb', alpha=False):
     if width <= height:
         shorter_radius = math.ceil(width / 2)
         longer_radius = math.ceil(height / 2)
@@ -336,54 +576,51 @@ def master_gradient(width, height, list_of_colors, shape, fill_background=True,
         lower_right_x = to_render.width - upper_left_x
         lower_right_y = to_render.height - upper_left_y
 
+    if box is not None:
+        return to_render.crop(box)
     return to_render
 
 
-def line_gradient(width, height, list_of_colors=random_colors(), mode='rgb', alpha=False):
-    results = create_color_gradient(list_of_colors, width, mode, alpha)
-
-    if alpha:
-        to_render = Image.new('RGBA', (width, height))
-    else:
-        to_render = Image.new('RGB', (width, height))
-    to_draw = ImageDraw.Draw(to_render)
-
-    for idx, color in enumerate(results):
-        to_draw.line([idx, 0, idx, height - 1], color, 0)
-
-    return to_render
-
-
-def lopsided_arced_rect_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, lopsided_arced_rect, fill_background, mode, alpha)
-
-
-def even_arced_rect_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, even_arced_rect, fill_background, mode, alpha)
-
-
-def star_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, star, fill_background, mode, alpha)
-
-
-def even_diamond_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, even_diamond, fill_background, mode, alpha)
-
-
-def diamond_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    def diamond_jewel(image, coordinates, cur_color):
-        return diamond(image, coordinates, cur_color, .25, .75)
-
-    return master_gradient(width, height, list_of_colors, diamond_jewel, fill_background, mode, alpha)
-
-
-def rectangle_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, rectangle, fill_background, mode, alpha)
-
+def line_gradient(width, height, list_of_colors=random_colors(), mode='rgb', alpha=False, box=None):
+    """
+    Creates an image of a gradient running from the left edge to the right, each column a single color.
+    :param width: width of the image
+    :param height: height of the image
+    :param list_of_colors: list of RGB colors the gradient passes through
+    :param mode: color space to create the gradient in
+    :param alpha: if the gradient should include alpha
+    :param box: (left, upper, right, lower) box of the image to render, the whole image if not given
+    :return: rendered image
+    """
+    columns, rows = box_ranges(width, height, box)
 
-def ellipse_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, ellipse, fill_background, mode, alpha)
+    # A single row of the gradient repeated down the image, rather than drawing each column
+    row = gradient_cache.get(list_of_colors, width, mode, alpha)[columns.start:columns.stop].astype(np.uint8)
+    pixels = np.broadcast_to(row, (len(rows),) + row.shape)
+    return Image.fromarray(np.ascontiguousarray(pixels), 'RGBA' if alpha else 'RGB')
 
 
-def double_diamond_gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False):
-    return master_gradient(width, height, list_of_colors, double_diamond, fill_background, mode, alpha)
+def shape_gradient(name):
+    """
+    Creates a generator of gradients filling the registered shape of the given name, see master_gradient.
+    :param name: name of a registered shape
+    :return: function creating gradient images of the shape
+    """
+    def gradient(width, height, list_of_colors=random_colors(), fill_background=True, mode='rgb', alpha=False,
+                 engine='draw', box=None):
+        return master_gradient(width, height, list_of_colors, name, fill_background, mode, alpha, engine, box)
+
+    # Named as if defined at module level, so generators assigned to a module level name can be pickled
+    gradient.__name__ = f'{name}_gradient'
+    gradient.__qualname__ = gradient.__name__
+    return gradient
+
+
+lopsided_arced_rect_gradient = shape_gradient('lopsided_arced_rect')
+even_arced_rect_gradient = shape_gradient('even_arced_rect')
+star_gradient = shape_gradient('star')
+even_diamond_gradient = shape_gradient('even_diamond')
+diamond_gradient = shape_gradient('diamond')
+rectangle_gradient = shape_gradient('rectangle')
+ellipse_gradient = shape_gradient('ellipse')
+double_diamond_gradient = shape_gradient('double_diamond')
@@ -0,0 +1,115 @@
+import numpy as np
+from PIL import Image
+from color_arrays import convert, SPACES
+from color_models import HSV, MAX_ALPHA
+from color_tables import lookup_lab
+
+"""
+Bridge between PIL images and arrays of colors, so per-pixel work can be done as whole-array operations.
+"""
+
+'''
+Images are read as (height, width, channels) arrays in a single bulk copy of the image buffer. Asking for no color
+space gives the image's raw 8-bit buffer; asking for a color space gives a float working buffer in that space, using
+the same component ranges as the color models, alpha included - so PIL's [0, 255] alpha is scaled onto [0, 100].
+PIL's HSV mode stores hue, saturation, and value each in [0, 255], and is scaled to and from the HSV color model's ranges.
+'''
+
+MAX_BYTE = 255
+
+
+def _hsv_bytes_to_model(values):
+    scale = np.array((HSV.max_hue, HSV.max_sv, HSV.max_sv), dtype=np.float64) / MAX_BYTE
+    return values.astype(np.float64) * scale
+
+
+def _hsv_model_to_bytes(values):
+    scale = MAX_BYTE / np.array((HSV.max_hue, HSV.max_sv, HSV.max_sv), dtype=np.float64)
+    return _to_bytes(values * scale)
+
+
+def _to_bytes(values):
+    return np.clip(np.round(values), 0, MAX_BYTE).astype(np.uint8)
+
+
+def from_image(image, space=None, use_cube=False):
+    """
+    Returns the pixels of an image as an array.
+    :param image: PIL image in RGB, RGBA, or HSV mode, any other mode is converted to RGB (or RGBA if it has
+    transparency) first
+    :param space: color space to return pixels in, one of 'rgb', 'hsv', 'xyz', or 'lab', or None for the image's raw
+    8-bit buffer
+    :param use_cube: if RGB pixels should be converted to LAB by looking them up in the RGB -> LAB cube, see color_tables
+    :return: (height, width, channels) array of the image's pixels
+    :raise: if the given color space isn't supported
+    """
+    if space is not None and space not in SPACES:
+        raise ValueError('Invalid color space!')
+
+    if image.mode not in ('RGB', 'RGBA', 'HSV'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    pixels = np.asarray(image)
+    if space is None:
+        return pixels
+
+    if image.mode == 'HSV':
+        return convert(_hsv_bytes_to_model(pixels), 'hsv', space)
+
+    if image.mode == 'RGBA':
+        alpha = pixels[..., 3:] * (MAX_ALPHA / MAX_BYTE)
+        if space == 'lab' and use_cube:
+            colors = lookup_lab(pixels[..., :3])
+        else:
+            colors = convert(pixels[..., :3], 'rgb', space)
+        return np.concatenate((colors, alpha), axis=-1)
+
+    if space == 'lab' and use_cube:
+        return lookup_lab(pixels)
+    return convert(pixels, 'rgb', space)
+
+
+def to_image(values, space=None, mode=None):
+    """
+    Creates an image from an array of pixels.
+    :param values: (height, width, channels) array of pixels, with 3 channels or 4 if alpha is included
+    :param space: color space of the given pixels, one of 'rgb', 'hsv', 'xyz', or 'lab', or None if they are already
+    an 8-bit buffer in the given mode
+    :param mode: mode of the image to create, 'RGB', 'RGBA', or 'HSV' - by default RGB, or RGBA if alpha is included
+    :return: PIL image of the given pixels
+    :raise: if the given color space or mode isn't supported, or pixels without a color space aren't 8-bit
+    """
+    values = np.asarray(values)
+    if values.ndim != 3 or values.shape[-1] not in (3, 4):
+        raise ValueError('Pixels must be given as a (height, width, 3 or 4) array!')
+    elif space is not None and space not in SPACES:
+        raise ValueError('Invalid color space!')
+    elif space is None and values.dtype != np.uint8:
+        raise ValueError('Pixels without a color space must be given as a uint8 array!')
+
+    if mode is None:
+        mode = 'RGBA' if values.shape[-1] == 4 else 'RGB'
+    if mode not in ('RGB', 'RGBA', 'HSV'):
+        raise ValueError('Mode must be RGB, RGBA, or HSV!')
+
+    if space is None:
+        pixels = values
+    elif mode == 'HSV':
+        pixels = _hsv_model_to_bytes(convert(values[..., :3], space, 'hsv'))
+    else:
+        colors = _to_bytes(convert(values[..., :3], space, 'rgb'))
+        if values.shape[-1] == 4:
+            alpha = _to_bytes(values[..., 3:] * (MAX_BYTE / MAX_ALPHA))
+            colors = np.concatenate((colors, alpha), axis=-1)
+        pixels = colors
+
+    if mode == 'RGB':
+        pixels = pixels[..., :3]
+    elif mode == 'RGBA' and pixels.shape[-1] == 3:
+        pixels = np.concatenate((pixels, np.full(pixels.shape[:2] + (1,), MAX_BYTE, dtype=np.uint8)), axis=-1)
+    elif mode == 'HSV':
+        pixels = pixels[..., :3]
+
+    pixels = np.ascontiguousarray(pixels)
+    height, width = pixels.shape[:2]
+    return Image.frombuffer(mode, (width, height), pixels, 'raw', mode, 0, 1)
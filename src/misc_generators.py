@@ -1,8 +1,9 @@
 from color_models import RGB, HSV
 import gradients as grd
-from PIL import Image, ImageDraw
-import collections
+from PIL import Image
 import random
+import numpy as np
+from image_arrays import to_image
 
 """
 Collection of misc image generators.
@@ -13,133 +14,124 @@ shapes = (grd.diamond_gradient, grd.double_diamond_gradient, grd.star_gradient,
           grd.even_diamond_gradient, grd.ellipse_gradient, grd.rectangle_gradient)
 
 
-def gradient_shifts(width, height, colors, sections=random.choice((4, 6, 8, 16, 20, 40, 60))):
+def gradient_shifts(width, height, colors, sections=random.choice((4, 6, 8, 16, 20, 40, 60)), shifts=None, box=None):
     if sections > width:
         raise ValueError("Can't have more sections than the given width!")
     elif width % sections != 0:
         raise ValueError('Given number of sections must be equally divisible by the given width!')
 
-    gradient = collections.deque(grd.create_color_gradient(colors, height, 'rgb', False, True))
-    shifts = [random.choice((True, False)) for i in range(sections)] # Shift up by 1 if True, down by 1 if False
-
-    to_render = Image.new('RGB', (width, height))
-    to_draw = ImageDraw.Draw(to_render)
-
+    columns, rows = grd.box_ranges(width, height, box)
+    gradient = grd.gradient_cache.get(colors, height, 'rgb', False, True).astype(np.uint8)
+    if shifts is None:
+        if box is not None:
+            raise ValueError('Shifts must be given to render part of the image, so every part shifts the same way!')
+        shifts = [random.choice((True, False)) for i in range(sections)] # Shift up by 1 if True, down by 1 if False
+    elif len(shifts) != sections:
+        raise ValueError('Must be given a shift for every section!')
+
+    # Each section shows the gradient rotated by n rows further up or down than the section before it, so each is the
+    # gradient rolled by the running total of the shifts so far, repeated across the section's columns
     section_size = round(width / sections)
-    cur_column = 0
     n = round(width * .025)
-    for shift in shifts:
-        if shift:
-            gradient.rotate(-n)
-        else:
-            gradient.rotate(n)
-
-        for column in range(section_size):
-            for row in range(height):
-                to_draw.point((cur_column, row), gradient[row])
-            cur_column += 1
-
-    return to_render
-
-
-def straight_granite(width, height):
+    offsets = np.cumsum(np.where(shifts, n, -n))
+
+    first_section = columns.start // section_size
+    last_section = ((columns.stop - 1) // section_size) + 1
+    rolled = np.stack([np.roll(gradient, -offset, axis=0)[rows.start:rows.stop]
+                       for offset in offsets[first_section:last_section]], axis=1)
+    pixels = np.repeat(rolled, section_size, axis=1)
+    start = columns.start - (first_section * section_size)
+    return Image.fromarray(np.ascontiguousarray(pixels[:, start:start + len(columns)]), 'RGB')
+
+
+def _value_plane_image(hsv, values):
+    """
+    Creates an HSV image of a single hue and saturation from a plane of values, as drawing hsv.output() with each value
+    into every pixel would - PIL clips each component to a byte.
+    :param hsv: HSV color giving the image's hue and saturation
+    :param values: (height, width) array of values, in range [0, 100]
+    :return: HSV image
+    """
+    hue, saturation, _ = hsv.output()
+    pixels = np.empty(values.shape + (3,), dtype=np.uint8)
+    pixels[..., 0] = min(hue, 255)
+    pixels[..., 1] = min(saturation, 255)
+    pixels[..., 2] = values
+    return to_image(pixels, mode='HSV')
+
+
+def _seeded_hsv(rng):
+    return HSV(int(rng.integers(0, HSV.max_hue + 1)), int(rng.integers(0, HSV.max_sv + 1)), 0)
+
+
+def straight_granite(width, height, seed=None):
     min_value = 0
     max_value = 100
-    hsv = HSV.random_hsv()
-
-    temp_height = height + 1
-    to_render = Image.new('HSV', (width, temp_height))
-    to_draw = ImageDraw.Draw(to_render)
-
-    def mutation_value():
-        ending = 10
-        return random.randint(-ending, ending)
+    edge_value = 50  # Value of the missing neighbors past either side of the image
+    ending = 10  # Greatest mutation of a pixel's value from its neighbors
 
-    def check_new_value(value):
-        if value < min_value:
-            return min_value
-        elif value > max_value:
-            return max_value
-        return value
+    rng = np.random.default_rng(seed)
+    hsv = _seeded_hsv(rng)
 
-    for pixel in range(0, width):
-        hsv.value = random.randint(min_value, max_value)
-        to_draw.point((pixel, 0), fill=hsv.output())
+    # Each row only depends on the row above, starting from a hidden row of random values above the image
+    previous = rng.integers(min_value, max_value + 1, size=width, dtype=np.int16)
+    mutations = rng.integers(-ending, ending + 1, size=(height, width), dtype=np.int16)
+    padded = np.full(width + 2, edge_value, dtype=np.int16)
+    values = np.empty((height, width), dtype=np.uint8)
 
-    for row in range(1, temp_height):
-        for column in range(0, width):
-            edge_value = 50
+    for row in range(height):
+        # Average of the upper left, upper, and upper right values, rounded - a third never lands on a half
+        padded[1:-1] = previous
+        total = padded[:-2] + padded[1:-1] + padded[2:]
+        previous = np.clip(((total + 1) // 3) + mutations[row], min_value, max_value)
+        values[row] = previous
 
-            if column == 0:
-                top_left_value = edge_value
-            else:
-                top_left_value = to_render.getpixel((column - 1, row - 1))[2]
+    return _value_plane_image(hsv, values)
 
-            top_value = to_render.getpixel((column, row - 1))[2]
 
-            if column == (width - 1):
-                top_right_value = edge_value
-            else:
-                top_right_value = to_render.getpixel((column + 1, row - 1))[2]
-
-            new_value = (top_left_value + top_value + top_right_value) / 3
-            new_value += mutation_value()
-            new_value = check_new_value(new_value)
-            hsv.value = new_value
-            to_draw.point((column, row), fill=hsv.output())
-
-    to_render = to_render.crop((0, 1, width, temp_height))
-    return to_render
-
-
-def granite(width, height):
+def granite(width, height, seed=None):
     min_value = 0
     max_value = 100
-    hsv = HSV.random_hsv()
+    ending = 10  # Greatest mutation of a pixel's value from its neighbors
 
-    to_render = Image.new('HSV', (width, height))
-    to_draw = ImageDraw.Draw(to_render)
+    rng = np.random.default_rng(seed)
+    hsv = _seeded_hsv(rng)
 
-    def mutation_value():
-        ending = 10
-        return random.randint(-ending, ending)
-
-    def check_new_value(value):
-        if value < min_value:
-            return min_value
-        elif value > max_value:
-            return max_value
-        return value
+    # Every pixel depends on its left and upper neighbors, both on the anti-diagonal before its own, so the image is
+    # filled one anti-diagonal at a time. Diagonals are stored skewed, the pixel at (column, row) at
+    # skewed[column + row, row], so each diagonal and the one before it are contiguous
+    diagonals = width + height - 1
+    skewed = np.zeros((diagonals, height), dtype=np.int16)
+    mutations = rng.integers(-ending, ending + 1, size=(diagonals, height), dtype=np.int16)
 
     # Set value for starting pixel in upper left corner
-    corner_start_value = random.randint(min_value, max_value)
-    hsv.value = corner_start_value
-    to_draw.point((0, 0), fill=hsv.output())
-
-    for pixel in range(1, width):
-        new_value = hsv.value + mutation_value()
-        new_value = check_new_value(new_value)
-        hsv.value = new_value
-        to_draw.point((pixel, 0), fill=hsv.output())
-
-    hsv.value = to_render.getpixel((0, 0))[2]
-    for pixel in range(1, height):
-        new_value = hsv.value + mutation_value()
-        new_value = check_new_value(new_value)
-        hsv.value = new_value
-        to_draw.point((0, pixel), fill=hsv.output())
-
-    for row in range(1, height):
-        for column in range(1, width):
-            left_value = to_render.getpixel((column - 1, row))[2]
-            bottom_value = to_render.getpixel((column, row - 1))[2]
-            avg_value = round((left_value + bottom_value) / 2)
-            new_value = avg_value + mutation_value()
-            new_value = check_new_value(new_value)
-            hsv.value = new_value
-            to_draw.point((column, row), fill=hsv.output())
-
-    return to_render
+    skewed[0, 0] = rng.integers(min_value, max_value + 1)
+
+    for diagonal in range(1, diagonals):
+        first_row = max(0, diagonal - (width - 1))
+        last_row = min(diagonal, height - 1)
+        previous = skewed[diagonal - 1]
+        current = skewed[diagonal]
+
+        # Pixels with both neighbors take their rounded (half to even) average, the top row and left column follow
+        # their only neighbor
+        inner_start = max(first_row, 1)
+        inner_stop = min(last_row, diagonal - 1) + 1
+        if inner_start < inner_stop:
+            total = previous[inner_start:inner_stop] + previous[inner_start - 1:inner_stop - 1]
+            half = total >> 1
+            current[inner_start:inner_stop] = half + ((total & 1) & (half & 1))
+        if first_row == 0:
+            current[0] = previous[0]
+        if last_row == diagonal:
+            current[diagonal] = previous[diagonal - 1]
+
+        current[first_row:last_row + 1] += mutations[diagonal, first_row:last_row + 1]
+        np.clip(current[first_row:last_row + 1], min_value, max_value, out=current[first_row:last_row + 1])
+
+    rows = np.arange(height)[:, None]
+    columns = np.arange(width)[None, :]
+    return _value_plane_image(hsv, skewed[rows + columns, rows])
 
 
 def regular_shape(width, height, colors):
@@ -148,18 +140,20 @@ def regular_shape(width, height, colors):
     return gradient
 
 
-def plaid(width, height, colors):
+def plaid(width, height, colors, box=None):
+    columns, rows = grd.box_ranges(width, height, box)
     longer_length = max(width, height)
-
-    grad = grd.line_gradient(width=longer_length, height=longer_length, list_of_colors=colors, mode='rgb', alpha=True)
-    rotated_grad = grad.rotate(90)
-    result = Image.blend(grad, rotated_grad, .5)
-
-    dist_between = (width - height) / 2
-    if longer_length == width:
-        return result.crop((0, dist_between, width, width - dist_between))
-    else:
-        return result.crop((dist_between, 0, height - dist_between, height))
+    gradient = grd.gradient_cache.get(colors, longer_length, 'rgb', True).astype(np.uint16)
+
+    # Same as blending a square line gradient of the longer length with itself rotated by 90 degrees and cropping out
+    # the center, but built at the requested size: each pixel is the average of its column's color along the gradient
+    # and its row's color along the gradient reversed, rounded down as by Image.blend
+    x_offset = round((longer_length - width) / 2)
+    y_offset = round((longer_length - height) / 2)
+    horizontal = gradient[x_offset + columns.start:x_offset + columns.stop]
+    vertical = gradient[::-1][y_offset + rows.start:y_offset + rows.stop]
+    pixels = ((horizontal[None, :, :] + vertical[:, None, :]) // 2).astype(np.uint8)
+    return Image.fromarray(pixels, 'RGBA')
 
 
 def rotated_diamond(width, height, colors):
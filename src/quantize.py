@@ -0,0 +1,82 @@
+import functools
+import numpy as np
+from PIL import Image
+from color_arrays import rgb_to_lab
+from color_distance import PaletteIndex
+
+"""
+Palette quantization, mapping every pixel of an image onto the nearest color of a palette such as a color schema.
+"""
+
+'''
+Rather than measuring every pixel against the palette, the RGB cube is divided into 2^bits bins per channel and the
+nearest palette color to the center of each bin is found once, in LAB. Quantizing is then a single table lookup per
+pixel. With the default of 5 bits a pixel's color is at most 4 away from its bin's center on each channel.
+'''
+
+MAX_PALETTE_SIZE = 256  # Most colors a palette-mode image can hold
+
+
+@functools.lru_cache(maxsize=16)
+def _lookup_cube(palette, bits, formula):
+    """
+    Computes the palette index of the nearest palette color to every bin of an RGB cube with 2^bits bins per channel.
+    :param palette: tuple of (red, green, blue) palette colors
+    :param bits: number of high bits of each channel used to pick a bin
+    :param formula: Delta E formula to measure nearness with
+    :return: read only flat array of palette indices, indexed by (red bin, green bin, blue bin) in row-major order
+    """
+    size = 1 << bits
+    bin_width = 256 / size
+    centers = (np.arange(size) + .5) * bin_width - .5
+    red, green, blue = np.meshgrid(centers, centers, centers, indexing='ij')
+    bins = np.stack((red.ravel(), green.ravel(), blue.ravel()), axis=-1)
+
+    index = PaletteIndex(rgb_to_lab(np.array(palette, dtype=np.float64)), formula)
+    cube = index.nearest(rgb_to_lab(bins))[0].astype(np.uint8)
+    cube.flags.writeable = False
+    return cube
+
+
+def palette_lookup_cube(palette, bits=5, formula='76'):
+    """
+    Returns the lookup cube used to quantize images onto the given palette, see quantize.
+    :param palette: list of RGB objects
+    :param bits: number of high bits of each channel used to pick a bin, between 1 and 8
+    :param formula: Delta E formula to measure nearness with, one of '76', '94', or '2000'
+    :return: (2^bits, 2^bits, 2^bits) array of palette indices
+    :raise: if the palette is empty or too large, or bits is out of range
+    """
+    if not (1 <= len(palette) <= MAX_PALETTE_SIZE):
+        raise ValueError(f'Palette must have between 1 and {MAX_PALETTE_SIZE} colors!')
+    elif not (1 <= bits <= 8):
+        raise ValueError('Bits must be in range [1, 8]!')
+
+    size = 1 << bits
+    key = tuple(color.output() for color in palette)
+    return _lookup_cube(key, bits, formula).reshape(size, size, size)
+
+
+def quantize(image, palette, bits=5, formula='76'):
+    """
+    Maps every pixel of an image to the perceptually nearest color of a palette, for example one produced by one of
+    the color schema generators.
+    :param image: PIL image to quantize, converted to RGB first if in another mode
+    :param palette: list of RGB objects to map pixels onto
+    :param bits: number of high bits of each channel used to look up a pixel's palette color, between 1 and 8 - 5 or 6
+    is plenty for photos
+    :param formula: Delta E formula to measure nearness with, one of '76', '94', or '2000'
+    :return: palette mode ('P') image of the same size holding the given palette
+    """
+    cube = palette_lookup_cube(palette, bits, formula)
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    pixels = np.asarray(image)
+
+    shift = 8 - bits
+    indices = cube[pixels[..., 0] >> shift, pixels[..., 1] >> shift, pixels[..., 2] >> shift]
+
+    to_return = Image.fromarray(indices)
+    to_return.putpalette([component for color in palette for component in color.output()])
+    return to_return
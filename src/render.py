@@ -0,0 +1,124 @@
+from concurrent.futures import ProcessPoolExecutor
+import inspect
+import os
+import numpy as np
+from image_arrays import to_image
+from strip_writers import open_writer
+
+"""
+Renders large images in horizontal bands, either across several processes or strip by strip straight to a file.
+"""
+
+'''
+Any generator taking a 'box' argument, a (left, upper, right, lower) box of the image to render as given to Image.crop,
+can be rendered in bands - each band is the same part of the image a full render would give, so the stitched image is
+identical to rendering it in one go. Generators are sent to the worker processes by name, so must be defined (or, for
+shape gradients, assigned) at the module level, and any shapes they use must be registered on import.
+
+Defaults are resolved once before the bands are handed out, so generators with random defaults, such as the random
+colors of the gradient generators, render every band with the same values. Shape gradients are rendered with the field
+engine, the only one rendering just the box asked for - the draw engine draws the whole image for every band.
+'''
+
+STRIP_HEIGHT = 256  # Rows rendered at a time when rendering to a file
+BANDS_PER_PROCESS = 4  # Bands handed to each process, so processes finishing early pick up the slack of slower ones
+
+
+def band_boxes(width, height, bands):
+    """
+    Splits an image into horizontal bands of near equal height.
+    :param width: width of the image
+    :param height: height of the image
+    :param bands: number of bands to split the image into, at most one per row
+    :return: list of (left, upper, right, lower) boxes of each band, top to bottom
+    """
+    edges = np.linspace(0, height, min(bands, height) + 1).round().astype(int)
+    return [(0, int(upper), width, int(lower)) for upper, lower in zip(edges[:-1], edges[1:])]
+
+
+def _bind_arguments(generator, width, height, args, kwargs):
+    signature = inspect.signature(generator)
+    if 'box' not in signature.parameters:
+        raise ValueError('Generator must take a box to render!')
+
+    arguments = signature.bind(width, height, *args, **kwargs)
+    if 'engine' in signature.parameters:
+        if arguments.arguments.setdefault('engine', 'field') != 'field':
+            raise ValueError('Only the field engine renders part of an image!')
+    arguments.apply_defaults()
+    arguments.arguments.pop('box')
+    return arguments.args, arguments.kwargs
+
+
+def _render_band(generator, args, kwargs, box):
+    image = generator(*args, **kwargs, box=box)
+    return image.mode, np.asarray(image)
+
+
+def _render_strip(generator, args, kwargs, box):
+    strip = generator(*args, **kwargs, box=box)
+
+    # Color mode must be RGB as not every file type supports HSV or other color spaces
+    if strip.mode not in ('RGB', 'RGBA'):
+        strip = strip.convert('RGB')
+    return strip
+
+
+def render_in_bands(generator, width, height, *args, processes=None, bands=None, **kwargs):
+    """
+    Renders an image with a generator supporting partial renders, splitting it into horizontal bands rendered in a
+    pool of processes. Shape gradients are rendered with the field engine, so each process renders only its bands.
+    :param generator: module level generator function taking a width, height, and box of the image to render
+    :param width: width of the image
+    :param height: height of the image
+    :param args: further arguments to the generator
+    :param processes: number of processes to render with, one per CPU by default
+    :param bands: number of bands to split the image into, a few per process by default
+    :param kwargs: further keyword arguments to the generator
+    :return: rendered image, identical to the generator's own render
+    :raise: if the generator can't render part of an image, or is asked to with an engine other than the field engine
+    """
+    args, kwargs = _bind_arguments(generator, width, height, args, kwargs)
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if bands is None:
+        bands = processes * BANDS_PER_PROCESS
+    boxes = band_boxes(width, height, bands)
+
+    pixels = None
+    with ProcessPoolExecutor(processes) as executor:
+        results = executor.map(_render_band, [generator] * len(boxes), [args] * len(boxes), [kwargs] * len(boxes), boxes)
+        for (left, upper, right, lower), (mode, band) in zip(boxes, results):
+            if pixels is None:
+                pixels = np.empty((height, width) + band.shape[2:], dtype=band.dtype)
+            pixels[upper:lower] = band
+
+    return to_image(pixels, mode=mode)
+
+
+def render_to_file(generator, width, height, path, *args, strip_height=STRIP_HEIGHT, **kwargs):
+    """
+    Renders an image with a generator supporting partial renders strip by strip, writing each strip to a file as it
+    goes, so memory use is bounded by the size of a strip rather than of the image. Shape gradients are rendered with
+    the field engine.
+    :param generator: generator function taking a width, height, and box of the image to render
+    :param width: width of the image
+    :param height: height of the image
+    :param path: path of the file to write, a .png, .bmp, or .npy file, see strip_writers
+    :param args: further arguments to the generator
+    :param strip_height: number of rows to render at a time
+    :param kwargs: further keyword arguments to the generator
+    :return: None
+    :raise: if the generator can't render part of an image, is asked to with an engine other than the field engine,
+    or the file's format isn't supported
+    """
+    args, kwargs = _bind_arguments(generator, width, height, args, kwargs)
+    boxes = band_boxes(width, height, -(-height // strip_height))
+
+    # The first strip decides the mode of the file
+    strip = _render_strip(generator, args, kwargs, boxes[0])
+    with open_writer(path, width, height, strip.mode) as writer:
+        writer.write(np.asarray(strip))
+        for box in boxes[1:]:
+            writer.write(np.asarray(_render_strip(generator, args, kwargs, box)))
@@ -0,0 +1,334 @@
+import math
+import numpy as np
+from PIL import Image, ImageDraw
+
+"""
+Distance fields of the shapes used by master_gradient, for rendering a whole shape gradient in a few array operations.
+"""
+
+'''
+master_gradient draws a shape filling the image, then the same shape in a box one pixel in along the image's longer
+side, and in along the shorter side in proportion, rounded to a whole pixel, and so on towards the center, each in the
+next color of a gradient. Every ring is the first shape stretched over its own box, so whether a ring covers a pixel
+only depends on how far the shape has to be scaled to reach that pixel.
+
+A shape's field gives exactly that: for coordinates normalized so the image spans [-1, 1] on both axes with its center
+at 0, a field returns the scale at which the shape's edge passes through each coordinate - 0 at the center, 1 on the
+edge of the full sized shape, and greater than 1 outside it. The last ring covering a pixel, and with it the pixel's
+gradient color, is then found by a binary search over the rings' boxes.
+
+Fields are smooth where drawn shapes are rasterized, so they put pixels on a ring's edge within a ring of the drawn
+image. Polygons are instead filled ring by ring with PIL itself, over just the rows being rendered, so they match the
+drawn image exactly, see render_polygon.
+'''
+
+EPSILON = 1e-9
+ENVELOPE_SAMPLES = 4096  # Evenly spaced rays, on top of one per vertex, the envelope of a polygon is traced along
+POLYGON_BAND_HEIGHT = 128  # Rows polygons with many vertices are filled over at a time
+POLYGON_BAND_VERTICES = 128  # Vertices a polygon needs to be filled in bands, any fewer and a band costs more than it saves
+
+
+def rectangle_field(x, y):
+    """
+    Field of a rectangle filling the image.
+    :param x: array of normalized x coordinates
+    :param y: array of normalized y coordinates
+    :return: array of field values
+    """
+    return np.maximum(np.abs(x), np.abs(y))
+
+
+def ellipse_field(x, y):
+    """
+    Field of an ellipse filling the image.
+    :param x: array of normalized x coordinates
+    :param y: array of normalized y coordinates
+    :return: array of field values
+    """
+    return np.sqrt((x * x) + (y * y))
+
+
+def _radial_envelope(vertices):
+    """
+    Traces the outermost edge of a polygon as seen from the center, by casting rays through each vertex and at evenly
+    spaced angles, and keeping the furthest point each ray meets the polygon at.
+    :param vertices: (N, 2) array of the polygon's normalized vertices
+    :return: (M, 2) array of the vertices of the polygon's envelope, ordered by angle
+    """
+    angles = np.union1d(np.arctan2(vertices[:, 1], vertices[:, 0]),
+                        np.linspace(-np.pi, np.pi, ENVELOPE_SAMPLES, endpoint=False))
+    ray_x = np.cos(angles)[:, None]
+    ray_y = np.sin(angles)[:, None]
+
+    starts = vertices
+    edges = np.roll(vertices, -1, axis=0) - starts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Solves start + u * edge = t * ray for every pair of ray and edge
+        ray_cross = (ray_x * edges[:, 1]) - (ray_y * edges[:, 0])
+        t = ((starts[:, 0] * edges[:, 1]) - (starts[:, 1] * edges[:, 0])) / ray_cross
+        u = ((starts[:, 0] * ray_y) - (starts[:, 1] * ray_x)) / ray_cross
+        hits = (u >= -EPSILON) & (u <= 1 + EPSILON) & (t > 0)  # Rays through a vertex meet both of its edges
+
+    radii = np.where(hits, t, 0).max(axis=1)
+    return np.column_stack((radii * ray_x[:, 0], radii * ray_y[:, 0]))
+
+
+def polygon_field(points):
+    """
+    Creates the field of a polygon given in unit coordinates, where (0, 0) is the image's upper left corner and (1, 1)
+    its lower right. The polygon should be star-shaped around the image's center, its edge meeting every ray from the
+    center exactly once - for any other polygon, such as a lopsided arced rectangle whose corners fold back on
+    themselves, the field is that of the polygon's outermost edge as seen from the center.
+    :param points: list of the polygon's (x, y) vertices in order
+    :return: field function of the given polygon
+    :raise: if the polygon doesn't surround the image's center
+    """
+    vertices = (np.asarray(points, dtype=np.float64) * 2) - 1
+    angles = np.arctan2(vertices[:, 1], vertices[:, 0])
+
+    # Walks the vertices in order of increasing angle, starting from the smallest
+    winding = np.diff(np.unwrap(np.append(angles, angles[0]))).sum()
+    if not np.isclose(abs(winding), 2 * np.pi):
+        raise ValueError('Polygon must surround the center of the image!')
+    elif winding < 0:
+        vertices = vertices[::-1]
+        angles = angles[::-1]
+    start = int(np.argmin(angles))
+    vertices = np.roll(vertices, -start, axis=0)
+    angles = np.roll(angles, -start)
+
+    if np.any(np.diff(angles) < 0):
+        vertices = _radial_envelope(vertices)
+        angles = np.arctan2(vertices[:, 1], vertices[:, 0])
+
+    # Edge k runs from vertex k to vertex k + 1, and is the edge hit by rays with angles in [angles[k], angles[k + 1])
+    starts = vertices
+    ends = np.roll(vertices, -1, axis=0)
+    edge_x = ends[:, 0] - starts[:, 0]
+    edge_y = ends[:, 1] - starts[:, 1]
+    with np.errstate(divide='ignore'):
+        inverse_cross = 1 / ((starts[:, 0] * ends[:, 1]) - (starts[:, 1] * ends[:, 0]))
+
+    def field(x, y):
+        edges = (np.searchsorted(angles, np.arctan2(y, x), side='right') - 1) % len(angles)
+        return ((x * edge_y[edges]) - (y * edge_x[edges])) * inverse_cross[edges]
+
+    return field
+
+
+def ring_boxes(width, height):
+    """
+    Finds the box master_gradient draws each ring of a gradient in, each ring one pixel in from the last along the
+    image's longer side, and in along the shorter side in proportion, rounded to a whole pixel.
+    :param width: width of the image
+    :param height: height of the image
+    :return: tuple of arrays of the left and upper offsets of each ring's box, outermost first, the box of ring i being
+    (left[i], upper[i], width - left[i], height - upper[i])
+    """
+    longer_radius = math.ceil(max(width, height) / 2)
+    ratio = math.ceil(min(width, height) / 2) / longer_radius
+    longer_offsets = np.arange(longer_radius)
+    shorter_offsets = np.array([round(offset * ratio) for offset in range(longer_radius)], dtype=np.int64)
+    if width <= height:
+        return shorter_offsets, longer_offsets
+    return longer_offsets, shorter_offsets
+
+
+def gradient_indices(width, height, field, rows, columns=None):
+    """
+    Finds which color of a master_gradient gradient each pixel of the given rows is filled with.
+    :param width: width of the image
+    :param height: height of the image
+    :param field: field function of the gradient's shape
+    :param rows: range of rows of the image to find the colors of
+    :param columns: range of columns of the image to find the colors of, every column if not given
+    :return: (len(rows), len(columns)) array of gradient indices, -1 where a pixel is outside of every ring
+    """
+    if columns is None:
+        columns = range(width)
+
+    # Shapes are drawn over the box (0, 0, width, height) with pixels at integer coordinates, centered at half the size,
+    # and each ring is the shape stretched over its own box
+    # PIL fills a box's last row and column too, so each ring reaches half a pixel past the pixels on its box's edges
+    lefts, uppers = ring_boxes(width, height)
+    half_widths = (width / 2) - lefts + .5
+    half_heights = (height / 2) - uppers + .5
+    x = (np.arange(columns.start, columns.stop) - (width / 2))[None, :]
+    y = (np.arange(rows.start, rows.stop) - (height / 2))[:, None]
+
+    # Rings shrink towards the center, so the last ring covering a pixel is found by a binary search over the rings,
+    # between the last known to cover it (-1 for none yet) and the first known not to. Pixels exactly on a ring's edge
+    # are covered by it, as when drawn, whichever way rounding error falls
+    shape = np.broadcast_shapes(x.shape, y.shape)
+    covered = np.full(shape, -1, dtype=np.int64)
+    uncovered = np.full(shape, len(lefts), dtype=np.int64)
+    while True:
+        searching = (uncovered - covered) > 1
+        if not searching.any():
+            break
+        middle = (covered + uncovered) // 2
+        ring = np.minimum(middle, len(lefts) - 1)
+        inside = field(x / half_widths[ring], y / half_heights[ring]) <= 1 + EPSILON
+        covered = np.where(searching & inside, middle, covered)
+        uncovered = np.where(searching & ~inside, middle, uncovered)
+
+    return np.where(covered < 0, -1, len(lefts) - 1 - covered)
+
+
+def _polygon_edges(vertices):
+    """
+    Finds the edges PIL fills a polygon with, each vertex starting an edge to the next and the last vertex one back to
+    the first - unless the polygon already ends on its first vertex, as PIL doesn't close it again.
+    :param vertices: (N, 2) array of the polygon's vertices, truncated to whole pixels as PIL does
+    :return: tuple of arrays of the vertex each edge ends on, and each edge's upper and lower rows
+    """
+    if len(vertices) > 1 and np.array_equal(vertices[-1], vertices[0]):
+        following = np.arange(1, len(vertices))
+    else:
+        following = (np.arange(len(vertices)) + 1) % len(vertices)
+
+    starts = vertices[:len(following), 1]
+    ends = vertices[following, 1]
+    return following, np.minimum(starts, ends), np.maximum(starts, ends)
+
+
+def _band_polygon(vertices, edges, rows):
+    """
+    Trims a polygon down to the edges PIL fills a band of rows with. Edges touching the band are kept in order, and
+    each run of edges missing it is replaced by a single edge joining its ends - the run stays on one side of the band,
+    so the joining edge does too, and the polygon is filled the same within the band.
+    :param vertices: (N, 2) array of the polygon's vertices, truncated to whole pixels as PIL does
+    :param edges: the polygon's edges, see _polygon_edges
+    :param rows: range of rows of the band
+    :return: (M, 2) array of the trimmed polygon's vertices, with no vertices if no edge touches the band
+    """
+    following, uppers, lowers = edges
+    kept = (lowers >= rows.start) & (uppers < rows.stop)
+    kept_edges = np.flatnonzero(kept)
+    if len(kept_edges) == len(kept):
+        return vertices
+
+    # Each kept edge gives its start, and the last of each run its end too
+    run_ends = ~kept[np.minimum(kept_edges + 1, len(kept) - 1)] | (kept_edges == len(kept) - 1)
+    counts = 1 + run_ends
+    order = np.repeat(kept_edges, counts)
+    order[np.cumsum(counts)[run_ends] - 1] = following[kept_edges[run_ends]]
+    return vertices[order]
+
+
+def render_polygon(width, height, polygon, gradient_values, fill_background=True, rows=None, columns=None):
+    """
+    Renders a master_gradient style image of a shape drawn as a polygon, by filling each ring's polygon with PIL as
+    master_gradient draws it, but only over the rows asked for. PIL's fill costs every edge of the polygon on every row,
+    so polygons with many vertices are filled in bands, each ring's polygon trimmed down to the edges crossing a band.
+    Vertices are truncated to whole pixels before being moved up to their band, so every ring is filled exactly as in
+    the full image.
+    Memory use is bounded by the rows asked for, as full width rows, and a single ring's polygon.
+    :param width: width of the image
+    :param height: height of the image
+    :param polygon: function giving the polygon's (x, y) vertices for a ring's (left, upper, right, lower) box, lying
+    within the box
+    :param gradient_values: (ceil(max(width, height) / 2), channels) array of gradient colors, outermost ring last
+    :param fill_background: if pixels outside of the full sized shape should take the gradient's last color
+    :param rows: range of rows to render, every row if not given
+    :param columns: range of columns to render, every column if not given
+    :return: (len(rows), len(columns), channels) uint8 array of the rendered pixels
+    """
+    if rows is None:
+        rows = range(height)
+    if columns is None:
+        columns = range(width)
+
+    colors = np.asarray(gradient_values).astype(np.uint8)
+    mode = 'RGBA' if colors.shape[1] == 4 else 'RGB'
+    band_height = len(rows)
+    if len(polygon((0, 0, width, height))) >= POLYGON_BAND_VERTICES:
+        band_height = POLYGON_BAND_HEIGHT
+    bands = [range(start, min(start + band_height, rows.stop)) for start in range(rows.start, rows.stop, band_height)]
+    images = [Image.new(mode, (width, len(band))) for band in bands]
+    if fill_background:
+        for image in images:
+            image.paste(tuple(colors[-1].tolist()), (0, 0, image.width, image.height))
+    draws = [ImageDraw.Draw(image) for image in images]
+
+    lefts, uppers = ring_boxes(width, height)
+    for ring, (left, upper) in enumerate(zip(lefts.tolist(), uppers.tolist())):
+        if upper >= rows.stop or height - upper < rows.start:
+            continue
+
+        vertices = np.asarray(polygon((left, upper, width - left, height - upper)), dtype=np.float64).reshape(-1, 2)
+        vertices = vertices.astype(np.int64)
+        edges = _polygon_edges(vertices)
+        color = tuple(colors[len(lefts) - 1 - ring].tolist())
+        for band, to_draw in zip(bands, draws):
+            if upper >= band.stop or height - upper < band.start:
+                continue
+            trimmed = _band_polygon(vertices, edges, band)
+            if len(trimmed) > 0:
+                to_draw.polygon((trimmed - (0, band.start)).ravel().tolist(), fill=color)
+
+    return np.concatenate([np.asarray(image)[:, columns.start:columns.stop] for image in images])
+
+
+def _mirrored(indices, size):
+    """
+    Maps rows or columns of a field symmetric about the image's center onto those up to the center with equal values.
+    Pixels sit at integer coordinates, so index i mirrors onto size - i, and the first row or column has no mirror.
+    :param indices: array of row or column indices
+    :param size: height or width of the image
+    :return: array of the matching indices up to the center
+    """
+    return np.where(indices > (size // 2), size - indices, indices)
+
+
+def render_field(width, height, field, gradient_values, fill_background=True, rows=None, columns=None,
+                 mirror_x=False, mirror_y=False, chunk_size=1 << 20):
+    """
+    Renders a master_gradient style image of a shape from its field.
+    :param width: width of the image
+    :param height: height of the image
+    :param field: field function of the shape, ignored for a polygon
+    :param gradient_values: (ceil(max(width, height) / 2), channels) array of gradient colors, outermost ring last
+    :param fill_background: if pixels outside of the full sized shape should take the gradient's last color
+    :param rows: range of rows to render, every row if not given
+    :param columns: range of columns to render, every column if not given
+    :param mirror_x: if the field is symmetric left to right, so only columns up to the center need computing
+    :param mirror_y: if the field is symmetric top to bottom, so only rows up to the center need computing
+    :param chunk_size: greatest number of pixels to compute at once, bounding memory use
+    :return: (len(rows), len(columns), channels) uint8 array of the rendered pixels
+    """
+    if rows is None:
+        rows = range(height)
+    if columns is None:
+        columns = range(width)
+
+    colors = np.asarray(gradient_values).astype(np.uint8)
+    if fill_background:
+        background = colors[-1]
+    else:
+        background = np.zeros(colors.shape[1], dtype=np.uint8)
+    colors = np.concatenate((colors, background[None, :]))  # Index -1 picks the background
+
+    # Only the rows and columns up to the center are computed along a mirrored axis, then gathered into place
+    row_sources = _mirrored(np.arange(rows.start, rows.stop), height) if mirror_y else None
+    column_sources = _mirrored(np.arange(columns.start, columns.stop), width) if mirror_x else None
+    if row_sources is not None:
+        rows = range(row_sources.min(), row_sources.max() + 1)
+    if column_sources is not None:
+        columns = range(column_sources.min(), column_sources.max() + 1)
+
+    pixels = np.empty((len(rows), len(columns), colors.shape[1]), dtype=np.uint8)
+    step = max(1, chunk_size // max(1, len(columns)))
+    for start in range(0, len(rows), step):
+        band = range(rows.start + start, min(rows.start + start + step, rows.stop))
+        pixels[start:start + len(band)] = colors[gradient_indices(width, height, field, band, columns)]
+
+    if row_sources is None and column_sources is None:
+        return pixels
+
+    row_index = np.arange(len(rows)) if row_sources is None else row_sources - rows.start
+    column_index = np.arange(len(columns)) if column_sources is None else column_sources - columns.start
+    channels = colors.shape[1]
+    cells = pixels.view(f'V{channels}')[..., 0]  # Each pixel as a single element, so it's gathered in one copy
+    mirrored = cells[np.ix_(row_index, column_index)]
+    return mirrored.view(np.uint8).reshape(len(row_index), len(column_index), channels)
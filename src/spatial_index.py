@@ -0,0 +1,185 @@
+import math
+import numpy as np
+
+"""
+Uniform grid index for answering nearest point queries for large batches of query points at once.
+"""
+
+'''
+Space is divided into equally sized cells, and every cell stores the few points that could possibly be nearest to any
+location inside of it. For a cell with center c and "radius" r (greatest distance from c to anywhere in the cell), a
+point p can only be the nearest point to some location in the cell if dist(c, p) <= min_dist(c) + 2r, by the triangle
+inequality. A query is then a lookup of its cell followed by a handful of distance computations, which vectorizes
+cleanly over millions of query points, rather than a walk down a tree.
+'''
+
+
+def _squared_sum(deltas):
+    total = deltas[0] * deltas[0]
+    for delta in deltas[1:]:
+        total += delta * delta
+    return total
+
+
+def _absolute_sum(deltas):
+    total = np.abs(deltas[0])
+    for delta in deltas[1:]:
+        total += np.abs(delta)
+    return total
+
+
+def _absolute_max(deltas):
+    total = np.abs(deltas[0])
+    for delta in deltas[1:]:
+        np.maximum(total, np.abs(delta), out=total)
+    return total
+
+
+def _identity(values):
+    return values
+
+
+'''
+Each metric is given as a function ranking difference vectors (passed as one array of differences per axis) in the
+same order as their lengths, a function turning those ranks into lengths, and the radius of a cube of a given side
+length in d dimensions. Ranking by squared euclidean length saves a square root on every candidate.
+'''
+METRICS = {
+    'euclidean': (_squared_sum, np.sqrt, lambda side, d: side * math.sqrt(d) / 2),
+    'manhattan': (_absolute_sum, _identity, lambda side, d: side * d / 2),
+    'chebyshev': (_absolute_max, _identity, lambda side, d: side / 2),
+}
+
+
+class GridIndex:
+    """
+    Represents a set of points bucketed into a uniform grid of cells, each cell listing the points that could be
+    nearest to any location inside it.
+    """
+
+    def __init__(self, points, metric='euclidean', cell_size=None, bounds=None, max_cells=None, chunk_size=1 << 22):
+        """
+        Builds a grid index over the given points.
+        :param points: (K, D) array of points to index
+        :param metric: distance metric used for queries, one of 'euclidean', 'manhattan', or 'chebyshev'
+        :param cell_size: side length of every cell, by default chosen so there is about one point per cell
+        :param bounds: optional (lower, upper) corners of the region queries are expected in, the grid always covers
+        every point as well
+        :param max_cells: greatest number of cells to create, by default four times the number of points
+        :param chunk_size: greatest number of distances to compute at once, bounding memory use
+        :raise: if the metric isn't supported or no points are given
+        """
+        if metric not in METRICS:
+            raise ValueError(f'Metric must be one of {", ".join(METRICS)}!')
+
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim != 2 or len(points) < 1:
+            raise ValueError('At least one point must be given to index!')
+
+        self.points = points
+        self.metric = metric
+        self.chunk_size = chunk_size
+        self.rank, self.finish, radius = METRICS[metric]
+        count, dimensions = points.shape
+
+        lower = points.min(axis=0)
+        upper = points.max(axis=0)
+        if bounds is not None:
+            lower = np.minimum(lower, np.asarray(bounds[0], dtype=np.float64))
+            upper = np.maximum(upper, np.asarray(bounds[1], dtype=np.float64))
+        extent = np.maximum(upper - lower, 1e-9)
+
+        if max_cells is None:
+            max_cells = 4 * count
+        if cell_size is None:
+            cell_size = (np.prod(extent) / count) ** (1 / dimensions)
+        cell_size = max(cell_size, (np.prod(extent) / max(max_cells, 1)) ** (1 / dimensions))
+
+        self.lower = lower
+        self.cell_size = cell_size
+        self.shape = np.maximum(np.ceil(extent / cell_size).astype(np.intp), 1)
+        self.candidates = self._find_candidates(radius(cell_size, dimensions))
+
+    def _find_candidates(self, radius):
+        """
+        Finds the points that could be nearest to any location within each cell of this grid.
+        :param radius: greatest distance from a cell's center to anywhere within the cell
+        :return: (number of cells, M) array of point indices, each row sorted and padded with its first index
+        """
+        count = len(self.points)
+        grid = np.indices(self.shape).reshape(len(self.shape), -1).T
+        centers = self.lower + ((grid + .5) * self.cell_size)
+
+        rows = []
+        step = max(1, self.chunk_size // count)
+        for start in range(0, len(centers), step):
+            deltas = [centers[start:start + step, axis, None] - self.points[None, :, axis]
+                      for axis in range(self.points.shape[1])]
+            dists = self.finish(self.rank(deltas))
+            limit = dists.min(axis=1, keepdims=True) + (2 * radius)
+            limit += 1e-9 * (1 + limit)  # Keeps points tied with the limit despite floating point error
+            for row in dists <= limit:
+                rows.append(np.flatnonzero(row))
+
+        width = max(len(row) for row in rows)
+        candidates = np.empty((len(rows), width), dtype=np.intp)
+        for idx, row in enumerate(rows):
+            candidates[idx, :len(row)] = row
+            candidates[idx, len(row):] = row[0]
+        return candidates
+
+    def query(self, queries):
+        """
+        Finds the nearest indexed point to each of the given query points, ties going to the lowest index.
+        :param queries: (N, D) array of query points
+        :return: tuple of an (N,) array of nearest point indices and an (N,) array of the distances to them
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        indices = np.empty(len(queries), dtype=np.intp)
+        distances = np.empty(len(queries), dtype=np.float64)
+
+        step = max(1, self.chunk_size // self.candidates.shape[1])
+        for start in range(0, len(queries), step):
+            chunk = queries[start:start + step]
+            cells = np.floor((chunk - self.lower) / self.cell_size).astype(np.intp)
+            inside = np.all((cells >= 0) & (cells < self.shape), axis=1)
+
+            found = np.empty(len(chunk), dtype=np.intp)
+            found_dists = np.empty(len(chunk), dtype=np.float64)
+            if inside.any():
+                flat = np.ravel_multi_index(tuple(cells[inside].T), self.shape)
+                candidates = self.candidates[flat]
+                inside_chunk = chunk[inside]
+                ranks = self.rank([self.points[:, axis][candidates] - inside_chunk[:, axis, None]
+                                   for axis in range(self.points.shape[1])])
+                best = ranks.argmin(axis=1)
+                rows = np.arange(len(candidates))
+                found[inside] = candidates[rows, best]
+                found_dists[inside] = self.finish(ranks[rows, best])
+            if not inside.all():
+                found[~inside], found_dists[~inside] = self.brute_force(chunk[~inside])
+
+            indices[start:start + step] = found
+            distances[start:start + step] = found_dists
+
+        return indices, distances
+
+    def brute_force(self, queries):
+        """
+        Finds the nearest indexed point to each of the given query points by checking every indexed point.
+        :param queries: (N, D) array of query points
+        :return: tuple of an (N,) array of nearest point indices and an (N,) array of the distances to them
+        """
+        queries = np.asarray(queries, dtype=np.float64)
+        indices = np.empty(len(queries), dtype=np.intp)
+        distances = np.empty(len(queries), dtype=np.float64)
+
+        step = max(1, self.chunk_size // len(self.points))
+        for start in range(0, len(queries), step):
+            ranks = self.rank([self.points[None, :, axis] - queries[start:start + step, axis, None]
+                               for axis in range(self.points.shape[1])])
+            best = ranks.argmin(axis=1)
+            indices[start:start + step] = best
+            distances[start:start + step] = self.finish(ranks[np.arange(len(best)), best])
+
+        return indices, distances
@@ -0,0 +1,242 @@
+import os
+import struct
+import zlib
+from abc import ABC, abstractmethod
+import numpy as np
+
+"""
+Image encoders written to a strip of rows at a time, so images far larger than memory can be saved as they're rendered.
+"""
+
+'''
+Every writer takes (rows, width, channels) uint8 arrays of pixels in order from the top of the image down, and holds no
+more than a single strip at a time. PNG and BMP files take RGB or RGBA pixels, NPY files take any number of channels
+and are written through a memory map so they can be read back the same way.
+'''
+
+CHANNELS = {'RGB': 3, 'RGBA': 4}
+
+
+class StripWriter(ABC):
+    """
+    Represents an image file being written a strip of rows at a time.
+    """
+
+    def __init__(self, path, width, height, mode='RGB'):
+        """
+        Creates a StripWriter and begins the file.
+        :param path: path of the file to write
+        :param width: width of the image
+        :param height: height of the image
+        :param mode: mode of the pixels to write, 'RGB' or 'RGBA'
+        :raise: if the image is empty or the mode isn't supported
+        """
+        if width < 1 or height < 1:
+            raise ValueError('Image must have a width and height of at least 1!')
+        elif mode not in CHANNELS:
+            raise ValueError('Mode must be RGB or RGBA!')
+
+        self.path = path
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.channels = CHANNELS[mode]
+        self.rows_written = 0
+
+    def write(self, pixels):
+        """
+        Writes the next strip of rows of the image.
+        :param pixels: (rows, width, channels) array of the strip's pixels
+        :return: None
+        :raise: if the strip doesn't fit the image
+        """
+        pixels = np.asarray(pixels)
+        if pixels.shape[1:] != (self.width, self.channels):
+            raise ValueError('Strip must be a (rows, width, channels) array matching the image!')
+        elif self.rows_written + len(pixels) > self.height:
+            raise ValueError('Strip runs past the bottom of the image!')
+
+        self._write(pixels.astype(np.uint8, copy=False))
+        self.rows_written += len(pixels)
+
+    def close(self):
+        """
+        Finishes the file, which must have had every row written to it.
+        :return: None
+        :raise: if rows of the image are missing
+        """
+        if self.rows_written != self.height:
+            self._close()
+            raise ValueError(f'Only {self.rows_written} of the image\'s {self.height} rows were written!')
+        self._close()
+
+    @abstractmethod
+    def _write(self, pixels):
+        """
+        Writes the next strip of rows of the image, which has already been checked to fit it.
+        :param pixels: (rows, width, channels) uint8 array of the strip's pixels
+        :return: None
+        """
+
+    @abstractmethod
+    def _close(self):
+        """
+        Finishes the file, closing anything held open. May be called more than once.
+        :return: None
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._close()
+
+
+class PNGWriter(StripWriter):
+    """
+    Represents a PNG file being written a strip of rows at a time.
+    """
+
+    max_chunk_size = 1 << 20  # Compressed bytes gathered before writing an IDAT chunk
+
+    def __init__(self, path, width, height, mode='RGB', compress_level=6):
+        super().__init__(path, width, height, mode)
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = []
+        self._pending_size = 0
+
+        # Rows are filtered against the row above, which the first row takes to be all zeros
+        self._previous_row = np.zeros(width * self.channels, dtype=np.uint8)
+
+        color_type = 2 if mode == 'RGB' else 6
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+
+    def _write_chunk(self, chunk_type, data):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xffffffff))
+
+    def _add_compressed(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= PNGWriter.max_chunk_size:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self._pending:
+            self._write_chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+
+    def _write(self, pixels):
+        # Up filter, each byte stored as its difference from the byte above, which is zero down every gradient column
+        rows = pixels.reshape(len(pixels), -1)
+        above = np.concatenate((self._previous_row[None, :], rows[:-1]))
+        filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        np.subtract(rows, above, out=filtered[:, 1:])
+        self._previous_row = rows[-1].copy()
+        self._add_compressed(self._compressor.compress(filtered.tobytes()))
+
+    def _close(self):
+        if self._file.closed:
+            return
+        self._add_compressed(self._compressor.flush())
+        self._flush_pending()
+        self._write_chunk(b'IEND', b'')
+        self._file.close()
+
+
+class BMPWriter(StripWriter):
+    """
+    Represents a BMP file being written a strip of rows at a time. RGB images are written with 24 bits per pixel, RGBA
+    images with 32 and a V4 header whose bit fields mark the fourth byte of each pixel as alpha, since readers otherwise
+    take it to be unused.
+    """
+
+    file_header_size = 14
+    info_header_size = 40
+    v4_header_size = 108
+    bgra_masks = (0x00ff0000, 0x0000ff00, 0x000000ff, 0xff000000)  # Red, green, blue, and alpha of a little endian pixel
+
+    def __init__(self, path, width, height, mode='RGB'):
+        super().__init__(path, width, height, mode)
+        self._row_size = ((width * self.channels) + 3) & ~3  # Rows are padded to a multiple of 4 bytes
+        header_size = BMPWriter.info_header_size if mode == 'RGB' else BMPWriter.v4_header_size
+        self._offset = BMPWriter.file_header_size + header_size
+        file_size = self._offset + (self._row_size * height)
+        compression = 0 if mode == 'RGB' else 3  # BI_RGB, or BI_BITFIELDS
+
+        self._file = open(path, 'wb')
+        self._file.write(struct.pack('<2sIHHI', b'BM', file_size, 0, 0, self._offset))
+        self._file.write(struct.pack('<IiiHHIIiiII', header_size, width, height, 1, self.channels * 8, compression,
+                                     self._row_size * height, 2835, 2835, 0, 0))
+        if mode == 'RGBA':
+            # Masks, then the sRGB color space, whose unused endpoints and gamma are left zeroed
+            self._file.write(struct.pack('<4I4s', *BMPWriter.bgra_masks, b'BGRs'))
+            self._file.write(bytes(header_size - BMPWriter.info_header_size - 20))
+        self._file.truncate(file_size)
+
+    def _write(self, pixels):
+        # Rows are stored bottom up in BGR(A) order, so each strip lands reversed in its place from the end of the file
+        strip = np.zeros((len(pixels), self._row_size), dtype=np.uint8)
+        order = [2, 1, 0, 3][:self.channels]
+        strip[:, :self.width * self.channels] = pixels[::-1][:, :, order].reshape(len(pixels), -1)
+
+        bottom_row = self.rows_written + len(pixels) - 1
+        self._file.seek(self._offset + ((self.height - 1 - bottom_row) * self._row_size))
+        self._file.write(strip.tobytes())
+
+    def _close(self):
+        self._file.close()
+
+
+class NPYWriter(StripWriter):
+    """
+    Represents an NPY array of pixels being written a strip of rows at a time, through a memory map.
+    """
+
+    def __init__(self, path, width, height, mode='RGB', channels=None):
+        """
+        Creates an NPYWriter and its (height, width, channels) uint8 array.
+        :param channels: number of channels of each pixel, by default that of the mode
+        """
+        super().__init__(path, width, height, mode)
+        if channels is not None:
+            self.channels = channels
+        self._array = np.lib.format.open_memmap(path, 'w+', np.uint8, (height, width, self.channels))
+
+    def _write(self, pixels):
+        self._array[self.rows_written:self.rows_written + len(pixels)] = pixels
+        self._array.flush()
+
+    def _close(self):
+        if self._array is not None:
+            self._array.flush()
+            self._array = None
+
+
+WRITERS = {'.png': PNGWriter, '.bmp': BMPWriter, '.npy': NPYWriter}
+
+
+def open_writer(path, width, height, mode='RGB'):
+    """
+    Opens a strip writer for the format given by a file's extension, one of .png, .bmp, or .npy.
+    :param path: path of the file to write
+    :param width: width of the image
+    :param height: height of the image
+    :param mode: mode of the pixels to write, 'RGB' or 'RGBA'
+    :return: StripWriter for the file
+    :raise: if the file's format isn't supported
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in WRITERS:
+        raise ValueError('File must be a .png, .bmp, or .npy file!')
+    return WRITERS[extension](path, width, height, mode)
@@ -1,19 +1,36 @@
-from PIL import ImageDraw, Image
+from PIL import ImageDraw
 import random
-from src.color_models import RGB
+from color_models import RGB
 import math
 import sys
-from collections import deque
+import numpy as np
+from spatial_index import GridIndex
+from fortune import voronoi_cells, rasterize_cells, cells_to_svg
+from image_arrays import to_image
 
 """
 Implementation of a Voronoi diagram generator, with different distance functions
 """
 
+'''
+Every distance function works on single numbers as well as on numpy arrays, broadcasting the first coordinate against
+the second, so a whole block of pixels can be measured against every feature point in one call.
+'''
+
+CHUNK_SIZE = 1 << 22  # Greatest number of pixel to feature point distances computed at once
+INDEX_THRESHOLD = 512  # Fewest feature points worth building a spatial index over, below it every point is measured
+STRIP_SIZE = 1 << 16  # Pixels measured against one feature point at a time by separable metrics, sized to stay in cache
+TILE_SIZE = 64  # Side of the tiles separable metrics measure pixels in, each against just the feature points that could be closest
+REGROUP_FRACTION = .5  # Fraction of the pixels past which changed feature points are regrouped by a full pass instead
+
+
 def radivojac_distance(x0, y0, x1, y1):
     unnormalized = euclidean_distance(x0, y0, x1, y1)
-    x_value = max(x0, x1, abs(x0 - x1))
-    y_value = max(y0, y1, abs(y0 - y1))
-    return unnormalized / (x_value + y_value)
+    x_value = np.maximum(np.maximum(x0, x1), abs(x0 - x1))
+    y_value = np.maximum(np.maximum(y0, y1), abs(y0 - y1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distance = unnormalized / (x_value + y_value)
+    return np.where((x_value + y_value) > 0, distance, 0)  # Only zero when both coordinates are the origin
 
 
 def euclidean_distance(x0, y0, x1, y1):
@@ -25,7 +42,7 @@ def euclidean_distance(x0, y0, x1, y1):
     :param y1: y value of the second coordinate
     :return: euclidean distance
     """
-    return math.sqrt(((x1 - x0) ** 2) + ((y1 - y0) ** 2))
+    return np.sqrt(((x1 - x0) ** 2) + ((y1 - y0) ** 2))
 
 
 def manhattan_distance(x0, y0, x1, y1):
@@ -52,15 +69,295 @@ def ellipse_arc_distance(x0, y0, x1, y1):
     a = abs(x1 - x0)
     b = abs(y1 - y0)
     pi = 3.14159
-    return (pi / 4) * ((3 * (a + b)) - math.sqrt(((3 * a) + b) * (a + (3 * b))))
+    return (pi / 4) * ((3 * (a + b)) - np.sqrt(((3 * a) + b) * (a + (3 * b))))
+
+
+def chebyshev_distance(x0, y0, x1, y1):
+    """
+    Chebyshev distance algorithm, the greater of the distances along each axis.
+    :param x0: x value of the first coordinate
+    :param y0: y value of the first coordinate
+    :param x1: x value of the second coordinate
+    :param y1: y value of the second coordinate
+    :return: chebyshev distance
+    """
+    return np.maximum(abs(y1 - y0), abs(x1 - x0))
+
+
+# Distance functions a spatial index can find the closest feature point for, by the index's name for the metric
+INDEXED_METRICS = {euclidean_distance: 'euclidean', manhattan_distance: 'manhattan', chebyshev_distance: 'chebyshev'}
+
+# Distance functions ranked by combining a term for each axis, as the function applied to each axis' difference and how
+# the terms are combined - euclidean distances rank the same as their squares, so are never square rooted
+SEPARABLE_METRICS = {
+    euclidean_distance: (np.square, np.add),
+    manhattan_distance: (np.abs, np.add),
+    chebyshev_distance: (np.abs, np.maximum),
+}
+
+
+def _separable_labels(width, height, sites, term, combine, chunk_size):
+    """
+    Finds the closest feature point to every pixel of an image under a separable metric, a tile of pixels at a time.
+    Each tile keeps the closest so far while measuring its pixels against one feature point at a time, skipping the
+    feature points that are further from all of its pixels than another feature point is from any of them.
+    :param width: width of the image
+    :param height: height of the image
+    :param sites: (K, 2) array of feature points
+    :param term: function giving the rank term of each axis from its differences
+    :param combine: function combining the rank terms of each axis
+    :param chunk_size: greatest number of pixels to measure at once
+    :return: (height, width) int32 array of the index of each pixel's closest feature point, the first of any ties
+    """
+    column_terms = term(np.arange(width, dtype=np.float64)[None, :] - sites[:, 0, None])
+    row_terms = term(np.arange(height, dtype=np.float64)[:, None] - sites[:, 1])
+
+    tile_width = min(width, TILE_SIZE)
+    step = max(1, min(chunk_size, STRIP_SIZE, TILE_SIZE * tile_width) // tile_width)
+    tops = np.arange(0, height, step)
+    lefts = np.arange(0, width, tile_width)
+
+    # Bounds of each feature point's ranks over every tile, as the rank terms are combined monotonically
+    nearest = combine(np.minimum.reduceat(row_terms, tops)[:, None],
+                      np.minimum.reduceat(column_terms, lefts, axis=1).T[None])
+    furthest = combine(np.maximum.reduceat(row_terms, tops)[:, None],
+                       np.maximum.reduceat(column_terms, lefts, axis=1).T[None])
+    candidates = nearest <= furthest.min(axis=-1, keepdims=True)
+
+    labels = np.empty((height, width), dtype=np.int32)
+    for row, top in enumerate(tops.tolist()):
+        rows = row_terms[top:top + step]
+        for column, left in enumerate(lefts.tolist()):
+            columns = column_terms[:, left:left + tile_width]
+            tile_labels = labels[top:top + step, left:left + tile_width]
+            first, *others = np.flatnonzero(candidates[row, column]).tolist()
+            closest = combine(rows[:, first, None], columns[first])
+            tile_labels[...] = first
+            ranks = np.empty_like(closest)
+            closer = np.empty(closest.shape, dtype=bool)
+            for idx in others:
+                combine(rows[:, idx, None], columns[idx], out=ranks)
+                np.less(ranks, closest, out=closer)
+                np.copyto(closest, ranks, where=closer)
+                np.copyto(tile_labels, idx, where=closer)
+    return labels
+
+
+def find_labels(width, height, feature_points, distance=euclidean_distance, chunk_size=CHUNK_SIZE, indexed=None):
+    """
+    Finds the closest feature point to every pixel of an image. Pixels are either measured a block of rows at a time
+    against every feature point (a feature point at a time for metrics in SEPARABLE_METRICS), or, for many feature
+    points under a metric in INDEXED_METRICS, looked up in a grid index of the feature points that only measures the
+    few that could be closest.
+    :param width: width of the image
+    :param height: height of the image
+    :param feature_points: list of (x, y) feature points
+    :param distance: distance algorithm to use, called with arrays of pixel coordinates then feature point coordinates
+    :param chunk_size: greatest number of pixel to feature point distances to compute at once, bounding memory use
+    :param indexed: if the feature points should be looked up in a spatial index, by default when there are at least
+    INDEX_THRESHOLD of them and the distance algorithm supports it
+    :return: (height, width) int32 array of the index of each pixel's closest feature point, the first of any ties
+    :raise: if an index is asked for with a distance algorithm it doesn't support
+    """
+    sites = np.asarray(feature_points, dtype=np.float64).reshape(-1, 2)
+    if indexed is None:
+        indexed = distance in INDEXED_METRICS and len(sites) >= INDEX_THRESHOLD
+    elif indexed and distance not in INDEXED_METRICS:
+        raise ValueError('Only euclidean, manhattan, and chebyshev distances can be indexed!')
+
+    labels = np.empty((height, width), dtype=np.int32)
+    if indexed:
+        index = GridIndex(sites, INDEXED_METRICS[distance], bounds=((0, 0), (width - 1, height - 1)),
+                          chunk_size=chunk_size)
+        step = max(1, chunk_size // (width * index.candidates.shape[1]))
+        x = np.arange(width, dtype=np.float64)
+        for top in range(0, height, step):
+            ys, xs = np.meshgrid(np.arange(top, min(top + step, height), dtype=np.float64), x, indexing='ij')
+            labels[top:top + step] = index.query(np.column_stack((xs.ravel(), ys.ravel())))[0].reshape(xs.shape)
+        return labels
+    elif distance in SEPARABLE_METRICS:
+        return _separable_labels(width, height, sites, *SEPARABLE_METRICS[distance], chunk_size)
+
+    site_x = sites[:, 0]
+    site_y = sites[:, 1]
+    x = np.arange(width, dtype=np.float64)[None, :, None]
+    step = max(1, chunk_size // max(1, width * len(sites)))
+    for top in range(0, height, step):
+        y = np.arange(top, min(top + step, height), dtype=np.float64)[:, None, None]
+        labels[top:top + step] = np.argmin(distance(x, y, site_x, site_y), axis=-1)
+    return labels
+
+
+def _shifted(size, offset):
+    """
+    Slices of the pixels along an axis that a pixel offset by the given amount stays within, and of where they land.
+    :param size: width or height of the image
+    :param offset: number of pixels to offset by
+    :return: tuple of the slice of pixels landing inside the image, and the slice they land on
+    """
+    return slice(max(0, -offset), min(size, size - offset)), slice(max(0, offset), min(size, size + offset))
+
+
+def jump_flood_labels(width, height, feature_points, distance=euclidean_distance):
+    """
+    Approximates the closest feature point to every pixel of an image by jump flooding. Each feature point is seeded at
+    its nearest pixel, then every pixel takes whichever of its own and eight neighbors' closest feature points is
+    closest to it, with neighbors at half the image's size apart, then a quarter, and so on down to a single pixel, and
+    once more at a single pixel. Costs a fixed number of passes over the image however many feature points there are,
+    with a handful of pixels, mostly along the edges of long thin groupings, labelled with a close but not the closest
+    feature point.
+    :param width: width of the image
+    :param height: height of the image
+    :param feature_points: list of (x, y) feature points
+    :param distance: distance algorithm to use, called with arrays of pixel coordinates then feature point coordinates
+    :return: (height, width) int32 array of the index of each pixel's (approximately) closest feature point
+    """
+    sites = np.asarray(feature_points, dtype=np.float64).reshape(-1, 2)
+
+    # Unlabelled pixels are labelled -1, which picks out a feature point infinitely far away
+    site_x = np.append(sites[:, 0], np.inf)
+    site_y = np.append(sites[:, 1], np.inf)
+    x = np.arange(width, dtype=np.float64)[None, :]
+    y = np.arange(height, dtype=np.float64)[:, None]
+
+    # Of the feature points rounding to the same pixel, the pixel is seeded with the closest, then the first of them
+    labels = np.full((height, width), -1, dtype=np.int32)
+    seeds = np.clip(np.rint(sites).astype(np.intp), 0, (width - 1, height - 1))
+    order = np.lexsort((np.arange(len(sites)), distance(seeds[:, 0], seeds[:, 1], sites[:, 0], sites[:, 1])))
+    seed_pixels = (seeds[order, 1] * width) + seeds[order, 0]
+    _, first = np.unique(seed_pixels, return_index=True)
+    labels.flat[seed_pixels[first]] = order[first]
+    best = distance(x, y, site_x[labels], site_y[labels])
+
+    steps = []
+    step = 1 << max(0, (max(width, height) - 1).bit_length() - 1)
+    while step >= 1:
+        steps.append(step)
+        step //= 2
+    steps.append(1)
+
+    for step in steps:
+        previous = labels.copy()
+        for offset_y in (-step, 0, step):
+            for offset_x in (-step, 0, step):
+                if offset_x == 0 and offset_y == 0:
+                    continue
+                rows, source_rows = _shifted(height, offset_y)
+                columns, source_columns = _shifted(width, offset_x)
+
+                candidates = previous[source_rows, source_columns]
+                candidate_distances = distance(x[:, columns], y[rows], site_x[candidates], site_y[candidates])
+                closest = best[rows, columns]
+                closest_labels = labels[rows, columns]
+
+                # Ties go to the first feature point, as with the exact labels
+                closer = candidate_distances < closest
+                closer |= (candidate_distances == closest) & (candidates < closest_labels)
+                np.copyto(closest, candidate_distances, where=closer)
+                np.copyto(closest_labels, candidates, where=closer)
+
+    return labels
+
+
+# Ways of labelling a diagram's pixels with their closest feature points
+LABEL_METHODS = {'exact': find_labels, 'jump_flood': jump_flood_labels}
+
+
+def label_adjacency(labels, count):
+    """
+    Finds which labels border each other in a label map, counting pixels touching at a corner as bordering.
+    :param labels: (height, width) array of labels
+    :param count: number of labels
+    :return: list of the set of labels bordering each label
+    """
+    height, width = labels.shape
+    first = []
+    second = []
+    for offset_y, offset_x in ((0, 1), (1, -1), (1, 0), (1, 1)):  # The other four neighbors mirror these
+        rows, neighbor_rows = _shifted(height, offset_y)
+        columns, neighbor_columns = _shifted(width, offset_x)
+        own = labels[rows, columns]
+        neighbor = labels[neighbor_rows, neighbor_columns]
+        bordering = own != neighbor
+        first.append(own[bordering])
+        second.append(neighbor[bordering])
+    return _adjacency_sets(np.concatenate(first), np.concatenate(second), count)
+
+
+def label_sums(labels, count):
+    """
+    Counts and sums the coordinates of the pixels of each label in a label map, a run of equal labels along a row at a
+    time rather than a pixel at a time.
+    :param labels: (height, width) array of labels
+    :param count: number of labels
+    :return: tuple of the (count,) int64 array of the number of pixels of each label and the (count, 2) float64 array
+    of the sums of their x and y values
+    """
+    height, width = labels.shape
+    starts = np.ones(labels.shape, dtype=bool)
+    np.not_equal(labels[:, 1:], labels[:, :-1], out=starts[:, 1:])
+    starts = np.flatnonzero(starts)
+    lengths = np.diff(starts, append=labels.size)
+    run_labels = labels.ravel()[starts]
+    ys, lefts = np.divmod(starts, width)
+    sums = np.column_stack((np.bincount(run_labels, weights=lengths * (2 * lefts + lengths - 1) / 2, minlength=count),
+                            np.bincount(run_labels, weights=lengths * ys, minlength=count)))
+    return np.bincount(run_labels, weights=lengths, minlength=count).astype(np.int64), sums
+
+
+def _label_pairs(first, second, count):
+    # Distinct pairs of labels, each pair as a single integer so they're found with a flat sort
+    pairs = np.unique((first.astype(np.int64) * count) + second)
+    return zip(*(part.tolist() for part in np.divmod(pairs, count)))
+
+
+def _adjacency_sets(first, second, count):
+    adjacency = [set() for _ in range(count)]
+    for a, b in _label_pairs(first, second, count):
+        adjacency[a].add(b)
+        adjacency[b].add(a)
+    return adjacency
+
+
+class CoordinateGroupings:
+    """
+    Represents the coordinate groupings of a Voronoi diagram as lists of (x, y) tuples, each list only built from the
+    diagram's pixel index when it's asked for.
+    """
+
+    def __init__(self, diagram):
+        self.diagram = diagram
+
+    def __len__(self):
+        return len(self.diagram.offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        elif idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('Grouping index out of range!')
+
+        xs, ys = self.diagram.grouping(idx)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
 
 
 class VoronoiDiagram:
     """
     Represents the feature points, coordinate groupings, height, and width of a Voronoi diagram.
+
+    Pixels are grouped by their label, the index of their closest feature point, and indexed CSR style: pixel_index
+    holds the flat index (y * width + x) of every pixel, sorted by label and then in row major order, and the pixels of
+    grouping i are pixel_index[offsets[i]:offsets[i + 1]].
     """
 
-    def __init__(self, width, height, number_of_feature_points, optimization_threshold=2, distance=euclidean_distance):
+    def __init__(self, width, height, number_of_feature_points, optimization_threshold=2, distance=euclidean_distance,
+                 method='exact'):
         """
         Creates a Voronoi diagram from a given width, height, number of feature points, and distance algorithm.
         :param width: max width of this Voronoi diagram
@@ -68,12 +365,24 @@ class VoronoiDiagram:
         :param number_of_feature_points: number of feature points this Voronoi diagram will always have
         :param optimization_threshold: stopping threshold to dictate when to stop optimization, lower value = closer clusters
         :param distance: distance algorithm to use for computing the distance between points and feature points
+        :param method: how pixels are labelled with their closest feature point, 'exact', or 'jump_flood' to
+        approximate them at a cost independent of the number of feature points
         """
+        if method not in LABEL_METHODS:
+            raise ValueError('Method must be exact or jump_flood!')
+
         self.width = width
         self.height = height
         self.distance = distance
+        self.method = method
         self.optimization_threshold = optimization_threshold
-        self.coor_groupings = []
+        self.labels = None
+        self.pixel_index = None
+        self.offsets = None
+        self.cells = None
+        self.residuals = []
+        self._adjacency = None
+        self._sums = None
         self.feature_points = set()
 
         if number_of_feature_points < 1:
@@ -94,63 +403,409 @@ class VoronoiDiagram:
         :return: None
         """
 
-        feature_points_and_coor_groupings = dict()
-        for feature_point in self.feature_points:
-            feature_points_and_coor_groupings[feature_point] = deque()
+        self.labels = LABEL_METHODS[self.method](self.width, self.height, self.feature_points, self.distance)
+        self.cells = None
+        self._group_labels()
 
-        for y in range(self.height):
-            for x in range(self.width):
-                feature_point_dists = [(feature_point, self.distance(x, y, feature_point[0], feature_point[1]))
-                                       for feature_point in self.feature_points]
-                closest = min(feature_point_dists, key=lambda x: x[1])
-                feature_points_and_coor_groupings.get(closest[0]).append((x,y))
+    def _group_labels(self):
+        """
+        Indexes the pixels of this Voronoi diagram by their labels.
+        :return: None
+        """
+        dtype = np.int32 if self.labels.size <= np.iinfo(np.int32).max else np.int64
+        self.pixel_index = np.argsort(self.labels, axis=None, kind='stable').astype(dtype)
+        self.offsets = np.zeros(len(self.feature_points) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.labels.ravel(), minlength=len(self.feature_points)), out=self.offsets[1:])
+        self._adjacency = None
+        self._sums = None
+
+    def grouping(self, idx):
+        """
+        Returns the pixels of one of this Voronoi diagram's coordinate groupings.
+        :param idx: index of the grouping's feature point
+        :return: tuple of arrays of the x and y values of the grouping's pixels, in row major order
+        """
+        ys, xs = np.divmod(self.pixel_index[self.offsets[idx]:self.offsets[idx + 1]], self.width)
+        return xs, ys
+
+    def neighbors(self, idx):
+        """
+        Returns the feature points whose groupings border a feature point's grouping.
+        :param idx: index of the feature point
+        :return: sorted list of the indices of the neighboring feature points
+        """
+        return sorted(self._site_adjacency()[idx])
+
+    def _site_adjacency(self):
+        if self._adjacency is None:
+            self._adjacency = label_adjacency(self.labels, len(self.feature_points))
+        return self._adjacency
+
+    def _site_sums(self):
+        # Sums of the x and y values of each grouping's pixels
+        if self._sums is None:
+            self._sums = label_sums(self.labels, len(self.feature_points))[1]
+        return self._sums
+
+    def move_site(self, idx, point):
+        """
+        Moves a feature point of this Voronoi diagram, regrouping only the pixels around it.
+        :param idx: index of the feature point
+        :param point: (x, y) point to move it to
+        :return: None
+        """
+        self.move_sites([idx], [point])
+
+    def move_sites(self, indices, points):
+        """
+        Moves feature points of this Voronoi diagram, regrouping only the pixels around them.
+        :param indices: list of the indices of the feature points
+        :param points: list of the (x, y) points to move each to
+        :return: None
+        """
+        for idx, point in zip(indices, points):
+            self.feature_points[idx] = tuple(point)
+        self._update_groupings([int(idx) for idx in indices])
+
+    def add_site(self, point):
+        """
+        Adds a feature point to this Voronoi diagram, regrouping only the pixels around it.
+        :param point: (x, y) point to add
+        :return: index of the added feature point
+        """
+        self.feature_points.append(tuple(point))
+        self._update_groupings([len(self.feature_points) - 1])
+        return len(self.feature_points) - 1
+
+    def remove_site(self, idx):
+        """
+        Removes a feature point from this Voronoi diagram, handing the pixels of its grouping to its neighbors. Feature
+        points after it move down an index.
+        :param idx: index of the feature point
+        :return: None
+        :raise: if it's the last feature point
+        """
+        if len(self.feature_points) == 1:
+            raise ValueError('Number of feature points must be >= 1')
+
+        self.cells = None
+        regrouped = False
+        if self._regroupable():
+            adjacency = self._site_adjacency()
+            regrouped = self._regroup([], removed=idx)
+        if not regrouped:
+            del self.feature_points[idx]
+            self.find_groupings()
+            return
+
+        # Its grouping is empty now, so every later label just moves down one
+        del self.feature_points[idx]
+        self.labels[self.labels > idx] -= 1
+        self.offsets = np.delete(self.offsets, idx)
+        if self._sums is not None:
+            self._sums = np.delete(self._sums, idx, axis=0)
+        self._adjacency = [{neighbor - (neighbor > idx) for neighbor in group}
+                           for site, group in enumerate(adjacency) if site != idx]
+
+    def _update_groupings(self, changed):
+        self.cells = None
+        if not self._regroupable() or not self._regroup(changed):
+            self.find_groupings()
+
+    def _regroupable(self):
+        # Regrouping only tests pixels near the changed feature points, which only finds the closest feature point
+        # under the metrics find_labels ranks by their own terms, where every grouping is contiguous around its feature
+        # point, and only matches the labels of the exact method
+        return self.method == 'exact' and (self.distance in SEPARABLE_METRICS or self.distance in INDEXED_METRICS)
 
-        self.coor_groupings = list(feature_points_and_coor_groupings.values())
+    def _regroup(self, changed, removed=None):
+        """
+        Regroups the pixels of this Voronoi diagram around feature points that moved or were added, or one being
+        removed. Only the pixels of the groupings of those feature points, of their neighbors, and of the groupings
+        around their new points are tested, each against the feature point it's grouped with, that feature point's
+        neighbors, and the changed feature points reaching it - widening out wherever a grouping turns out to run up
+        against pixels it wasn't tested for. The pixel index, sums, and adjacency are updated to match.
+        :param changed: list of indices of feature points that moved or were added, added ones being the last
+        :param removed: index of a feature point whose pixels should be handed to the others, if any
+        :return: if the pixels were regrouped, or False if the changes reach too far for it and every pixel should be
+        regrouped instead
+        """
+        adjacency = self._site_adjacency()
+        count = len(self.feature_points)
+        grouped = len(self.offsets) - 1  # Feature points beyond these were just added, without groupings yet
+        points = np.asarray(self.feature_points, dtype=np.float64)
+        flat = self.labels.reshape(-1)
+
+        # Feature points each grouping's pixels are tested against besides its own and its neighbors - every changed
+        # feature point is tested in its own and its neighbors' groupings, and those around its new point
+        extra = {}
+        for idx in changed:
+            x, y = np.clip(np.rint(points[idx]), 0, (self.width - 1, self.height - 1)).astype(np.intp)
+            owner = int(self.labels[y, x])
+            for grouping in {owner} | adjacency[owner] | ({idx} | adjacency[idx] if idx < grouped else set()):
+                extra.setdefault(grouping, set()).add(idx)
+        affected = set(extra)
+        if removed is not None:
+            affected |= {removed} | adjacency[removed]
+
+        sizes = np.zeros(count, dtype=np.int64)
+        sizes[:grouped] = np.diff(self.offsets)
+        is_changed = np.zeros(count, dtype=bool)
+        is_changed[changed] = True
+        empty = set(np.flatnonzero(sizes == 0).tolist())  # Groupings bordering nothing, which any pixel may join
+        while True:
+            affected = sorted(affected)
+            if sizes[affected].sum() > REGROUP_FRACTION * flat.size:
+                return False
+            segments = [self.pixel_index[self.offsets[idx]:self.offsets[idx + 1]] for idx in affected]
+            if not any(len(segment) for segment in segments):
+                return False
+
+            # Box around the regrouped pixels, and a pixel beyond, with the regrouped pixels marked
+            rows, columns = np.divmod(np.concatenate(segments), self.width)
+            top, left = max(rows.min() - 1, 0), max(columns.min() - 1, 0)
+            bottom, right = min(rows.max() + 2, self.height), min(columns.max() + 2, self.width)
+            box = self.labels[top:bottom, left:right]
+            before = box.copy()
+            in_region = np.zeros(box.shape, dtype=bool)
+            in_region[rows - top, columns - left] = True
+
+            tested = []  # Each grouping's index times count plus each feature point its pixels were tested against
+            for idx, segment in zip(affected, segments):
+                candidates = ({idx} | adjacency[idx] | extra.get(idx, set()) | empty) - {removed}
+                candidates = np.array(sorted(candidates), dtype=np.intp)
+                tested.append((idx * count) + candidates)
+                if len(segment) == 0 or len(candidates) == 0:
+                    continue
+                ys, xs = np.divmod(segment, self.width)
+                if self.distance in SEPARABLE_METRICS:
+                    # Ranked as find_labels ranks them, so ties go the same way
+                    term, combine = SEPARABLE_METRICS[self.distance]
+                    ranks = combine(term(xs[:, None] - points[candidates, 0]), term(ys[:, None] - points[candidates, 1]))
+                else:
+                    ranks = self.distance(xs[:, None], ys[:, None], points[candidates, 0], points[candidates, 1])
+                flat[segment] = candidates[np.argmin(ranks, axis=1)]
+            tested = np.sort(np.concatenate(tested))
+
+            # Labels bordering each other around the region, and any grouping now running up against pixels it wasn't
+            # tested for - its grouping may carry on into them, as a changed one can into untested groupings, or an
+            # unchanged one into a changed grouping it only bordered outside of the image
+            first = []
+            second = []
+            escaped = []
+            for offset_y, offset_x in ((0, 1), (1, -1), (1, 0), (1, 1)):
+                box_rows, neighbor_rows = _shifted(box.shape[0], offset_y)
+                box_columns, neighbor_columns = _shifted(box.shape[1], offset_x)
+                own = box[box_rows, box_columns]
+                neighbor = box[neighbor_rows, neighbor_columns]
+                own_inside = in_region[box_rows, box_columns]
+                neighbor_inside = in_region[neighbor_rows, neighbor_columns]
+                bordering = (own != neighbor) & (own_inside | neighbor_inside)
+                own = own[bordering]
+                neighbor = neighbor[bordering]
+                first.append(own)
+                second.append(neighbor)
+
+                for label, other, other_inside in ((own, before[neighbor_rows, neighbor_columns], neighbor_inside),
+                                                   (neighbor, before[box_rows, box_columns], own_inside)):
+                    other = other[bordering]
+                    keys = (other.astype(np.int64) * count) + label
+                    found = tested[np.minimum(np.searchsorted(tested, keys), len(tested) - 1)] == keys
+                    untested = ~found & (other_inside[bordering] | is_changed[label])
+                    escaped.append(np.column_stack((other[untested], label[untested])))
+
+            escaped = np.unique(np.concatenate(escaped), axis=0)
+            if len(escaped) == 0:
+                break
+
+            box[in_region] = before[in_region]
+            for grouping, idx in escaped.tolist():
+                extra.setdefault(grouping, set()).add(idx)
+            affected = set(affected) | set(escaped[:, 0].tolist())
+
+        region_rows, region_columns = np.nonzero(in_region)  # Row major, as the pixel index is
+        region = ((region_rows + top) * self.width) + region_columns + left
+        labels = box[in_region]
+
+        # Untested groupings that took regrouped pixels, found bordering outside of the image, are reindexed whole
+        new_sizes = np.bincount(labels, minlength=count)
+        tested_groupings = is_changed.copy()
+        tested_groupings[affected] = True
+        gainers = np.flatnonzero((new_sizes > 0) & ~tested_groupings).tolist()
+        if gainers:
+            region = np.sort(np.concatenate([region] + [self.pixel_index[self.offsets[idx]:self.offsets[idx + 1]]
+                                                        for idx in gainers]))
+            labels = flat[region]
+            new_sizes = np.bincount(labels, minlength=count)
+
+        # Pixel index, with the regrouped pixels of each touched grouping spliced between the untouched runs
+        touched = sorted(set(affected) | set(changed) | set(gainers))
+        order = np.argsort(labels, kind='stable')
+        region = region[order].astype(self.pixel_index.dtype)
+        starts = np.searchsorted(labels[order], np.arange(count))
+        sizes[touched] = 0
+        sizes += new_sizes
+
+        pieces = []
+        previous = 0
+        for idx in touched:
+            if previous < min(idx, grouped):
+                pieces.append(self.pixel_index[self.offsets[previous]:self.offsets[min(idx, grouped)]])
+            pieces.append(region[starts[idx]:starts[idx] + new_sizes[idx]])
+            previous = idx + 1
+        if previous < grouped:
+            pieces.append(self.pixel_index[self.offsets[previous]:])
+        self.pixel_index = np.concatenate(pieces)
+        self.offsets = np.concatenate(([0], np.cumsum(sizes)))
+
+        if self._sums is not None:
+            sums = np.zeros((count, 2))
+            sums[:grouped] = self._sums
+            sums[touched] = 0
+            ys, xs = np.divmod(region, self.width)
+            sums[:, 0] += np.bincount(labels[order], weights=xs, minlength=count)
+            sums[:, 1] += np.bincount(labels[order], weights=ys, minlength=count)
+            self._sums = sums
+
+        adjacency.extend(set() for _ in range(count - len(adjacency)))
+        for idx in set(affected) | set(changed):  # Those gaining pixels keep bordering what they did outside the box
+            for neighbor in adjacency[idx]:
+                adjacency[neighbor].discard(idx)
+            adjacency[idx] = set()
+        for a, b in _label_pairs(np.concatenate(first), np.concatenate(second), count):
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+        return True
+
+    @property
+    def coor_groupings(self):
+        """
+        Returns the coordinate groupings of this Voronoi diagram, as a list-like view of (x, y) tuples built on demand.
+        :return: CoordinateGroupings of this Voronoi diagram
+        """
+        return CoordinateGroupings(self)
+
+    def count_mislabeled(self):
+        """
+        Counts the pixels of this Voronoi diagram's groupings that aren't grouped with their closest feature point, as
+        with approximate labelling methods.
+        :return: number of pixels labelled differently from the exact labels
+        """
+        exact = find_labels(self.width, self.height, self.feature_points, self.distance)
+        return int(np.count_nonzero(self.labels != exact))
 
     def find_groupings_by_fortune(self):
-        pass
+        """
+        Finds the latest coordinate groupings for this Voronoi diagram from the polygon of each feature point's cell, as
+        found by Fortune's algorithm, rather than by measuring every pixel. Cells are kept in self.cells.
+        :return: None
+        :raise: if this Voronoi diagram doesn't use the euclidean distance
+        """
+        if self.distance is not euclidean_distance:
+            raise ValueError('Fortune\'s algorithm only supports the euclidean distance!')
 
-    def optimize(self):
+        # Pixel (x, y) covers the unit square around (x, y)
+        self.cells = voronoi_cells(self.feature_points, (-.5, -.5, self.width - .5, self.height - .5))
+        self.labels = rasterize_cells(self.cells, self.width, self.height)
+        self._group_labels()
+
+    def to_svg(self, display_feature_points=True):
+        """
+        Draws the cells of this Voronoi diagram as polygons in an SVG image, each cell in a random color.
+        :param display_feature_points: if the feature points should be marked
+        :return: string of the SVG image
+        :raise: if this Voronoi diagram doesn't use the euclidean distance
+        """
+        if self.cells is None:
+            self.find_groupings_by_fortune()
+        colors = [f'rgb{RGB.random_rgb().output()}' for _ in self.cells]
+        return cells_to_svg(self.cells, self.width, self.height, colors,
+                            self.feature_points if display_feature_points else None)
+
+    def optimize(self, max_iterations=None, tolerance=None, verbose=False, incremental=False):
         """
         'Optimizes' this Voronoi diagram according to k-means clustering / Lloyd's algorithm to produce largely
-        similarly sized groupings and evenly spaced feature points.
+        similarly sized groupings and evenly spaced feature points. Every iteration moves each feature point to the
+        centroid of its grouping, dropping feature points whose groupings are empty, then regroups the pixels. The
+        distances each feature point moved are kept in self.residuals, a list with an array per iteration.
+        :param max_iterations: greatest number of iterations to run, unlimited if not given
+        :param tolerance: if given, stops once no feature point moves further than it, rather than once the feature
+        points move no further on average than the optimization threshold
+        :param verbose: if the distances moved should be printed every iteration
+        :param incremental: if only feature points moving further than the tolerance should be moved each iteration,
+        regrouping just the pixels around them - late iterations, where few feature points still move, then cost a
+        fraction of a full pass
         :return: None
+        :raise: if an incremental optimization isn't given a tolerance
         """
-        old_feature_points = self.feature_points
-        new_feature_points = old_feature_points
+        if incremental and tolerance is None:
+            raise ValueError('Incremental optimization must be given a tolerance!')
 
-        avg_dist_moved = None
-        while avg_dist_moved is None or avg_dist_moved > self.optimization_threshold:  # Adjust me! 10 for ellipse arc, 1.9 otherwise
-            print(avg_dist_moved)
-            self.find_groupings()
+        self.residuals = []
+        grouped = True  # If the pixel index, sums, and adjacency match the labels
+        while max_iterations is None or len(self.residuals) < max_iterations:
+            count = len(self.feature_points)
+            if incremental and grouped:
+                sizes = np.diff(self.offsets)
+                sums = self._site_sums()
+            else:
+                sizes, sums = label_sums(self.labels, count)
+            occupied = sizes > 0
+            centroids = sums[occupied] / sizes[occupied, None]
+
+            points = np.asarray(self.feature_points, dtype=np.float64)[occupied]
+            moved = centroids - points
+            moved = np.hypot(moved[:, 0], moved[:, 1])
+            self.residuals.append(moved)
+            if verbose:
+                print(f'Iteration {len(self.residuals)}: moved {moved.mean():.4f} on average, {moved.max():.4f} at most')
+
+            if incremental:
+                far = moved > tolerance
+                if not far.any():
+                    break
+
+                points[far] = centroids[far]
+                centroids = points
+                if self._regroupable() and occupied.all() and far.sum() <= REGROUP_FRACTION * count:
+                    # Groupings of the moving feature points and their neighbors, a floor on the pixels regrouped
+                    moving = np.flatnonzero(far).tolist()
+                    adjacency = self._site_adjacency() if grouped else label_adjacency(self.labels, count)
+                    reached = set(moving).union(*(adjacency[idx] for idx in moving))
+                    if sizes[list(reached)].sum() <= REGROUP_FRACTION * self.labels.size:
+                        if not grouped:
+                            self._group_labels()
+                            self._adjacency = adjacency
+                        self.feature_points = [tuple(point) for point in centroids.tolist()]
+                        self.cells = None
+                        grouped = self._regroup(moving)
+                        if grouped:
+                            continue
 
-            old_feature_points = new_feature_points
-            new_feature_points = []
+                # Too many feature points still moving to regroup around, so every pixel is relabelled
+                grouped = False
 
-            avg_dist_moved = []
-            for idx, group in enumerate(self.coor_groupings):
-                group_length = len(group)
-                if group_length > 0:
-                    xy = tuple([sum(x) / group_length for x in zip(*group)])
-                    old_feature_points_coor = old_feature_points[idx]
-                    avg_dist_moved.append(euclidean_distance(xy[0], xy[1], old_feature_points_coor[0],
-                                                         old_feature_points_coor[1]))
-                    new_feature_points.append(xy)
+            self.feature_points = [tuple(point) for point in centroids.tolist()]
+            self.labels = LABEL_METHODS[self.method](self.width, self.height, self.feature_points, self.distance)
+            if incremental:
+                continue
+            elif tolerance is not None and moved.max() <= tolerance:
+                break
+            elif tolerance is None and moved.mean() <= self.optimization_threshold:
+                break
 
-            avg_dist_moved = sum(avg_dist_moved) / len(new_feature_points)
-            self.feature_points = new_feature_points
+        if not grouped or not incremental:
+            self.cells = None
+            self._group_labels()
 
     def view(self, display_feature_points=True):
         """
         Displays the feature points and group of this Voronoi diagram on an image.
         :return:
         """
-        to_render = Image.new('RGB', (self.width, self.height))
+        colors = np.array([RGB.random_rgb().output() for _ in self.feature_points], dtype=np.uint8)
+        to_render = to_image(colors[self.labels])
         to_draw = ImageDraw.Draw(to_render)
-        for idx, group in enumerate(self.coor_groupings):
-            cur_color = RGB.random_rgb().output()
-            for coor in group:
-                to_draw.point(coor, fill=cur_color)
 
         if display_feature_points:
             for coor in self.feature_points:
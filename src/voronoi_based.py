@@ -4,6 +4,8 @@ import math
 import random
 from PIL import Image, ImageDraw
 from gradients import create_color_gradient
+from image_arrays import from_image, to_image
+import numpy as np
 
 """
 Methods based off of Voronoi diagram generation.
@@ -52,30 +54,19 @@ def frosted_glass(img_path, reduced_height=500):
     resize_width = round(resize_height * (width / height))
     image = image.resize((resize_width, resize_height))
 
-    dummy_img = Image.new('RGB', (resize_width, resize_height))
-    draw = ImageDraw.Draw(dummy_img)
     num_of_points = round((resize_width * resize_width) / 100)
     vor = VoronoiDiagram(resize_width, resize_height, num_of_points)
     vor.optimize()
 
-    for group in vor.coor_groupings:
-        num_of_coors = max(1, len(group))
-        avg_red, avg_green, avg_blue = 0, 0, 0
-        for coor in group:
-            red, green, blue = image.getpixel(coor)
-            avg_red += red
-            avg_green += green
-            avg_blue += blue
+    # Every pixel takes the average color of its grouping
+    pixels = from_image(image.convert('RGB'))
+    labels = vor.labels.ravel()
+    counts = np.maximum(np.bincount(labels, minlength=len(vor.feature_points)), 1)
+    averages = np.column_stack([np.bincount(labels, weights=pixels[..., channel].ravel(), minlength=len(counts))
+                                for channel in range(pixels.shape[-1])]) / counts[:, None]
+    frosted = np.round(averages).astype(np.uint8)[vor.labels]
 
-        avg_red /= num_of_coors
-        avg_green /= num_of_coors
-        avg_blue /= num_of_coors
-        new_color = (round(avg_red), round(avg_green), round(avg_blue))
-
-        for coor in group:
-            draw.point(coor, new_color)
-
-    return dummy_img
+    return to_image(frosted)
 
 
 if __name__ == '__main__':
@@ -44,3 +44,17 @@ class TestRGB(TestCase):
         rgb = RGB(198, 34, 119, .34)
         self.assertEqual(rgb.to_hsv().output_hsv_with_alpha(), (328.9024390243902, 82.82828282828282,
                                                                 77.64705882352942, 0.34))
+
+    def test_freeze(self):
+        rgb = RGB(54, 178, 213)
+        frozen = rgb.freeze()
+        self.assertEqual(frozen, RGB(54, 178, 213).freeze())
+        self.assertNotEqual(frozen, RGB(54, 178, 214).freeze())
+        self.assertEqual(len({frozen, RGB(54, 178, 213).freeze()}), 1)
+        self.assertTrue(frozen.same_color(rgb))
+
+        with self.assertRaises(AttributeError):
+            frozen.red = 0
+
+        with self.assertRaises(AttributeError):
+            rgb.shade = 0
@@ -0,0 +1,91 @@
+from unittest import TestCase
+import os
+import tempfile
+import numpy as np
+from color_models import RGB, HSV, LAB, linearization_table, linearize_channel
+from color_arrays import ColorArray, convert, linearize, rgb_to_lab
+from color_tables import rgb_to_lab_cube, close_rgb_to_lab_cube, lookup_lab
+
+
+class TestColorArrays(TestCase):
+    """
+    Tests to ensure that converting colors in bulk matches converting each color individually.
+    """
+
+    test_to = 10000
+
+    def test_rgb_to_hsv(self):
+        rgbs = [RGB.random_rgb() for i in range(TestColorArrays.test_to)]
+        expected = [rgb.to_hsv() for rgb in rgbs]
+        expected = [(hsv.hue, hsv.saturation, hsv.value) for hsv in expected]
+        actual = ColorArray.from_colors(rgbs).to_hsv().values
+        np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+    def test_hsv_to_rgb(self):
+        hsvs = [HSV.random_hsv() for i in range(TestColorArrays.test_to)] + [HSV(360, 100, 100)]
+        expected = [hsv.to_rgb().output() for hsv in hsvs]
+        actual = np.round(ColorArray.from_colors(hsvs, 'hsv').to_rgb().values)
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_rgb_to_lab(self):
+        rgbs = [RGB.random_rgb() for i in range(TestColorArrays.test_to)] + [RGB(0, 0, 0), RGB(255, 255, 255)]
+        expected = [rgb.to_lab() for rgb in rgbs]
+        expected = [(lab.light, lab.a, lab.b) for lab in expected]
+        actual = ColorArray.from_colors(rgbs).to_lab().values
+        np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+    def test_lab_to_rgb(self):
+        labs = [LAB(light, a, b) for light in range(0, 101, 10) for a in range(-120, 121, 20)
+                for b in range(-120, 121, 20)]
+        expected = [lab.to_rgb() for lab in labs]
+        expected = [(rgb.red, rgb.green, rgb.blue) for rgb in expected]
+        actual = ColorArray.from_colors(labs, 'lab').to_rgb().values
+        np.testing.assert_allclose(actual, expected, atol=1e-9)
+
+    def test_alpha_passes_through(self):
+        values = np.array([[54, 178, 213, 23], [198, 34, 119, 78]])
+        lab = convert(values, 'rgb', 'lab')
+        self.assertEqual(lab.shape, (2, 4))
+        np.testing.assert_array_equal(lab[:, 3], (23, 78))
+        np.testing.assert_allclose(convert(lab, 'lab', 'rgb'), values, atol=1e-3)
+
+    def test_image_shaped_arrays(self):
+        rng = np.random.default_rng(0)
+        values = rng.integers(0, 256, (4, 5, 3))
+        lab = convert(values, 'rgb', 'lab')
+        self.assertEqual(lab.shape, (4, 5, 3))
+        np.testing.assert_allclose(convert(values.reshape(-1, 3), 'rgb', 'lab'), lab.reshape(-1, 3))
+
+    def test_linearization_table(self):
+        channels = np.arange(256)
+        np.testing.assert_array_equal(linearize(channels), linearization_table())
+        np.testing.assert_allclose(linearize(channels.astype(np.float64)), linearization_table())
+
+        for channel in (-1, 256):
+            with self.assertRaises(ValueError):
+                linearize_channel(channel)
+            with self.assertRaises(ValueError):
+                linearize(np.array([0, channel, 255]))
+
+    def test_lab_cube(self):
+        rng = np.random.default_rng(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rgb_to_lab.npy')
+            with self.assertRaises(FileNotFoundError):
+                rgb_to_lab_cube(path, build=False)
+            with self.assertRaises(ValueError):
+                rgb_to_lab_cube(path, size=257)
+
+            cube = rgb_to_lab_cube(path, size=32)
+            self.assertEqual(cube.shape, (32, 32, 32, 3))
+            self.assertIs(rgb_to_lab_cube(path, build=False), cube)
+
+            values = rng.integers(0, 32, (500, 3))
+            np.testing.assert_allclose(lookup_lab(values, cube), rgb_to_lab(values), atol=1e-3)
+            with_alpha = np.column_stack((values, rng.integers(0, 101, 500)))
+            np.testing.assert_allclose(lookup_lab(with_alpha, cube)[:, :3], rgb_to_lab(values), atol=1e-3)
+            np.testing.assert_array_equal(lookup_lab(with_alpha, cube)[:, 3], with_alpha[:, 3])
+            np.testing.assert_allclose(cube[31, 0, 31], rgb_to_lab(np.array([31, 0, 31])), atol=1e-3)
+
+            del cube
+            close_rgb_to_lab_cube(path)  # Let go of the memory map before its file is removed
@@ -0,0 +1,53 @@
+from unittest import TestCase
+import numpy as np
+from color_models import RGB
+from color_distance import delta_e_76, delta_e_94, delta_e_2000, delta_e, deduplicate, PaletteIndex
+from spatial_index import GridIndex
+
+
+class TestColorDistance(TestCase):
+
+    def test_delta_e_2000(self):
+        # Reference pairs from Sharma, Wu, and Dalal's CIEDE2000 test data
+        lab_a = [(50, 2.6772, -79.7751), (50, 3.1571, -77.2803), (50, 2.5, 0), (2.0776, .0795, -1.135)]
+        lab_b = [(50, 0, -82.7485), (50, 0, -82.7485), (50, 0, -2.5), (.9033, -.0636, -.5514)]
+        expected = [2.0425, 2.8615, 4.3065, .9082]
+        np.testing.assert_allclose(delta_e_2000(lab_a, lab_b), expected, atol=1e-4)
+        np.testing.assert_allclose(delta_e_2000(lab_b, lab_a), expected, atol=1e-4)
+
+    def test_delta_e_76_and_94(self):
+        self.assertEqual(delta_e_76((50, 0, 0), (53, 4, 0)), 5)
+        self.assertEqual(delta_e_94((50, 0, 0), (53, 0, 0)), 3)
+        self.assertLess(delta_e_94((50, 40, 0), (50, 44, 0)), delta_e_76((50, 40, 0), (50, 44, 0)))
+
+    def test_same_color_has_no_difference(self):
+        rgb = RGB(54, 178, 213)
+        self.assertAlmostEqual(delta_e(rgb, rgb.to_hsv()), 0)
+        self.assertAlmostEqual(delta_e(rgb, rgb.to_lab(), '76'), 0)
+
+    def test_palette_index_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        palette = RGB.n_random_rbg(16)
+        lab = np.column_stack((rng.uniform(0, 100, 50000), rng.uniform(-128, 128, (50000, 2))))
+
+        index = PaletteIndex(palette)
+        indices, distances = index.nearest(lab)
+        all_distances = delta_e_76(lab[:, None, :], index.palette[None, :, :])
+        np.testing.assert_array_equal(indices, all_distances.argmin(axis=1))
+        np.testing.assert_allclose(distances, all_distances.min(axis=1))
+
+        indices, distances = PaletteIndex(palette, '2000').nearest(lab)
+        np.testing.assert_array_equal(indices, delta_e_2000(lab[:, None, :], index.palette[None, :, :]).argmin(axis=1))
+
+    def test_grid_index_metrics(self):
+        rng = np.random.default_rng(1)
+        points = rng.uniform(0, 1000, (500, 2))
+        queries = rng.uniform(-50, 1050, (20000, 2))
+        for metric in ('euclidean', 'manhattan', 'chebyshev'):
+            grid = GridIndex(points, metric)
+            np.testing.assert_array_equal(grid.query(queries)[0], grid.brute_force(queries)[0])
+
+    def test_deduplicate(self):
+        colors = [RGB(200, 30, 30), RGB(201, 30, 30), RGB(30, 200, 30), RGB(200, 31, 31)]
+        kept = deduplicate(colors)
+        self.assertEqual(kept, [colors[0], colors[2]])
@@ -0,0 +1,46 @@
+from unittest import TestCase
+import numpy as np
+from PIL import Image
+from compositor import Layer, composite
+
+
+class TestCompositor(TestCase):
+
+    def test_matches_alpha_composite(self):
+        rng = np.random.default_rng(0)
+        for width, height in ((40, 30), (31, 20), (20, 31)):
+            pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+            image = Image.fromarray(pixels, 'RGBA')
+            vert = Image.alpha_composite(image, image.rotate(180))
+            expected = np.asarray(Image.alpha_composite(vert, vert.rotate(90))).astype(int)
+
+            rotated = pixels[::-1, ::-1]
+            layers = [Layer(image), Layer(image, 'rotate_180'), Layer(pixels, 'rotate_90'), Layer(rotated, 'rotate_90')]
+            result = np.asarray(composite(layers)).astype(int)
+
+            visible = expected[..., 3] > 0
+            self.assertLessEqual(np.abs(result - expected)[visible].max(), 1)
+            self.assertLessEqual(np.abs(result[..., 3] - expected[..., 3]).max(), 1)
+
+    def test_blend_modes(self):
+        rng = np.random.default_rng(1)
+        below = rng.integers(0, 256, (6, 5, 3), dtype=np.uint8)
+        above = rng.integers(0, 256, (6, 5, 3), dtype=np.uint8)
+        below_unit = below / 255
+        above_unit = above / 255
+        expected = {'normal': above_unit, 'multiply': below_unit * above_unit,
+                    'screen': below_unit + above_unit - (below_unit * above_unit),
+                    'average': (below_unit + above_unit) / 2}
+
+        for blend, colors in expected.items():
+            result = np.asarray(composite([Layer(below), Layer(above, blend=blend)])).astype(int)
+            self.assertLessEqual(np.abs(result[..., :3] - np.round(colors * 255)).max(), 1)
+            self.assertTrue((result[..., 3] == 255).all())
+
+    def test_invalid_layers(self):
+        with self.assertRaises(ValueError):
+            Layer(np.zeros((4, 4, 3), dtype=np.uint8), blend='overlay')
+        with self.assertRaises(ValueError):
+            Layer(np.zeros((4, 4, 3), dtype=np.uint8), transform='rotate_45')
+        with self.assertRaises(ValueError):
+            composite([])
@@ -0,0 +1,33 @@
+from unittest import TestCase
+import numpy as np
+from fortune import delaunay_neighbors, voronoi_cells, rasterize_cells
+from voronoi import VoronoiDiagram, find_labels
+
+
+class TestFortune(TestCase):
+
+    def test_delaunay_neighbors(self):
+        # A square with a point in the middle, which borders every corner while the corners only border their sides
+        feature_points = [(0, 0), (10, 0), (10, 10), (0, 10), (5, 5)]
+        self.assertEqual(delaunay_neighbors(feature_points), [[1, 3, 4], [0, 2, 4], [1, 3, 4], [0, 2, 4], [0, 1, 2, 3]])
+        self.assertEqual(delaunay_neighbors([(3, 4)]), [[]])
+
+    def test_rasterized_cells(self):
+        rng = np.random.default_rng(0)
+        # Random points, then rows and lattices of points full of ties between cells
+        width, height = 90, 70
+        point_sets = [np.unique(rng.integers(0, 91, (60, 2)), axis=0).tolist(),
+                      [(x, 35) for x in range(0, 90, 7)] + [(45, 0)],
+                      [(x, y) for x in range(0, 90, 10) for y in range(0, 70, 10)]]
+        for feature_points in point_sets:
+            cells = voronoi_cells(feature_points, (-.5, -.5, width - .5, height - .5))
+            np.testing.assert_array_equal(rasterize_cells(cells, width, height),
+                                          find_labels(width, height, feature_points))
+
+    def test_find_groupings_by_fortune(self):
+        diagram = VoronoiDiagram(80, 60, 25)
+        labels = diagram.labels
+        diagram.find_groupings_by_fortune()
+        np.testing.assert_array_equal(diagram.labels, labels)
+        self.assertEqual(len(diagram.cells), 25)
+        self.assertEqual(diagram.to_svg().count('<polygon'), sum(1 for cell in diagram.cells if cell))
@@ -0,0 +1,100 @@
+from unittest import TestCase
+import numpy as np
+from color_models import RGB
+from gradients import GradientCache, gradient_array, register_shape, find_shape, shape_registry, master_gradient
+from shape_fields import rectangle_field
+
+
+class TestGradientCache(TestCase):
+
+    colors = [RGB(0, 0, 0), RGB(255, 128, 0), RGB(20, 40, 250)]
+
+    def test_hits_and_misses(self):
+        cache = GradientCache()
+        first = cache.get(self.colors, 50)
+        np.testing.assert_array_equal(first, gradient_array(self.colors, 50))
+        self.assertFalse(first.flags.writeable)
+        self.assertIs(cache.get(self.colors, 50), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # Any parameter of the gradient changing misses
+        cache.get(self.colors, 51)
+        cache.get(self.colors, 50, mode='lab')
+        cache.get(self.colors, 50, alpha=True)
+        cache.get(self.colors, 50, reflect=True)
+        cache.get(self.colors[:2], 50)
+        self.assertEqual((cache.hits, cache.misses), (1, 6))
+        self.assertEqual(len(cache), 6)
+
+    def test_alpha_key(self):
+        # Alpha only tells gradients apart when it's included in them
+        cache = GradientCache()
+        translucent = [RGB(0, 0, 0, 20), RGB(255, 128, 0, 70), RGB(20, 40, 250, 50)]
+        self.assertIs(cache.get(translucent, 30), cache.get(self.colors, 30))
+        self.assertIsNot(cache.get(translucent, 30, alpha=True), cache.get(self.colors, 30, alpha=True))
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_eviction(self):
+        size = gradient_array(self.colors, 100).nbytes
+        cache = GradientCache(max_bytes=size * 2)
+        first = cache.get(self.colors, 100)
+        cache.get(self.colors, 100, mode='hsv')
+        cache.get(self.colors, 100)  # Now the most recently used
+        cache.get(self.colors, 100, mode='lab')
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.current_bytes, size * 2)
+        self.assertIs(cache.get(self.colors, 100), first)
+        cache.get(self.colors, 100, mode='hsv')
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+
+        # Gradients larger than the cache are returned without being cached
+        cache.get(self.colors, 1000)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+        cache.resize(size)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.current_bytes, size)
+        cache.resize(0)
+        self.assertEqual((len(cache), cache.current_bytes), (0, 0))
+
+        cache.clear()
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+
+class TestShapeRegistry(TestCase):
+
+    colors = [RGB(0, 0, 0), RGB(255, 255, 255)]
+
+    def tearDown(self):
+        for name in ('kite', 'square'):
+            shape_registry.pop(name, None)
+
+    def test_polygon_template(self):
+        # Templates are scaled over each ring's box and filled as drawn, with no field compiled from them
+        kite = register_shape('kite', points=[(.5, 0), (1, .4), (.5, 1), (0, .4)])
+        self.assertIs(find_shape('kite'), kite)
+        self.assertIsNone(kite.field)
+        self.assertEqual(kite.polygon((10, 20, 30, 60)), [(20, 20), (30, 36), (20, 60), (10, 36)])
+        for width, height in ((50, 40), (41, 77)):
+            np.testing.assert_array_equal(np.asarray(master_gradient(width, height, self.colors, 'kite', engine='field')),
+                                          np.asarray(master_gradient(width, height, self.colors, 'kite')))
+
+    def test_field(self):
+        square = register_shape('square', field=rectangle_field)
+        self.assertIsNone(square.polygon)
+        self.assertEqual(master_gradient(30, 20, self.colors, 'square', engine='field').size, (30, 20))
+        with self.assertRaises(ValueError):
+            master_gradient(30, 20, self.colors, 'square')
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            register_shape('star', points=[(0, 0), (1, 0), (1, 1)])
+        with self.assertRaises(ValueError):
+            register_shape('kite')
+        with self.assertRaises(ValueError):
+            register_shape('kite', field=rectangle_field, points=[(0, 0), (1, 0), (1, 1)])
+        with self.assertRaises(ValueError):
+            register_shape('kite', points=[(.5, 0), (1, .4), (.5, 1), (0, .4)], mirror_x=True)
+        with self.assertRaises(ValueError):
+            find_shape('kite')
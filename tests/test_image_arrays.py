@@ -0,0 +1,85 @@
+from unittest import TestCase
+import numpy as np
+from PIL import Image
+from color_arrays import convert
+from image_arrays import from_image, to_image
+
+
+class TestImageArrays(TestCase):
+
+    def test_rgb_round_trip(self):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (9, 14, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels, 'RGB')
+        np.testing.assert_array_equal(from_image(image), pixels)
+        np.testing.assert_array_equal(np.asarray(to_image(from_image(image))), pixels)
+
+        for space in ('rgb', 'hsv', 'xyz', 'lab'):
+            values = from_image(image, space)
+            self.assertEqual(values.shape, (9, 14, 3))
+            np.testing.assert_allclose(values, convert(pixels, 'rgb', space))
+            round_trip = to_image(values, space)
+            self.assertEqual(round_trip.mode, 'RGB')
+            np.testing.assert_array_equal(np.asarray(round_trip), pixels)
+
+    def test_rgba_round_trip(self):
+        rng = np.random.default_rng(1)
+        pixels = rng.integers(0, 256, (11, 7, 4), dtype=np.uint8)
+        pixels[0, :4, 3] = (0, 1, 254, 255)
+        image = Image.fromarray(pixels, 'RGBA')
+        np.testing.assert_array_equal(np.asarray(to_image(from_image(image))), pixels)
+
+        for space in ('rgb', 'lab'):
+            values = from_image(image, space)
+            self.assertEqual(values.shape, (11, 7, 4))
+            # PIL's [0, 255] alpha is scaled onto the color models' [0, 100]
+            np.testing.assert_allclose(values[..., 3], pixels[..., 3] * (100 / 255))
+            np.testing.assert_allclose(values[0, :4, 3], (0, 100 / 255, 100 * 254 / 255, 100))
+            round_trip = to_image(values, space)
+            self.assertEqual(round_trip.mode, 'RGBA')
+            np.testing.assert_array_equal(np.asarray(round_trip), pixels)
+
+        # Pixels without alpha are opaque in an RGBA image, and alpha is dropped from an RGB one
+        opaque = np.asarray(to_image(from_image(image, 'rgb')[..., :3], 'rgb', mode='RGBA'))
+        np.testing.assert_array_equal(opaque[..., 3], 255)
+        np.testing.assert_array_equal(np.asarray(to_image(from_image(image, 'rgb'), 'rgb', mode='RGB')),
+                                      pixels[..., :3])
+
+    def test_hsv_round_trip(self):
+        rng = np.random.default_rng(2)
+        pixels = rng.integers(0, 256, (8, 10, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels, 'HSV')
+        np.testing.assert_array_equal(from_image(image), pixels)
+
+        # PIL stores each component in [0, 255], the HSV color model in [0, 360] and [0, 100]
+        values = from_image(image, 'hsv')
+        np.testing.assert_allclose(values, pixels * (np.array((360, 100, 100)) / 255))
+        round_trip = to_image(values, 'hsv', mode='HSV')
+        self.assertEqual(round_trip.mode, 'HSV')
+        np.testing.assert_array_equal(np.asarray(round_trip), pixels)
+
+        rgb = from_image(image, 'rgb')
+        np.testing.assert_allclose(rgb, convert(values, 'hsv', 'rgb'))
+        self.assertLessEqual(np.abs(np.asarray(to_image(rgb, 'rgb')).astype(int) -
+                                    np.asarray(image.convert('RGB')).astype(int)).max(), 2)
+
+    def test_other_modes(self):
+        rng = np.random.default_rng(3)
+        gray = Image.fromarray(rng.integers(0, 256, (5, 6), dtype=np.uint8), 'L')
+        np.testing.assert_array_equal(from_image(gray), np.asarray(gray.convert('RGB')))
+        self.assertEqual(from_image(gray.convert('LA'), 'rgb').shape, (5, 6, 4))
+
+    def test_invalid(self):
+        image = Image.new('RGB', (4, 4))
+        with self.assertRaises(ValueError):
+            from_image(image, 'cmyk')
+        with self.assertRaises(ValueError):
+            to_image(np.zeros((4, 4, 2)))
+        with self.assertRaises(ValueError):
+            to_image(np.zeros((4, 4, 3), dtype=np.uint8), mode='CMYK')
+
+        # Pixels without a color space are never truncated or wrapped into bytes
+        for values in (np.full((4, 4, 3), 127.6), np.full((4, 4, 3), 256), np.full((4, 4, 4), -1)):
+            with self.assertRaises(ValueError):
+                to_image(values)
+        np.testing.assert_array_equal(np.asarray(to_image(np.full((4, 4, 3), 127.6), 'rgb')), 128)
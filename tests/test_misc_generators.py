@@ -0,0 +1,87 @@
+from unittest import TestCase
+import collections
+import random
+import numpy as np
+from PIL import Image, ImageDraw
+from color_models import RGB
+import gradients as grd
+from misc_generators import gradient_shifts, granite, straight_granite
+
+
+class TestMiscGenerators(TestCase):
+
+    colors = [RGB(0, 0, 0), RGB(255, 128, 0), RGB(20, 40, 250)]
+
+    def reference_shifts(self, width, height, sections, shifts):
+        # Rotates the gradient before drawing each section, a pixel at a time
+        gradient = collections.deque(grd.create_color_gradient(self.colors, height, 'rgb', False, True))
+        image = Image.new('RGB', (width, height))
+        draw = ImageDraw.Draw(image)
+        section_size = round(width / sections)
+        n = round(width * .025)
+        column = 0
+        for shift in shifts:
+            gradient.rotate(-n if shift else n)
+            for i in range(section_size):
+                for row in range(height):
+                    draw.point((column, row), gradient[row])
+                column += 1
+        return np.asarray(image)
+
+    def test_gradient_shifts(self):
+        rng = random.Random(4)
+        for width, height, sections in ((80, 50, 8), (120, 37, 6), (160, 90, 40)):
+            shifts = [rng.choice((True, False)) for i in range(sections)]
+            expected = self.reference_shifts(width, height, sections, shifts)
+            image = gradient_shifts(width, height, self.colors, sections, shifts)
+            self.assertEqual((image.mode, image.size), ('RGB', (width, height)))
+            np.testing.assert_array_equal(np.asarray(image), expected)
+
+            # Boxes starting and ending partway through sections, and ones covering a single column or row
+            for box in ((0, 0, width, height), (3, 5, width - 7, height - 2), (width // 3, 0, width // 3 + 1, height),
+                        (0, height // 2, width, height // 2 + 1), (width - 1, height - 1, width, height)):
+                left, upper, right, lower = box
+                part = gradient_shifts(width, height, self.colors, sections, shifts, box)
+                self.assertEqual(part.size, (right - left, lower - upper))
+                np.testing.assert_array_equal(np.asarray(part), expected[upper:lower, left:right])
+
+        # Random shifts are chosen with the random module as before
+        random.seed(9)
+        shifts = [random.choice((True, False)) for i in range(8)]
+        random.seed(9)
+        np.testing.assert_array_equal(np.asarray(gradient_shifts(80, 50, self.colors, 8)),
+                                      self.reference_shifts(80, 50, 8, shifts))
+
+    def test_gradient_shifts_invalid(self):
+        with self.assertRaises(ValueError):
+            gradient_shifts(80, 50, self.colors, 8, box=(0, 0, 40, 50))
+        with self.assertRaises(ValueError):
+            gradient_shifts(80, 50, self.colors, 8, [True] * 7)
+        with self.assertRaises(ValueError):
+            gradient_shifts(80, 50, self.colors, 8, [True] * 8, (0, 0, 81, 50))
+        with self.assertRaises(ValueError):
+            gradient_shifts(80, 50, self.colors, 6)
+
+    def assert_seeded(self, generator):
+        image = generator(60, 40, seed=5)
+        self.assertEqual((image.mode, image.size), ('HSV', (60, 40)))
+        pixels = np.asarray(image)
+
+        # A single hue and saturation, with values kept in the HSV color model's [0, 100]
+        self.assertEqual(len(np.unique(pixels[..., :2].reshape(-1, 2), axis=0)), 1)
+        self.assertLessEqual(pixels[..., 2].max(), 100)
+
+        np.testing.assert_array_equal(np.asarray(generator(60, 40, seed=5)), pixels)
+        np.testing.assert_array_equal(np.asarray(generator(60, 40, seed=np.random.default_rng(5))), pixels)
+        self.assertFalse(np.array_equal(np.asarray(generator(60, 40, seed=6)), pixels))
+        self.assertFalse(np.array_equal(np.asarray(generator(60, 40)), np.asarray(generator(60, 40))))
+
+        # Single row and column images
+        for width, height in ((1, 40), (60, 1), (1, 1)):
+            self.assertEqual(generator(width, height, seed=5).size, (width, height))
+
+    def test_granite_seed(self):
+        self.assert_seeded(granite)
+
+    def test_straight_granite_seed(self):
+        self.assert_seeded(straight_granite)
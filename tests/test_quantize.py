@@ -0,0 +1,59 @@
+from unittest import TestCase
+import numpy as np
+from PIL import Image
+from color_models import RGB
+from color_arrays import rgb_to_lab
+from color_distance import PaletteIndex
+from quantize import quantize, palette_lookup_cube
+
+
+class TestQuantize(TestCase):
+
+    palette = [RGB(0, 0, 0), RGB(255, 255, 255), RGB(200, 30, 40), RGB(20, 160, 60), RGB(40, 70, 220),
+               RGB(240, 200, 30), RGB(128, 128, 128)]
+
+    def nearest(self, colors):
+        # Brute force, every color measured against every palette color
+        palette = rgb_to_lab(np.array([color.output() for color in self.palette], dtype=np.float64))
+        distances = np.linalg.norm(rgb_to_lab(colors)[:, None, :] - palette[None, :, :], axis=-1)
+        return np.argmin(distances, axis=1)
+
+    def test_palette_image(self):
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (12, 17, 3), dtype=np.uint8)
+        quantized = quantize(Image.fromarray(pixels, 'RGB'), self.palette)
+        self.assertEqual(quantized.mode, 'P')
+        self.assertEqual(quantized.size, (17, 12))
+        expected = [component for color in self.palette for component in color.output()]
+        self.assertEqual(quantized.getpalette()[:len(expected)], expected)
+
+    def test_nearest_color(self):
+        rng = np.random.default_rng(1)
+        # Pixels a few steps off of the palette's colors, whose nearest palette color is the one they came from
+        colors = np.array([color.output() for color in self.palette])
+        sources = rng.integers(0, len(colors), (15, 20))
+        pixels = np.clip(colors[sources] + rng.integers(-3, 4, (15, 20, 3)), 0, 255).astype(np.uint8)
+        indices = np.asarray(quantize(Image.fromarray(pixels, 'RGB'), self.palette))
+        np.testing.assert_array_equal(indices.ravel(), self.nearest(pixels.reshape(-1, 3).astype(np.float64)))
+        np.testing.assert_array_equal(indices, sources)
+
+        # Any other pixel takes the nearest palette color to the center of its bin
+        pixels = rng.integers(0, 256, (15, 20, 3), dtype=np.uint8)
+        indices = np.asarray(quantize(Image.fromarray(pixels, 'RGB'), self.palette, bits=5))
+        centers = ((pixels.reshape(-1, 3) >> 3) * 8) + 3.5
+        np.testing.assert_array_equal(indices.ravel(), self.nearest(centers))
+
+    def test_palette_index(self):
+        rng = np.random.default_rng(2)
+        pixels = rng.integers(0, 256, (10, 10, 3), dtype=np.uint8)
+        indices = np.asarray(quantize(Image.fromarray(pixels, 'RGB'), self.palette, bits=4, formula='2000'))
+        palette = rgb_to_lab(np.array([color.output() for color in self.palette], dtype=np.float64))
+        centers = ((pixels.reshape(-1, 3) >> 4) * 16) + 7.5
+        expected = PaletteIndex(palette, '2000').nearest(rgb_to_lab(centers))[0]
+        np.testing.assert_array_equal(indices.ravel(), expected)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            palette_lookup_cube([])
+        with self.assertRaises(ValueError):
+            palette_lookup_cube(self.palette, bits=9)
@@ -0,0 +1,106 @@
+from unittest import TestCase
+import os
+import tempfile
+import numpy as np
+from PIL import Image
+from color_models import RGB
+import gradients as grd
+from misc_generators import gradient_shifts, granite
+from render import band_boxes, render_in_bands, render_to_file, _bind_arguments
+
+# Boxes the recording generator was asked to render, in order
+rendered_boxes = []
+
+
+def recorded_line_gradient(width, height, list_of_colors, box=None):
+    rendered_boxes.append(box)
+    return grd.line_gradient(width, height, list_of_colors, box=box)
+
+
+class TestRender(TestCase):
+
+    colors = [RGB(0, 0, 0), RGB(255, 128, 0), RGB(20, 40, 250)]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'image.png')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        with Image.open(self.path) as image:
+            return image.mode, np.asarray(image)
+
+    def test_shape_gradients(self):
+        # Polygons are filled exactly as drawn, and field shapes as rendered from their field
+        for generator, engine in ((grd.star_gradient, 'draw'), (grd.lopsided_arced_rect_gradient, 'draw'),
+                                  (grd.ellipse_gradient, 'field')):
+            with self.subTest(generator=generator.__name__):
+                render_to_file(generator, 83, 70, self.path, self.colors, strip_height=16)
+                mode, pixels = self.read()
+                self.assertEqual(mode, 'RGB')
+                np.testing.assert_array_equal(pixels, np.asarray(generator(83, 70, self.colors, engine=engine)))
+
+        render_to_file(grd.diamond_gradient, 40, 51, self.path, self.colors, alpha=True, strip_height=7)
+        mode, pixels = self.read()
+        self.assertEqual(mode, 'RGBA')
+        np.testing.assert_array_equal(pixels, np.asarray(grd.diamond_gradient(40, 51, self.colors, alpha=True)))
+
+    def test_strips(self):
+        # Each strip renders only its own rows, top to bottom
+        rendered_boxes.clear()
+        render_to_file(recorded_line_gradient, 30, 50, self.path, self.colors, strip_height=16)
+        self.assertEqual(rendered_boxes, [(0, 0, 30, 12), (0, 12, 30, 25), (0, 25, 30, 38), (0, 38, 30, 50)])
+        np.testing.assert_array_equal(self.read()[1], np.asarray(grd.line_gradient(30, 50, self.colors)))
+
+        shifts = [True, False, False, True]
+        render_to_file(gradient_shifts, 40, 30, self.path, self.colors, 4, shifts, strip_height=8)
+        np.testing.assert_array_equal(self.read()[1], np.asarray(gradient_shifts(40, 30, self.colors, 4, shifts)))
+
+    def test_band_boxes(self):
+        self.assertEqual(band_boxes(30, 10, 3), [(0, 0, 30, 3), (0, 3, 30, 7), (0, 7, 30, 10)])
+        self.assertEqual(band_boxes(30, 10, 1), [(0, 0, 30, 10)])
+        self.assertEqual(band_boxes(30, 3, 8), [(0, 0, 30, 1), (0, 1, 30, 2), (0, 2, 30, 3)])
+
+    def test_bind_arguments(self):
+        # Defaults are resolved once, random ones included, and shape gradients take the field engine
+        args, kwargs = _bind_arguments(grd.star_gradient, 40, 30, (), {'alpha': True})
+        self.assertEqual(args[:2], (40, 30))
+        self.assertEqual(len(args), 7)
+        self.assertEqual(args[-2:], (True, 'field'))
+        self.assertEqual(_bind_arguments(grd.star_gradient, 40, 30, (self.colors,), {})[0][2], self.colors)
+        self.assertEqual(_bind_arguments(grd.star_gradient, 40, 30, (), {'engine': 'field'})[0][-1], 'field')
+
+        args, kwargs = _bind_arguments(gradient_shifts, 40, 30, (self.colors,), {'shifts': [True] * 4, 'sections': 4})
+        self.assertEqual(args, (40, 30, self.colors, 4, [True] * 4))
+        self.assertEqual(kwargs, {})
+
+        with self.assertRaises(ValueError):
+            _bind_arguments(grd.star_gradient, 40, 30, (), {'engine': 'draw'})
+        with self.assertRaises(ValueError):
+            _bind_arguments(granite, 40, 30, (), {})
+
+    def test_render_in_bands(self):
+        # Banded renders match a single render, for a polygon drawn by default, a field shape, and gradient_shifts
+        for generator, args, kwargs, expected in (
+                (grd.star_gradient, (self.colors,), {}, grd.star_gradient(90, 70, self.colors)),
+                (grd.ellipse_gradient, (self.colors,), {'alpha': True},
+                 grd.ellipse_gradient(90, 70, self.colors, alpha=True, engine='field')),
+                (gradient_shifts, (self.colors, 6, [True, False, True, True, False, False]), {},
+                 gradient_shifts(90, 70, self.colors, 6, [True, False, True, True, False, False]))):
+            with self.subTest(generator=generator.__name__):
+                banded = render_in_bands(generator, 90, 70, *args, processes=2, bands=5, **kwargs)
+                self.assertEqual(banded.mode, expected.mode)
+                np.testing.assert_array_equal(np.asarray(banded), np.asarray(expected))
+
+        with self.assertRaises(ValueError):
+            render_in_bands(grd.star_gradient, 90, 70, self.colors, engine='draw', processes=2)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            render_to_file(grd.star_gradient, 40, 30, self.path, self.colors, engine='draw')
+        with self.assertRaises(ValueError):
+            render_to_file(granite, 40, 30, self.path)
+        with self.assertRaises(ValueError):
+            render_to_file(grd.star_gradient, 40, 30, os.path.join(self.directory.name, 'image.jpg'), self.colors)
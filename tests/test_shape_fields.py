@@ -0,0 +1,127 @@
+from unittest import TestCase
+import math
+import numpy as np
+from PIL import Image, ImageDraw
+from color_models import RGB
+from gradients import gradient_cache, master_gradient, shape_registry, star_points, arced_rectangle_array
+from shape_fields import rectangle_field, polygon_field, gradient_indices, render_field, render_polygon, \
+    POLYGON_BAND_VERTICES
+
+
+class TestShapeFields(TestCase):
+
+    def test_rectangle_rings(self):
+        # Ring i is the box (i, i, size - i, size - i), covering a pixel up to the ring nearest the pixel's edge
+        size = 64
+        indices = gradient_indices(size, size, rectangle_field, range(size))
+        coordinates = np.arange(size)
+        last_ring = np.minimum(coordinates, size - coordinates)
+        last_ring = np.minimum(last_ring[:, None], last_ring[None, :])
+        np.testing.assert_array_equal(indices, (size // 2) - 1 - np.minimum(last_ring, (size // 2) - 1))
+
+    def test_polygon_field(self):
+        x, y = np.meshgrid(np.linspace(-1, 1, 41), np.linspace(-1, 1, 41))
+        square = polygon_field([(0, 0), (1, 0), (1, 1), (0, 1)])
+        np.testing.assert_allclose(square(x, y), rectangle_field(x, y), atol=1e-12)
+
+        # The same square with its upper edge doubling back along itself, seen from the center as the plain square
+        folded = polygon_field([(0, 0), (.6, 0), (.4, 0), (1, 0), (1, 1), (0, 1)])
+        np.testing.assert_allclose(folded(x, y), rectangle_field(x, y), atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            polygon_field([(0, 0), (.4, 0), (.4, .4), (0, .4)])
+
+    def test_render_field(self):
+        gradient_values = np.array([(0, 0, 0), (100, 100, 100), (200, 200, 200)])
+        pixels = render_field(6, 4, rectangle_field, gradient_values, fill_background=False)
+        self.assertEqual(pixels.shape, (4, 6, 3))
+        self.assertEqual(pixels.dtype, np.uint8)
+        np.testing.assert_array_equal(pixels[2, 3], (0, 0, 0))
+        np.testing.assert_array_equal(pixels[0, 0], (200, 200, 200))
+
+        band = render_field(6, 4, rectangle_field, gradient_values, rows=range(1, 3))
+        np.testing.assert_array_equal(band, render_field(6, 4, rectangle_field, gradient_values)[1:3])
+
+    def test_render_field_box(self):
+        gradient_values = np.arange(10).repeat(3).reshape(10, 3)
+        full = render_field(20, 13, rectangle_field, gradient_values)
+        part = render_field(20, 13, rectangle_field, gradient_values, rows=range(4, 9), columns=range(3, 17))
+        np.testing.assert_array_equal(part, full[4:9, 3:17])
+
+    def test_mirrored_render(self):
+        points = [(0, .2), (.2, 0), (.8, 0), (1, .2), (.85, .5), (1, .8), (.8, 1), (.2, 1), (0, .8), (.15, .5)]
+        field = polygon_field(points)
+        gradient_values = np.arange(40).repeat(3).reshape(40, 3)
+        for width, height in ((80, 60), (61, 79)):
+            full = render_field(width, height, field, gradient_values)
+            mirrored = render_field(width, height, field, gradient_values, mirror_x=True, mirror_y=True)
+            np.testing.assert_array_equal(mirrored, full)
+
+            part = render_field(width, height, field, gradient_values, rows=range(3, 50), columns=range(40, 57),
+                                mirror_x=True, mirror_y=True)
+            np.testing.assert_array_equal(part, full[3:50, 40:57])
+
+        # Registered shapes flagged as symmetric, mirrored whenever master_gradient renders them with the field engine
+        mirrored_shapes = [shape for shape in shape_registry.values() if shape.mirror_x or shape.mirror_y]
+        self.assertEqual({shape.name for shape in mirrored_shapes}, {'rectangle', 'ellipse'})
+        colors = [RGB(0, 0, 0), RGB(255, 255, 255)]
+        for shape in mirrored_shapes:
+            for width, height in ((80, 60), (61, 79), (64, 64)):
+                with self.subTest(shape=shape.name, size=(width, height)):
+                    full = render_field(width, height, shape.field,
+                                        gradient_cache.get(colors, math.ceil(max(width, height) / 2)))
+                    rendered = master_gradient(width, height, colors, shape.name, engine='field',
+                                               box=(5, 2, width - 9, height))
+                    np.testing.assert_array_equal(np.asarray(rendered), full[2:, 5:width - 9])
+
+    def test_matches_drawn(self):
+        # A gradient from black to white changes color every ring, so each pixel's ring can be read back from it
+        colors = [RGB(0, 0, 0), RGB(255, 255, 255)]
+        for width, height in ((64, 64), (101, 100), (200, 120), (120, 200)):
+            gradient_values = gradient_cache.get(colors, math.ceil(max(width, height) / 2))
+            ring_of = {int(value): ring for ring, value in enumerate(gradient_values[:, 0].astype(np.uint8))}
+            for name, shape in shape_registry.items():
+                with self.subTest(shape=name, size=(width, height)):
+                    drawn = np.asarray(master_gradient(width, height, colors, name, engine='draw'))
+                    if shape.polygon is not None:
+                        rendered = render_polygon(width, height, shape.polygon, gradient_values)
+                        np.testing.assert_array_equal(rendered, drawn)
+                    else:
+                        rendered = render_field(width, height, shape.field, gradient_values,
+                                                mirror_x=shape.mirror_x, mirror_y=shape.mirror_y)
+                        rendered_rings = np.vectorize(ring_of.get)(rendered[..., 0])
+                        drawn_rings = np.vectorize(ring_of.get)(drawn[..., 0])
+                        self.assertLessEqual(np.abs(rendered_rings - drawn_rings).max(), 1)
+
+    def test_polygon_box(self):
+        gradient_values = np.arange(45).repeat(3).reshape(45, 3)
+        for polygon in (star_points, lambda coordinates: arced_rectangle_array(coordinates, .3, .2)):
+            full = render_polygon(90, 70, polygon, gradient_values)
+            for rows, columns in ((range(20, 61), range(5, 44)), (range(0, 1), range(90)), (range(69, 70), range(3, 4))):
+                part = render_polygon(90, 70, polygon, gradient_values, rows=rows, columns=columns)
+                np.testing.assert_array_equal(part, full[rows.start:rows.stop, columns.start:columns.stop])
+
+    def test_polygon_bands(self):
+        # Polygons with enough vertices to be filled in bands, with the edges missing each band left out, match the
+        # same rows of the whole polygon filled, for jagged polygons with sharp corners and runs of edges in and out of
+        # each band
+        rng = np.random.default_rng(3)
+        width, height = 60, 300
+        for _ in range(60):
+            count = int(rng.integers(POLYGON_BAND_VERTICES, 2 * POLYGON_BAND_VERTICES))
+            vertices = np.column_stack((rng.integers(0, width, count), rng.integers(0, height, count)))
+            if rng.random() < .2:
+                vertices = np.append(vertices, vertices[:1], axis=0)
+
+            # Only the outermost ring, filling the whole image, is given the polygon
+            polygon = lambda coordinates: vertices + .5 if coordinates[:2] == (0, 0) else []
+            gradient_values = np.full((height // 2, 3), 255)
+
+            full = Image.new('RGB', (width, height))
+            ImageDraw.Draw(full).polygon(vertices.ravel().tolist(), fill=(255, 255, 255))
+            full = np.asarray(full)
+            np.testing.assert_array_equal(render_polygon(width, height, polygon, gradient_values, False), full)
+            for upper in range(0, height, 37):
+                rows = range(upper, min(upper + int(rng.integers(1, 12)), height))
+                band = render_polygon(width, height, polygon, gradient_values, False, rows)
+                np.testing.assert_array_equal(band, full[rows.start:rows.stop])
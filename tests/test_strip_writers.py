@@ -0,0 +1,80 @@
+from unittest import TestCase
+import os
+import struct
+import tempfile
+import numpy as np
+from PIL import Image
+from strip_writers import StripWriter, PNGWriter, BMPWriter, open_writer
+
+
+class TestStripWriters(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_in_strips(self, name, pixels, mode, strip_height=7):
+        path = os.path.join(self.directory.name, name)
+        with open_writer(path, pixels.shape[1], pixels.shape[0], mode) as writer:
+            for start in range(0, len(pixels), strip_height):
+                writer.write(pixels[start:start + strip_height])
+        return path
+
+    def test_png_and_bmp_match_pillow(self):
+        rng = np.random.default_rng(0)
+        for mode, channels in (('RGB', 3), ('RGBA', 4)):
+            pixels = rng.integers(0, 256, (30, 13, channels), dtype=np.uint8)
+            with Image.open(self.write_in_strips('image.png', pixels, mode)) as image:
+                self.assertEqual(image.mode, mode)
+                np.testing.assert_array_equal(np.asarray(image), pixels)
+            with Image.open(self.write_in_strips('image.bmp', pixels, mode)) as image:
+                self.assertEqual(image.mode, mode)
+                np.testing.assert_array_equal(np.asarray(image), pixels)
+
+    def test_bmp_alpha(self):
+        rng = np.random.default_rng(1)
+        # Alpha is kept through the bit fields of a V4 header, down to fully transparent and fully opaque pixels
+        pixels = rng.integers(0, 256, (9, 6, 4), dtype=np.uint8)
+        pixels[0, :2, 3] = (0, 255)
+        path = self.write_in_strips('image.bmp', pixels, 'RGBA', strip_height=4)
+        with open(path, 'rb') as file:
+            header = file.read(BMPWriter.file_header_size + BMPWriter.v4_header_size)
+        self.assertEqual(struct.unpack_from('<I', header, 10)[0], len(header))
+        self.assertEqual(struct.unpack_from('<IiiHHI', header, 14), (BMPWriter.v4_header_size, 6, 9, 1, 32, 3))
+        self.assertEqual(struct.unpack_from('<4I', header, 54), BMPWriter.bgra_masks)
+        self.assertEqual(os.path.getsize(path), len(header) + pixels.nbytes)
+        with Image.open(path) as image:
+            self.assertEqual(image.mode, 'RGBA')
+            np.testing.assert_array_equal(np.asarray(image), pixels)
+
+        # RGB images keep the plain 40 byte header
+        path = self.write_in_strips('image.bmp', pixels[..., :3], 'RGB')
+        with open(path, 'rb') as file:
+            self.assertEqual(struct.unpack_from('<I', file.read(18), 14)[0], BMPWriter.info_header_size)
+
+    def test_npy(self):
+        rng = np.random.default_rng(2)
+        pixels = rng.integers(0, 256, (20, 9, 3), dtype=np.uint8)
+        np.testing.assert_array_equal(np.load(self.write_in_strips('image.npy', pixels, 'RGB')), pixels)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            StripWriter(os.path.join(self.directory.name, 'image'), 4, 4)
+
+        class Incomplete(StripWriter):
+            def _write(self, pixels):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete(os.path.join(self.directory.name, 'image'), 4, 4)
+
+    def test_missing_rows(self):
+        path = os.path.join(self.directory.name, 'image.png')
+        writer = PNGWriter(path, 4, 4)
+        writer.write(np.zeros((3, 4, 3), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            writer.write(np.zeros((2, 4, 3), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            writer.close()
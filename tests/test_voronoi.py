@@ -0,0 +1,160 @@
+from unittest import TestCase
+from unittest.mock import patch
+import io
+import numpy as np
+from voronoi import VoronoiDiagram, find_labels, jump_flood_labels, euclidean_distance, manhattan_distance, ellipse_arc_distance, \
+    radivojac_distance, chebyshev_distance, label_adjacency
+
+
+class TestVoronoi(TestCase):
+
+    def test_find_labels(self):
+        width, height = 23, 17
+        feature_points = [(0, 0), (5, 3), (22, 16), (11, 8), (3, 15), (18, 2), (12, 12)]
+        for distance in (euclidean_distance, manhattan_distance, ellipse_arc_distance, radivojac_distance,
+                         chebyshev_distance):
+            expected = np.array([[min(range(len(feature_points)),
+                                      key=lambda idx: distance(x, y, feature_points[idx][0], feature_points[idx][1]))
+                                  for x in range(width)] for y in range(height)])
+
+            # Small chunks split the image into many blocks of rows
+            for chunk_size in (1, 100, 1 << 22):
+                labels = find_labels(width, height, feature_points, distance, chunk_size=chunk_size)
+                self.assertEqual(labels.dtype, np.int32)
+                np.testing.assert_array_equal(labels, expected)
+
+    def test_indexed_labels(self):
+        rng = np.random.default_rng(0)
+        # Integer feature points leave many pixels tied between them, which must go to the same feature point either way
+        width, height = 97, 61
+        feature_points = rng.integers(0, 100, (300, 2))
+        for distance in (euclidean_distance, manhattan_distance, chebyshev_distance):
+            np.testing.assert_array_equal(find_labels(width, height, feature_points, distance, indexed=True),
+                                          find_labels(width, height, feature_points, distance, indexed=False))
+
+        with self.assertRaises(ValueError):
+            find_labels(width, height, feature_points, ellipse_arc_distance, indexed=True)
+
+    def test_jump_flood_labels(self):
+        width, height = 128, 96
+        feature_points = [(3, 90), (64, 48), (127, 0), (20, 20), (100, 70)]
+        np.testing.assert_array_equal(jump_flood_labels(width, height, feature_points),
+                                      find_labels(width, height, feature_points))
+
+        # Many feature points leave only a few pixels with a close but not the closest feature point
+        diagram = VoronoiDiagram(width, height, 500, method='jump_flood')
+        self.assertLess(diagram.count_mislabeled(), width * height // 100)
+        for idx, (x, y) in enumerate(diagram.feature_points):
+            if x < width and y < height:
+                self.assertEqual(diagram.labels[y, x], idx)
+
+        self.assertEqual(VoronoiDiagram(width, height, 50).count_mislabeled(), 0)
+        with self.assertRaises(ValueError):
+            VoronoiDiagram(width, height, 5, method='fortune')
+
+    def test_find_groupings(self):
+        diagram = VoronoiDiagram(30, 20, 6)
+        self.assertEqual(diagram.offsets[-1], 30 * 20)
+        self.assertEqual(len(diagram.coor_groupings), 6)
+        self.assertEqual(sum(len(group) for group in diagram.coor_groupings), 30 * 20)
+        for idx, group in enumerate(diagram.coor_groupings):
+            self.assertEqual(group, sorted(group, key=lambda xy: (xy[1], xy[0])))
+            for x, y in group:
+                self.assertEqual(diagram.labels[y, x], idx)
+        self.assertEqual(diagram.coor_groupings[-1], diagram.coor_groupings[5])
+
+    def test_optimize(self):
+        width, height = 60, 40
+        diagram = VoronoiDiagram(width, height, 8)
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            diagram.optimize(max_iterations=3)
+        self.assertEqual(output.getvalue(), '')
+        self.assertLessEqual(len(diagram.residuals), 3)
+
+        # The groupings always match the final feature points, each grouping's centroid being its feature point
+        diagram.optimize(tolerance=.01, max_iterations=500)
+        self.assertLessEqual(diagram.residuals[-1].max(), .01)
+        np.testing.assert_array_equal(diagram.labels, find_labels(width, height, diagram.feature_points))
+        for idx, (x, y) in enumerate(diagram.feature_points):
+            xs, ys = diagram.grouping(idx)
+            self.assertAlmostEqual(xs.mean(), x, delta=.1)
+            self.assertAlmostEqual(ys.mean(), y, delta=.1)
+
+        with patch('sys.stdout', new_callable=io.StringIO) as output:
+            diagram.optimize(max_iterations=2, verbose=True)
+        self.assertEqual(len(output.getvalue().splitlines()), len(diagram.residuals))
+
+    def assert_regrouped(self, diagram):
+        # Labels, pixel index, and neighbors all as a full regrouping would leave them
+        labels = find_labels(diagram.width, diagram.height, diagram.feature_points, diagram.distance)
+        np.testing.assert_array_equal(diagram.labels, labels)
+        np.testing.assert_array_equal(diagram.pixel_index, np.argsort(labels, axis=None, kind='stable'))
+        np.testing.assert_array_equal(np.diff(diagram.offsets), np.bincount(labels.ravel(),
+                                                                            minlength=len(diagram.feature_points)))
+        adjacency = label_adjacency(labels, len(diagram.feature_points))
+        for idx in range(len(diagram.feature_points)):
+            self.assertEqual(diagram.neighbors(idx), sorted(adjacency[idx]))
+
+    def test_edit_sites(self):
+        rng = np.random.default_rng(0)
+        for distance in (euclidean_distance, manhattan_distance, chebyshev_distance, ellipse_arc_distance):
+            diagram = VoronoiDiagram(90, 70, 40, distance=distance)
+            for _ in range(20):
+                idx = int(rng.integers(len(diagram.feature_points)))
+                x, y = diagram.feature_points[idx]
+                diagram.move_site(idx, (x + rng.normal(0, 3), y + rng.normal(0, 3)))
+                self.assert_regrouped(diagram)
+
+                idx = diagram.add_site(tuple(rng.uniform(0, 70, 2)))
+                self.assertEqual(idx, len(diagram.feature_points) - 1)
+                self.assert_regrouped(diagram)
+
+                diagram.remove_site(int(rng.integers(len(diagram.feature_points))))
+                self.assert_regrouped(diagram)
+
+            indices = rng.choice(len(diagram.feature_points), 5, replace=False)
+            diagram.move_sites(indices, rng.uniform(0, 70, (5, 2)))
+            self.assert_regrouped(diagram)
+
+        diagram = VoronoiDiagram(10, 10, 2)
+        diagram.remove_site(0)
+        self.assertEqual(diagram.offsets.tolist(), [0, 100])
+        with self.assertRaises(ValueError):
+            diagram.remove_site(0)
+
+    def test_edit_sites_every_distance(self):
+        # Feature points jumping anywhere, under metrics regrouped around them and those regrouped in full alike
+        for distance in (euclidean_distance, manhattan_distance, chebyshev_distance, ellipse_arc_distance,
+                         radivojac_distance):
+            rng = np.random.default_rng(2)
+            diagram = VoronoiDiagram(60, 50, 25, distance=distance)
+            diagram.feature_points = [tuple(point) for point in rng.integers(0, 60, (25, 2)).tolist()]
+            diagram.find_groupings()
+            for _ in range(5):
+                indices = rng.choice(len(diagram.feature_points), 3, replace=False)
+                diagram.move_sites(indices, rng.uniform(0, 60, (3, 2)))
+                self.assert_regrouped(diagram)
+
+                diagram.add_site(tuple(rng.uniform(0, 60, 2)))
+                self.assert_regrouped(diagram)
+
+                diagram.remove_site(int(rng.integers(len(diagram.feature_points))))
+                self.assert_regrouped(diagram)
+
+        diagram = VoronoiDiagram(60, 50, 25, distance=radivojac_distance)
+        diagram.optimize(tolerance=.5, max_iterations=20, incremental=True)
+        np.testing.assert_array_equal(diagram.labels, find_labels(60, 50, diagram.feature_points, radivojac_distance))
+
+    def test_incremental_optimize(self):
+        width, height = 120, 90
+        diagram = VoronoiDiagram(width, height, 60)
+        diagram.optimize(tolerance=.05, max_iterations=300, incremental=True)
+        self.assertLessEqual(diagram.residuals[-1].max(), .05)
+        self.assert_regrouped(diagram)
+        for idx, (x, y) in enumerate(diagram.feature_points):
+            xs, ys = diagram.grouping(idx)
+            self.assertAlmostEqual(xs.mean(), x, delta=.05)
+            self.assertAlmostEqual(ys.mean(), y, delta=.05)
+
+        with self.assertRaises(ValueError):
+            diagram.optimize(incremental=True)